@@ -11,6 +11,13 @@ Identifica materiais duplicados no cadastro através de 3 métodos:
 2. Duplicatas por descrição (case-insensitive)
 3. Duplicatas fuzzy (similaridade >90%)
 
+MODO INCREMENTAL:
+Se existir data/raw/materiais_delta.csv (materiais novos/alterados do dia;
+coluna opcional acao=EXCLUIR) e o índice de chaves de uma execução completa,
+só o delta é comparado com o índice e duplicatas.csv é atualizado (grupos
+adicionados, alterados e retirados em duplicatas_alteracoes.csv). O delta
+aplicado vai para data/processed/deltas_aplicados/.
+
 IMPACTO FINANCEIRO:
 - Eliminação compras duplicadas: R$ 12.000/ano
 - Redução estoque parado: R$ 5.000/ano
@@ -27,10 +34,50 @@ import seaborn as sns
 from datetime import datetime
 import os
 
+from mdm.atributos import chave_atributos, extrair_atributos
+from mdm.duplicatas import (arestas_por_chave, clusters_transitivos, duplicatas_fuzzy,
+                            impacto_grupos, pares_fuzzy, resumir_grupos)
+from mdm.incremental import ARQUIVO_INDICE_CHAVES, IndiceChaves
+from mdm.minhash import ARQUIVO_INDICE, IndiceMinHash, atualizar_pares
+from mdm.sobrevivencia import registros_ouro
+from mdm.tfidf import pares_tfidf
+
 print("\n" + "="*80)
 print("🔍 IDENTIFICAÇÃO DE DUPLICATAS - PROJETO MDM")
 print("="*80 + "\n")
 
+# ═══════════════════════════════════════════════════════════════════════════
+# 0. MODO INCREMENTAL (LOTE DELTA)
+# ═══════════════════════════════════════════════════════════════════════════
+
+ARQUIVO_DELTA = 'data/raw/materiais_delta.csv'
+
+if os.path.exists(ARQUIVO_DELTA) and os.path.exists(ARQUIVO_INDICE_CHAVES):
+    print(f"⚡ MODO INCREMENTAL: {ARQUIVO_DELTA}")
+    inicio_delta = datetime.now()
+    df_delta = pd.read_csv(ARQUIVO_DELTA)
+
+    indice_chaves = IndiceChaves(ARQUIVO_INDICE_CHAVES)
+    df_alteracoes = indice_chaves.aplicar_delta(df_delta)
+    df_duplicatas = indice_chaves.exportar('data/processed/duplicatas.csv')
+    indice_chaves.fechar()
+    df_alteracoes.to_csv('data/processed/duplicatas_alteracoes.csv', index=False, encoding='utf-8-sig')
+
+    # Delta arquivado: a próxima execução não o reaplica
+    os.makedirs('data/processed/deltas_aplicados', exist_ok=True)
+    os.replace(ARQUIVO_DELTA, f"data/processed/deltas_aplicados/"
+                              f"materiais_delta_{datetime.now():%Y%m%d_%H%M%S}.csv")
+
+    acoes = df_alteracoes['acao'].value_counts()
+    print(f"   Materiais no delta: {len(df_delta):,}")
+    for acao in ['ADICIONADO', 'ALTERADO', 'RETIRADO']:
+        print(f"   Grupos {acao.lower()}s: {acoes.get(acao, 0):,}")
+    print(f"   Total de grupos em duplicatas.csv: {len(df_duplicatas):,}")
+    print(f"   Tempo: {(datetime.now() - inicio_delta).total_seconds():.2f}s")
+    print("\n✅ duplicatas.csv e duplicatas_alteracoes.csv atualizados")
+    print("   (fuzzy, clusters e registros ouro: só na execução completa)")
+    raise SystemExit(0)
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 1. CARREGAR DADOS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -102,8 +149,126 @@ exemplo_materiais = df[df['descricao_limpa'] == exemplo_desc][
 ].head(5)
 print(exemplo_materiais.to_string(index=False))
 
+# Atributos estruturados: tipo + material + especificação iguais é duplicata
+# mesmo com ordem trocada ("Parafuso M10 Inox" = "parafuso inox M10")
+atributos = extrair_atributos(df['descricao'])
+df['chave_atributos'] = chave_atributos(atributos)
+dup_atributos = df['chave_atributos'].notna() & df.duplicated('chave_atributos', keep=False)
+so_atributos = dup_atributos & ~df.duplicated('descricao_limpa', keep=False)
+
+print(f"\n🧩 Por atributos (tipo | material | especificação):")
+print(f"   Descrições distintas: {df['descricao_limpa'].nunique():,} → "
+      f"chaves de atributos: {df['chave_atributos'].nunique():,}")
+print(f"   Registros com chave duplicada: {dup_atributos.sum():,} "
+      f"({so_atributos.sum():,} não pegos pela descrição)")
+exemplos_atributos = df[so_atributos].groupby('chave_atributos')['descricao'].unique().head(3)
+for chave, descricoes in exemplos_atributos.items():
+    print(f"   {chave}: {' / '.join(descricoes[:3])}")
+
 # ═══════════════════════════════════════════════════════════════════════════
-# 4. ANÁLISE POR CATEGORIA
+# 4. MÉTODO 3: DUPLICATAS FUZZY (SIMILARIDADE >90%)
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("\n" + "="*80)
+print("📋 MÉTODO 3: DUPLICATAS FUZZY (BLOCAGEM + SIMILARIDADE >90%)")
+print("="*80 + "\n")
+
+# Compara só materiais do mesmo bloco (categoria + tokens / UoM + especificação)
+LIMIAR_FUZZY = 0.90
+# Processos para normalização + similaridade: None = todos os núcleos a partir
+# de 200 mil materiais (abaixo disso, série); 1 força execução em série
+PROCESSOS_FUZZY = None
+pares_similares = pares_fuzzy(df, limiar=LIMIAR_FUZZY, processos=PROCESSOS_FUZZY)
+df_fuzzy = duplicatas_fuzzy(df, limiar=LIMIAR_FUZZY, pares=pares_similares)
+n_duplicatas_fuzzy = int(df_fuzzy['qtd_duplicatas'].sum())
+
+print(f"Grupos fuzzy encontrados: {len(df_fuzzy):,}")
+print(f"Total de registros nos grupos: {n_duplicatas_fuzzy:,}")
+print(f"Grupos com variação de texto (similaridade < 100%): "
+      f"{(df_fuzzy['similaridade'] < 1).sum():,}")
+
+print(f"\n📌 Exemplos de variações de digitação (similaridade < 100%):")
+exemplos_fuzzy = df_fuzzy[df_fuzzy['similaridade'] < 1].head(5)
+for _, row in exemplos_fuzzy.iterrows():
+    print(f"   \"{row['descricao']}\" → {row['qtd_duplicatas']} registros "
+          f"(similaridade mín. {row['similaridade']*100:.1f}%)")
+
+os.makedirs('data/processed', exist_ok=True)
+output_fuzzy = 'data/processed/duplicatas_fuzzy.csv'
+df_fuzzy.to_csv(output_fuzzy, index=False, encoding='utf-8-sig')
+print(f"\n✅ Lista fuzzy salva: {output_fuzzy}")
+
+# Índice MinHash/LSH persistente: só o que mudou desde a última execução
+# é reassinado, e os pares candidatos são atualizados incrementalmente
+print(f"\n🗂️  Índice MinHash/LSH ({ARQUIVO_INDICE}):")
+LIMIAR_JACCARD = 0.70
+arquivo_pares = 'data/processed/pares_minhash.csv'
+
+if os.path.exists(ARQUIVO_INDICE) and os.path.exists(arquivo_pares):
+    indice = IndiceMinHash.carregar(ARQUIVO_INDICE)
+    alterados, removidos = indice.sincronizar(df)
+    df_pares = atualizar_pares(indice, pd.read_csv(arquivo_pares), alterados,
+                               removidos, limiar=LIMIAR_JACCARD)
+    print(f"   Índice carregado: {len(alterados):,} códigos novos/alterados, "
+          f"{len(removidos):,} removidos")
+else:
+    indice = IndiceMinHash.construir(df)
+    df_pares = indice.pares_candidatos(limiar=LIMIAR_JACCARD)
+    print(f"   Índice construído do zero: {len(indice):,} materiais")
+
+indice.salvar(ARQUIVO_INDICE)
+df_pares.to_csv(arquivo_pares, index=False)
+print(f"   Pares candidatos (Jaccard estimado ≥ {LIMIAR_JACCARD:.0%}): {len(df_pares):,}")
+
+# Consulta de um material novo contra o cadastro existente
+exemplo_novo = df['descricao'].iloc[0]
+inicio_consulta = datetime.now()
+similares = indice.consultar(exemplo_novo, limiar=LIMIAR_JACCARD)
+ms_consulta = (datetime.now() - inicio_consulta).total_seconds() * 1000
+print(f"   Consulta \"{exemplo_novo}\": {len(similares)} similares em {ms_consulta:.1f} ms")
+
+# Método opcional: cosseno TF-IDF de 3-gramas de caracteres (sem blocagem),
+# mesmo formato de saída do fuzzy. Comparativo de tempo com o método exato
+# em 100k / 1M linhas: scripts/benchmark_tfidf.py
+USAR_TFIDF = True
+LIMIAR_TFIDF = 0.90
+
+if USAR_TFIDF:
+    inicio_tfidf = datetime.now()
+    pares_cosseno = pares_tfidf(df, limiar=LIMIAR_TFIDF)
+    df_tfidf = duplicatas_fuzzy(df, pares=pares_cosseno)
+    seg_tfidf = (datetime.now() - inicio_tfidf).total_seconds()
+
+    print(f"\n🔤 TF-IDF 3-gramas (cosseno ≥ {LIMIAR_TFIDF:.0%}), {seg_tfidf:.2f}s:")
+    print(f"   Grupos: {len(df_tfidf):,} ({int(df_tfidf['qtd_duplicatas'].sum()):,} registros), "
+          f"com variação de texto: {(df_tfidf['similaridade'] < 1).sum():,}")
+    output_tfidf = 'data/processed/duplicatas_tfidf.csv'
+    df_tfidf.to_csv(output_tfidf, index=False, encoding='utf-8-sig')
+    print(f"   ✅ Lista TF-IDF salva: {output_tfidf}")
+
+# Clusters transitivos: arestas de todos os métodos unidas por union-find
+# (A→B pelo código + B→C pela descrição = A, B e C no mesmo cluster)
+# Código repetido em muitos registros é colisão de chave, não duplicata
+MAX_REGISTROS_POR_CODIGO = 10
+contagem_codigo = df['codigo_material'].value_counts()
+codigos_colisao = contagem_codigo[contagem_codigo > MAX_REGISTROS_POR_CODIGO]
+arestas_codigo = arestas_por_chave(df['codigo_material'], max_por_chave=MAX_REGISTROS_POR_CODIGO)
+arestas_descricao = arestas_por_chave(df['descricao_limpa'])
+arestas_atributos = arestas_por_chave(df['chave_atributos'])
+df['cluster_id'] = clusters_transitivos(len(df), arestas_codigo, arestas_descricao,
+                                        arestas_atributos, pares_similares)
+
+tamanho_cluster = df.groupby('cluster_id')['cluster_id'].transform('size')
+n_clusters = df.loc[tamanho_cluster > 1, 'cluster_id'].nunique()
+print(f"\n🔗 Clusters transitivos (código + descrição + atributos + fuzzy):")
+print(f"   Arestas: {len(arestas_codigo):,} código, {len(arestas_descricao):,} descrição, "
+      f"{len(arestas_atributos):,} atributos, {len(pares_similares):,} fuzzy")
+print(f"   Clusters com 2+ registros: {n_clusters:,} ({(tamanho_cluster > 1).sum():,} registros)")
+for codigo, count in codigos_colisao.items():
+    print(f"   ⚠️  {codigo} em {count} registros: colisão de código, ignorado no cluster")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 5. ANÁLISE POR CATEGORIA
 # ═══════════════════════════════════════════════════════════════════════════
 
 print("\n" + "="*80)
@@ -118,31 +283,23 @@ for cat, count in duplicatas_por_categoria.head(10).items():
     print(f"   {cat:15s}: {count:4d} ({pct:5.2f}%)")
 
 # ═══════════════════════════════════════════════════════════════════════════
-# 5. IMPACTO FINANCEIRO
+# 6. IMPACTO FINANCEIRO
 # ═══════════════════════════════════════════════════════════════════════════
 
 print("\n" + "="*80)
 print("💰 CÁLCULO DE IMPACTO FINANCEIRO")
 print("="*80 + "\n")
 
-# Para cada grupo de duplicatas, calcular valor
-valor_total_duplicatas = 0
-economia_potencial = 0
-
-# Agrupar por descrição limpa e calcular valor
-grupos_duplicatas = df[df.duplicated('descricao_limpa', keep=False)].groupby('descricao_limpa')
-
-for desc, grupo in grupos_duplicatas:
-    # Valor médio do grupo
-    valor_medio = grupo['preco_unitario'].mean()
-    estoque_total = grupo['estoque_atual'].sum()
-    valor_estoque_grupo = valor_medio * estoque_total
-    
-    # Economia = manter apenas 1 registro, eliminar outros
-    # Assumir que 50% do estoque duplicado pode ser eliminado
-    economia_grupo = valor_estoque_grupo * 0.5 * 0.02  # 2% ao ano (custo capital)
-    economia_potencial += economia_grupo
-    valor_total_duplicatas += valor_estoque_grupo
+# Uma única agregação por grupo (descrição limpa) alimenta o impacto
+# financeiro e a lista de correção da seção 7
+df_duplicatas = resumir_grupos(df, 'descricao_limpa')
+
+# Valor do grupo = preço médio × estoque total
+# Economia = manter apenas 1 registro, eliminar outros
+# Assumir que 50% do estoque duplicado pode ser eliminado, 2% ao ano (custo capital)
+impacto = impacto_grupos(df_duplicatas, fracao_eliminavel=0.5, custo_capital=0.02)
+valor_total_duplicatas = impacto['valor_estoque_grupo'].sum()
+economia_potencial = impacto['economia_grupo'].sum()
 
 # Custos operacionais adicionais
 custo_retrabalho = n_descricoes_duplicadas * 2  # R$ 2/duplicata em retrabalho
@@ -159,47 +316,15 @@ print(f"💰 ECONOMIA TOTAL ANUAL: R$ {economia_total_anual:,.2f}")
 print(f"{'─'*80}\n")
 
 # ═══════════════════════════════════════════════════════════════════════════
-# 6. LISTA DE DUPLICATAS PARA CORREÇÃO
+# 7. LISTA DE DUPLICATAS PARA CORREÇÃO
 # ═══════════════════════════════════════════════════════════════════════════
 
 print("="*80)
 print("📝 GERANDO LISTA DE DUPLICATAS PARA CORREÇÃO")
 print("="*80 + "\n")
 
-# Criar lista priorizada de duplicatas
-lista_duplicatas = []
-
-for desc, grupo in grupos_duplicatas:
-    if len(grupo) > 1:
-        # Pegar informações do grupo
-        codigos = grupo['codigo_material'].tolist()
-        categorias = grupo['categoria'].unique().tolist()
-        precos = grupo['preco_unitario'].tolist()
-        estoques = grupo['estoque_atual'].tolist()
-        
-        # Calcular impacto (valor × quantidade)
-        valor_total = sum([p * e for p, e in zip(precos, estoques)])
-        
-        # Sugerir manter o registro com maior estoque
-        idx_manter = grupo['estoque_atual'].idxmax()
-        codigo_manter = grupo.loc[idx_manter, 'codigo_material']
-        codigos_eliminar = [c for c in codigos if c != codigo_manter]
-        
-        lista_duplicatas.append({
-            'descricao': grupo['descricao'].iloc[0],
-            'qtd_duplicatas': len(grupo),
-            'codigos_todos': ', '.join(codigos),
-            'codigo_manter': codigo_manter,
-            'codigos_eliminar': ', '.join(codigos_eliminar),
-            'categoria': categorias[0] if len(categorias) == 1 else 'MÚLTIPLAS',
-            'valor_total_estoque': valor_total,
-            'preco_medio': np.mean(precos),
-            'estoque_total': sum(estoques)
-        })
-
-# Criar DataFrame de duplicatas
-df_duplicatas = pd.DataFrame(lista_duplicatas)
-
+# Lista priorizada de duplicatas: já montada na seção 6 (1 linha por grupo,
+# codigo_manter = registro com maior estoque)
 # Ordenar por valor (priorizar correção de maior impacto)
 df_duplicatas = df_duplicatas.sort_values('valor_total_estoque', ascending=False)
 
@@ -209,6 +334,10 @@ output_file = 'data/processed/duplicatas.csv'
 df_duplicatas.to_csv(output_file, index=False, encoding='utf-8-sig')
 
 print(f"✅ Lista de duplicatas salva: {output_file}")
+
+# Índice de chaves para o modo incremental das próximas execuções
+IndiceChaves.construir(df_original, ARQUIVO_INDICE_CHAVES).fechar()
+print(f"✅ Índice de chaves (modo incremental): {ARQUIVO_INDICE_CHAVES}")
 print(f"   Total de grupos: {len(df_duplicatas)}")
 print(f"   Total de registros duplicados: {n_duplicatas_desc}\n")
 
@@ -218,8 +347,20 @@ print("   (ordenadas por valor de estoque)\n")
 top20 = df_duplicatas.head(20)[['descricao', 'qtd_duplicatas', 'valor_total_estoque', 'codigo_manter']]
 print(top20.to_string(index=False))
 
+# Registros ouro: 1 registro consolidado por cluster transitivo (regras por
+# campo em mdm/sobrevivencia.py) + referência código antigo → código novo
+colunas_cadastro = [c for c in df.columns if c != 'descricao_limpa']
+df_ouro, df_referencia = registros_ouro(df[colunas_cadastro], 'cluster_id')
+
+df_ouro.to_csv('data/processed/registros_ouro.csv', index=False, encoding='utf-8-sig')
+df_referencia.to_csv('data/processed/referencia_codigos.csv', index=False, encoding='utf-8-sig')
+
+print(f"\n🏅 Registros ouro: {len(df_ouro):,} (consolidam {len(df_referencia):,} registros)")
+print(f"   Códigos a eliminar → redirecionar para o novo: "
+      f"{(df_referencia['acao'] == 'ELIMINAR').sum():,}")
+
 # ═══════════════════════════════════════════════════════════════════════════
-# 7. VISUALIZAÇÕES
+# 8. VISUALIZAÇÕES
 # ═══════════════════════════════════════════════════════════════════════════
 
 print("\n" + "="*80)
@@ -334,7 +475,7 @@ print("✅ Gráfico salvo: visualizations/01_duplicatas_top20.png")
 plt.close()
 
 # ═══════════════════════════════════════════════════════════════════════════
-# 8. RESUMO EXECUTIVO
+# 9. RESUMO EXECUTIVO
 # ═══════════════════════════════════════════════════════════════════════════
 
 print("\n" + "="*80)
@@ -360,6 +501,7 @@ print(f"\n3. MÉDIO PRAZO (90 dias): Limpar todas duplicatas")
 print(f"   Economia total: R$ {economia_total_anual:,.2f}")
 print(f"\n4. PREVENIR: Implementar validação anti-duplicata no cadastro")
 print(f"   Evitar novos casos (ROI contínuo)")
+print(f"   → python scripts/19_servico_anti_duplicata.py (GET /verificar?descricao=...)")
 
 print(f"\n{'─'*80}")
 print(f"ARQUIVOS GERADOS:")
@@ -367,6 +509,12 @@ print(f"{'─'*80}")
 print(f"📄 data/processed/duplicatas.csv")
 print(f"   → Lista completa de {len(df_duplicatas)} grupos de duplicatas")
 print(f"   → Priorizada por valor (corrigir de cima para baixo)")
+print(f"\n📄 data/processed/duplicatas_fuzzy.csv")
+print(f"   → {len(df_fuzzy)} grupos fuzzy com coluna de similaridade")
+print(f"\n📄 data/processed/registros_ouro.csv + referencia_codigos.csv")
+print(f"   → {len(df_ouro)} registros ouro e tabela código antigo → código novo")
+print(f"\n🗂️  {ARQUIVO_INDICE} + {arquivo_pares}")
+print(f"   → Índice MinHash/LSH persistente e pares candidatos (Jaccard estimado)")
 print(f"\n📊 visualizations/01_duplicatas.png")
 print(f"   → 4 gráficos: overview, categorias, distribuição, impacto")
 print(f"\n📊 visualizations/01_duplicatas_top20.png")
@@ -25,6 +25,47 @@ import seaborn as sns
 from datetime import datetime
 import os
 
+from mdm.ausencia import coausencia, matriz_padroes, padroes_principais, projetar_perfil
+from mdm.completude import classificar_faixas
+from mdm.perfil_completude import perfilar_csv
+from mdm.rollup import (ARQUIVO_ROLLUP, DIMENSOES_ROLLUP, completude_celulas, grouping_sets,
+                        salvar_rollup, vazios as vazios_rollup, visao)
+
+# Exports de cada planta (mesmo layout); lidos em lotes, memória constante
+ARQUIVOS_ENTRADA = ['data/raw/materiais_raw.csv']
+TAMANHO_LOTE = 100_000
+
+# Definir campos críticos (obrigatórios)
+campos_criticos = [
+    'codigo_material',
+    'descricao', 
+    'categoria',
+    'unidade_medida',
+    'preco_unitario',
+    'ncm',
+    'fornecedor_principal',
+    'localizacao_fisica',
+    'centro_custo'
+]
+
+# Campos importantes (desejáveis)
+campos_importantes = [
+    'estoque_minimo',
+    'estoque_atual',
+    'data_cadastro',
+    'responsavel_cadastro'
+]
+
+# Campos complementares (opcionais)
+campos_complementares = [
+    'status',
+    'ultima_movimentacao'
+]
+
+# Pesos do score ponderado por registro
+PESOS_CRITICIDADE = {'CRÍTICO': 3, 'IMPORTANTE': 2, 'COMPLEMENTAR': 1}
+FAIXAS_SCORE = [(90, 'A - Completo'), (70, 'B - Bom'), (50, 'C - Regular')]
+
 print("\n" + "="*80)
 print("📊 ANÁLISE DE COMPLETUDE - PROJETO MDM")
 print("="*80 + "\n")
@@ -33,10 +74,36 @@ print("="*80 + "\n")
 # 1. CARREGAR DADOS
 # ═══════════════════════════════════════════════════════════════════════════
 
-print("📂 Carregando dados...")
-df = pd.read_csv('data/raw/materiais_raw.csv')
-print(f"✅ Dados carregados: {len(df):,} registros")
-print(f"   Total de campos: {len(df.columns)}\n")
+print(f"📂 Carregando dados em lotes de {TAMANHO_LOTE:,} linhas...")
+
+# Cada arquivo vira um perfil de agregados somáveis (padrões de campos vazios
+# por categoria, brancos, histograma de score, piores registros); o cadastro
+# inteiro nunca fica em memória
+campos = list(pd.read_csv(ARQUIVOS_ENTRADA[0], nrows=0).columns)
+pesos = {c: PESOS_CRITICIDADE['CRÍTICO'] if c in campos_criticos
+         else PESOS_CRITICIDADE['IMPORTANTE'] if c in campos_importantes
+         else PESOS_CRITICIDADE['COMPLEMENTAR'] for c in campos}
+perfil_completude = None
+for arquivo in ARQUIVOS_ENTRADA:
+    parcial = perfilar_csv(arquivo, pesos, campos_criticos, campos=campos, tamanho_lote=TAMANHO_LOTE,
+                           colunas_piores=['codigo_material', 'descricao', 'categoria'],
+                           dimensoes=DIMENSOES_ROLLUP)
+    print(f"   {arquivo}: {parcial.total:,} registros")
+    perfil_completude = parcial if perfil_completude is None else perfil_completude + parcial
+
+perfil = perfil_completude.perfil
+total_registros = perfil_completude.total
+print(f"✅ Dados carregados: {total_registros:,} registros")
+print(f"   Total de campos: {len(campos)}")
+
+# Rollup de todas as combinações de categoria × responsável × centro de custo
+# × status (GROUPING SETS) a partir da base somada nos lotes; as visões por
+# campo e por categoria abaixo, e os scripts 14 e 16, leem deste cache
+rollup = grouping_sets(perfil_completude.base, DIMENSOES_ROLLUP)
+salvar_rollup(rollup, ARQUIVO_ROLLUP, ARQUIVOS_ENTRADA)
+print(f"   Rollup: {len(rollup):,} linhas em {rollup['agrupamento'].nunique()} agrupamentos → {ARQUIVO_ROLLUP}")
+print(f"   Padrões de ausência distintos: {perfil['mascara'].nunique():,} "
+      f"({len(perfil):,} combinações categoria × padrão)\n")
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 2. CÁLCULO DE COMPLETUDE GERAL
@@ -47,11 +114,11 @@ print("📋 CÁLCULO DE COMPLETUDE POR CAMPO")
 print("="*80 + "\n")
 
 # Calcular completude (% não-nulo)
-completude = (1 - df.isnull().sum() / len(df)) * 100
+vazios = vazios_rollup(visao(rollup), campos)
+completude = (1 - vazios / total_registros) * 100
 completude = completude.sort_values()
 
 # Calcular quantidade de vazios
-vazios = df.isnull().sum()
 vazios = vazios[completude.index]  # Mesma ordem
 
 # Criar DataFrame resumo
@@ -59,7 +126,7 @@ df_completude = pd.DataFrame({
     'Campo': completude.index,
     'Completude %': completude.values.round(2),
     'Registros Vazios': vazios.values,
-    'Registros Preenchidos': (len(df) - vazios.values)
+    'Registros Preenchidos': (total_registros - vazios.values)
 })
 
 print("Completude por campo (ordenado do PIOR para MELHOR):\n")
@@ -71,6 +138,16 @@ print(f"\n{'─'*80}")
 print(f"📊 SCORE MÉDIO DE COMPLETUDE: {completude_media:.2f}%")
 print(f"{'─'*80}\n")
 
+# Textos só com espaços não são nulos, mas também não informam nada
+brancos = perfil_completude.brancos[perfil_completude.brancos > 0]
+if len(brancos) > 0:
+    print("Campos com texto em branco (só espaços, contados como preenchidos acima):")
+    for campo, qtd in brancos.items():
+        print(f"   ⚠️ {campo:25s}: {qtd:,} registros")
+    print()
+else:
+    print("✅ Nenhum campo com texto em branco (só espaços)\n")
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 3. CLASSIFICAÇÃO DE CAMPOS POR CRITICIDADE
 # ═══════════════════════════════════════════════════════════════════════════
@@ -79,39 +156,12 @@ print("="*80)
 print("🎯 CLASSIFICAÇÃO DE CAMPOS POR CRITICIDADE")
 print("="*80 + "\n")
 
-# Definir campos críticos (obrigatórios)
-campos_criticos = [
-    'codigo_material',
-    'descricao', 
-    'categoria',
-    'unidade_medida',
-    'preco_unitario',
-    'ncm',
-    'fornecedor_principal',
-    'localizacao_fisica',
-    'centro_custo'
-]
-
-# Campos importantes (desejáveis)
-campos_importantes = [
-    'estoque_minimo',
-    'estoque_atual',
-    'data_cadastro',
-    'responsavel_cadastro'
-]
-
-# Campos complementares (opcionais)
-campos_complementares = [
-    'status',
-    'ultima_movimentacao'
-]
-
 # Calcular completude por criticidade
 print("CAMPOS CRÍTICOS (obrigatórios):")
 completude_criticos = completude[campos_criticos].sort_values()
 for campo, comp in completude_criticos.items():
     status = "✅" if comp == 100 else "⚠️" if comp >= 80 else "❌"
-    print(f"   {status} {campo:25s}: {comp:6.2f}% ({int(len(df) * (100-comp)/100)} vazios)")
+    print(f"   {status} {campo:25s}: {comp:6.2f}% ({int(total_registros * (100-comp)/100)} vazios)")
 
 print(f"\n   Completude média críticos: {completude_criticos.mean():.2f}%")
 
@@ -131,22 +181,13 @@ print("\n" + "="*80)
 print("📊 COMPLETUDE POR CATEGORIA DE MATERIAL")
 print("="*80 + "\n")
 
-# Para cada categoria, calcular completude média
-categorias = df['categoria'].unique()
-completude_por_categoria = []
-
-for cat in categorias:
-    df_cat = df[df['categoria'] == cat]
-    comp_media = (1 - df_cat.isnull().sum().sum() / (len(df_cat) * len(df.columns))) * 100
-    n_materiais = len(df_cat)
-    
-    completude_por_categoria.append({
-        'Categoria': cat,
-        'Completude %': comp_media,
-        'Qtd Materiais': n_materiais
-    })
-
-df_cat_comp = pd.DataFrame(completude_por_categoria)
+# Completude média de cada categoria (% de células preenchidas) do rollup
+por_categoria = visao(rollup, ['categoria'])
+df_cat_comp = pd.DataFrame({
+    'Categoria': por_categoria.index,
+    'Completude %': completude_celulas(por_categoria, campos).to_numpy(),
+    'Qtd Materiais': por_categoria['qtd'].to_numpy(),
+})
 df_cat_comp = df_cat_comp.sort_values('Completude %')
 
 print("Completude média por categoria:\n")
@@ -160,6 +201,28 @@ for _, row in df_cat_comp.iterrows():
 print(f"\nCategoria com MELHOR completude: {df_cat_comp.iloc[-1]['Categoria']} ({df_cat_comp.iloc[-1]['Completude %']:.2f}%)")
 print(f"Categoria com PIOR completude:   {df_cat_comp.iloc[0]['Categoria']} ({df_cat_comp.iloc[0]['Completude %']:.2f}%)")
 
+# ═══════════════════════════════════════════════════════════════════════════
+# 4b. PADRÕES DE AUSÊNCIA (quais campos faltam JUNTOS)
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("\n" + "="*80)
+print("🧩 PADRÕES DE AUSÊNCIA")
+print("="*80 + "\n")
+
+N_PADROES = 20
+padroes = padroes_principais(perfil, campos, n=N_PADROES)
+print(f"Top {len(padroes)} combinações de campos vazios "
+      f"({padroes['pct'].sum():.1f}% dos registros):\n")
+for _, row in padroes.iterrows():
+    campos_vazios = row['campos_ausentes'] or '(nenhum campo vazio)'
+    print(f"   {row['qtd']:>8,} ({row['pct']:5.1f}%)  {row['n_ausentes']:>2} vazios: {campos_vazios}")
+
+# Coausência: registros com os dois campos vazios (só campos com algum vazio)
+campos_com_vazio = [c for c in campos if vazios[c] > 0]
+matriz_coausencia = coausencia(perfil, campos).loc[campos_com_vazio, campos_com_vazio]
+print("\nCoausência (registros com os DOIS campos vazios; diagonal = vazios do campo):\n")
+print(matriz_coausencia.to_string())
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 5. IMPACTO FINANCEIRO
 # ═══════════════════════════════════════════════════════════════════════════
@@ -222,19 +285,26 @@ print("="*80)
 print("🔍 MATERIAIS COM PIOR COMPLETUDE (TOP 20)")
 print("="*80 + "\n")
 
-# Calcular completude por material (linha)
-completude_por_material = (1 - df[campos_criticos].isnull().sum(axis=1) / len(campos_criticos)) * 100
-df['completude_score'] = completude_por_material
-
-# Top 20 piores - calcular vazios por material
-df['vazios_count'] = df[campos_criticos].isnull().sum(axis=1)
-piores = df.nlargest(20, 'vazios_count')[
+# Top 20 piores (mantido lote a lote): vazios = campos críticos nulos na linha
+piores = perfil_completude.piores.copy()
+piores.insert(3, 'completude_score', (1 - piores['vazios_count'] / len(campos_criticos)) * 100)
+piores = piores[
     ['codigo_material', 'descricao', 'categoria', 'completude_score', 'vazios_count']
 ]
 
 print("Materiais prioritários para correção:\n")
 print(piores.to_string(index=False))
 
+# Score ponderado (crítico 3, importante 2, complementar 1) a partir do
+# histograma acumulado nos lotes: registros por valor de score e categoria
+dist_scores = perfil_completude.distribuicao_scores()
+dist_scores['classe'] = classificar_faixas(dist_scores['score'], FAIXAS_SCORE, 'D - Incompleto')
+score_ponderado_medio = (dist_scores['score'] * dist_scores['qtd']).sum() / total_registros
+
+print(f"\nScore ponderado por registro (média {score_ponderado_medio:.1f}%):\n")
+for classe, qtd in dist_scores.groupby('classe')['qtd'].sum().sort_index().items():
+    print(f"   {classe:<16s}: {qtd:>8,} ({qtd / total_registros * 100:5.1f}%)")
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 7. PLANO DE AÇÃO PRIORIZADO
 # ═══════════════════════════════════════════════════════════════════════════
@@ -315,7 +385,11 @@ output_file = 'data/processed/completude.csv'
 df_completude.to_csv(output_file, index=False, encoding='utf-8-sig')
 
 print(f"✅ Relatório salvo: {output_file}")
-print(f"   {len(df_completude)} campos analisados\n")
+print(f"   {len(df_completude)} campos analisados")
+
+output_padroes = 'data/processed/completude_padroes.csv'
+padroes.drop(columns='mascara').to_csv(output_padroes, index=False, encoding='utf-8-sig')
+print(f"✅ Padrões de ausência salvos: {output_padroes}\n")
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 9. VISUALIZAÇÕES
@@ -418,32 +492,24 @@ plt.savefig('visualizations/02_completude_detalhado.png', dpi=150, bbox_inches='
 print("✅ Gráfico salvo: visualizations/02_completude_detalhado.png")
 plt.close()
 
-# FIGURA 2: Heatmap Completude (amostra)
+# FIGURA 2: Heatmap Completude (padrões de ausência dos campos críticos)
+# Uma linha por padrão distinto com a sua contagem: o tamanho da figura não
+# depende do número de registros
 fig, ax = plt.subplots(figsize=(14, 10))
 
-# Pegar amostra estratificada (20 materiais de cada faixa de completude)
-df_sorted = df.sort_values('completude_score')
-n_por_faixa = 20
-amostra_idx = []
-amostra_idx.extend(df_sorted.head(n_por_faixa).index.tolist())  # Piores
-amostra_idx.extend(df_sorted.iloc[len(df)//2-n_por_faixa//2:len(df)//2+n_por_faixa//2].index.tolist())  # Médios
-amostra_idx.extend(df_sorted.tail(n_por_faixa).index.tolist())  # Melhores
+padroes_criticos = padroes_principais(projetar_perfil(perfil, campos, campos_criticos),
+                                      campos_criticos, n=30)
+matriz_heatmap = matriz_padroes(padroes_criticos, campos_criticos)
 
-df_amostra = df.loc[amostra_idx, campos_criticos].isnull()
-
-# Criar heatmap
-sns.heatmap(df_amostra.T, cmap='RdYlGn_r', cbar_kws={'label': 'Campo Vazio'}, 
+sns.heatmap(matriz_heatmap, cmap='RdYlGn_r', vmin=0, vmax=1, cbar_kws={'label': 'Campo Vazio'},
             ax=ax, linewidths=0.5, linecolor='gray')
-ax.set_title('Heatmap de Completude - Amostra Estratificada (60 materiais)\nVermelho = Vazio | Verde = Preenchido', 
+ax.set_title(f'Heatmap de Completude - {len(padroes_criticos)} Padrões de Ausência mais Frequentes '
+             f'({padroes_criticos["pct"].sum():.1f}% dos materiais)\nVermelho = Vazio | Verde = Preenchido',
              fontweight='bold', fontsize=14, pad=15)
-ax.set_xlabel('Material (índice)', fontweight='bold', fontsize=11)
-ax.set_ylabel('Campo', fontweight='bold', fontsize=11)
+ax.set_xlabel('Campo', fontweight='bold', fontsize=11)
+ax.set_ylabel('Padrão (qtd de materiais)', fontweight='bold', fontsize=11)
 ax.set_yticklabels(ax.get_yticklabels(), rotation=0)
-
-# Adicionar legendas das faixas
-ax.text(10, -1.5, 'PIORES (0-33%)', ha='center', fontweight='bold', color='red')
-ax.text(30, -1.5, 'MÉDIOS (33-66%)', ha='center', fontweight='bold', color='orange')
-ax.text(50, -1.5, 'MELHORES (66-100%)', ha='center', fontweight='bold', color='green')
+ax.set_xticklabels(ax.get_xticklabels(), rotation=30, ha='right')
 
 plt.tight_layout()
 plt.savefig('visualizations/02_heatmap_completude_full.png', dpi=150, bbox_inches='tight')
@@ -458,9 +524,10 @@ print("\n" + "="*80)
 print("📊 RESUMO EXECUTIVO - ANÁLISE DE COMPLETUDE")
 print("="*80 + "\n")
 
-print(f"Total de materiais analisados: {len(df):,}")
-print(f"Total de campos analisados: {len(df.columns)}")
+print(f"Total de materiais analisados: {total_registros:,}")
+print(f"Total de campos analisados: {len(campos)}")
 print(f"\n📊 SCORE MÉDIO GERAL: {completude_media:.2f}%")
+print(f"📊 SCORE PONDERADO MÉDIO (por registro): {score_ponderado_medio:.1f}%")
 
 # Campos 100% completos
 campos_100 = df_completude[df_completude['Completude %'] == 100]['Campo'].tolist()
@@ -498,8 +565,12 @@ print(f"   → Relatório completo com {len(df_completude)} campos")
 print(f"   → Priorizado por criticidade e completude")
 print(f"\n📊 visualizations/02_completude_detalhado.png")
 print(f"   → 4 gráficos: campos, criticidade, impacto, categorias")
+print(f"\n📄 {ARQUIVO_ROLLUP}")
+print(f"   → Completude por categoria × responsável × centro de custo × status (cache)")
+print(f"\n📄 data/processed/completude_padroes.csv")
+print(f"   → Top {len(padroes)} padrões de campos vazios (qtd e %)")
 print(f"\n📊 visualizations/02_heatmap_completude_full.png")
-print(f"   → Heatmap visual (vermelho = vazio, verde = completo)")
+print(f"   → Heatmap dos padrões de ausência (vermelho = vazio, verde = completo)")
 
 print("\n" + "="*80)
 print("✅ ANÁLISE DE COMPLETUDE COMPLETA!")
@@ -14,6 +14,8 @@ import os
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.completude import classificar_faixas, score_completude
+
 # ─────────────────────────────────────────────────────────────
 # 1. CARREGAR DADOS
 # ─────────────────────────────────────────────────────────────
@@ -166,24 +168,13 @@ for c in df.columns:
 
 peso_total = sum(pesos.values())
 
-def calcular_score(row):
-    pts = 0
-    for col, peso in pesos.items():
-        val = row[col]
-        if pd.notna(val) and str(val).strip() != '':
-            pts += peso
-    return round(pts / peso_total * 100, 1)
-
-df['score_completude'] = df.apply(calcular_score, axis=1)
+# Matriz preenchido (notna + texto não vazio) @ vetor de pesos, sem apply linha a linha
+df['score_completude'] = score_completude(df, pesos)
 
 # Classificar registros
-def classificar_score(s):
-    if s >= 90:   return 'A - Completo'
-    elif s >= 70: return 'B - Bom'
-    elif s >= 50: return 'C - Regular'
-    else:         return 'D - Incompleto'
-
-df['classe_completude'] = df['score_completude'].apply(classificar_score)
+FAIXAS_COMPLETUDE = [(90, 'A - Completo'), (70, 'B - Bom'), (50, 'C - Regular')]
+df['classe_completude'] = classificar_faixas(df['score_completude'], FAIXAS_COMPLETUDE,
+                                             'D - Incompleto')
 
 dist = df['classe_completude'].value_counts().sort_index()
 score_medio = df['score_completude'].mean()
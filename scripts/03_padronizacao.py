@@ -22,6 +22,10 @@ import re
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.categorias import COLUNAS_CATEGORICAS, memoria_mb, normalizar, variantes
+from mdm.multipadrao import MultiPadrao
+from mdm.qualidade_texto import VarreduraTexto, resumo_por_campo, tem_texto, varrer_texto
+
 # ─────────────────────────────────────────────────────────────
 # 1. CARREGAR DADOS
 # ─────────────────────────────────────────────────────────────
@@ -76,19 +80,20 @@ print("─"*62)
 excluir = ['codigo_material','data_cadastro','ultima_movimentacao','localizacao_fisica','centro_custo','ncm']
 colunas_texto = [c for c in df.columns if str(df[c].dtype) in ('object','string','str') and c not in excluir]
 if not colunas_texto:
-    colunas_texto = [c for c in df.columns if df[c].apply(lambda x: isinstance(x, str)).any() and c not in excluir]
-# REMOVIDO
-def tipo_caixa(valor):
-    if pd.isna(valor):     return 'NULO'
-    v = str(valor).strip()
-    if v == v.upper():     return 'MAIÚSCULA'
-    if v == v.lower():     return 'minúscula'
-    if v == v.title():     return 'Title Case'
-    return 'Mista Irregular'
+    colunas_texto = [c for c in df.columns if tem_texto(df[c]) and c not in excluir]
+
+# Uma varredura por coluna: todas as verificações sobre os valores distintos
+varreduras = varrer_texto(df, colunas_texto)
+
+def varredura(col):
+    """Varredura de uma coluna (reaproveitada entre as seções)"""
+    if col not in varreduras:
+        varreduras[col] = VarreduraTexto(df[col])
+    return varreduras[col]
 
 resultado_caixa = []
 for col in colunas_texto:
-    dist = df[col].dropna().apply(tipo_caixa).value_counts()
+    dist = varreduras[col].distribuicao_caixa()
     dominante = dist.index[0] if len(dist) > 0 else 'N/A'
     inconsistentes = dist[dist.index != dominante].sum() if len(dist) > 1 else 0
     pct_inconsist = inconsistentes / total * 100
@@ -122,35 +127,20 @@ print("\n" + "─"*62)
 print("  MÉTODO 2: ESPAÇOS EXTRAS E CARACTERES INDESEJADOS")
 print("─"*62)
 
-resultado_espacos = []
-for col in colunas_texto:
-    serie = df[col].dropna().astype(str)
-
-    espaco_inicio   = serie.apply(lambda x: x != x.lstrip()).sum()
-    espaco_fim      = serie.apply(lambda x: x != x.rstrip()).sum()
-    espaco_duplo    = serie.apply(lambda x: '  ' in x).sum()
-    char_especial   = serie.apply(lambda x: bool(re.search(r'[!@#$%^&*(){}\[\]|\\<>]', x))).sum()
-    numero_inicio   = serie.apply(lambda x: bool(re.match(r'^\d', x))).sum()
-
-    total_prob = espaco_inicio + espaco_fim + espaco_duplo + char_especial
-
-    resultado_espacos.append({
-        'campo':         col,
-        'esp_inicio':    espaco_inicio,
-        'esp_fim':       espaco_fim,
-        'esp_duplo':     espaco_duplo,
-        'char_especial': char_especial,
-        'num_inicio':    numero_inicio,
-        'total_prob':    total_prob,
-    })
-
-df_esp = pd.DataFrame(resultado_espacos).sort_values('total_prob', ascending=False)
+df_esp = resumo_por_campo(varreduras)[['esp_inicio','esp_fim','esp_duplo','char_especial','num_inicio']]
+df_esp['total_prob'] = df_esp[['esp_inicio','esp_fim','esp_duplo','char_especial']].sum(axis=1)
+df_esp = df_esp.rename_axis('campo').reset_index().sort_values('total_prob', ascending=False)
 
 print(f"\n  {'CAMPO':<24} {'ESP.INÍCIO':>10} {'ESP.FIM':>8} {'ESP.DUPLO':>10} {'CHAR ESP':>9} {'TOTAL':>7}")
 print("  " + "─"*72)
 for _, r in df_esp.iterrows():
     print(f"  {r['campo']:<24} {r['esp_inicio']:>10,} {r['esp_fim']:>8,} {r['esp_duplo']:>10,} {r['char_especial']:>9,} {r['total_prob']:>7,}")
 
+# Matriz por linha: registros com ao menos um problema em qualquer campo texto
+problemas_linha = pd.concat([varreduras[c].matriz(['esp_inicio','esp_fim','esp_duplo','char_especial'])
+                             for c in colunas_texto], axis=1).any(axis=1)
+print(f"\n  Registros com espaço/caractere indesejado em algum campo: {problemas_linha.sum():,}")
+
 # ─────────────────────────────────────────────────────────────
 # 4. MÉTODO 3 — INCONSISTÊNCIA DE VALORES CATEGÓRICOS
 # ─────────────────────────────────────────────────────────────
@@ -158,27 +148,18 @@ print("\n" + "─"*62)
 print("  MÉTODO 3: INCONSISTÊNCIA DE VALORES CATEGÓRICOS")
 print("─"*62)
 
-colunas_cat = ['categoria', 'unidade_medida', 'status',
-               'fornecedor_principal', 'responsavel_cadastro']
-colunas_cat = [c for c in colunas_cat if c in df.columns]
+colunas_cat = [c for c in COLUNAS_CATEGORICAS if c in df.columns]
 
 resultado_cat = []
 for col in colunas_cat:
-    serie_orig = df[col].dropna().astype(str)
-    serie_norm = serie_orig.str.strip().str.upper()
+    # Grupos que seriam unificados (normalização só nos valores distintos)
+    grupos = variantes(df[col], 'strip', 'upper')
 
-    n_orig = serie_orig.nunique()
-    n_norm = serie_norm.nunique()
+    n_orig = sum(len(v) for v in grupos.values())
+    n_norm = len(grupos)
     reduziu = n_orig - n_norm
     pct_red = reduziu / n_orig * 100 if n_orig > 0 else 0
 
-    # Grupos que seriam unificados
-    grupos = {}
-    for val_orig, val_norm in zip(serie_orig, serie_norm):
-        if val_norm not in grupos:
-            grupos[val_norm] = set()
-        grupos[val_norm].add(val_orig)
-
     grupos_problematicos = {k: v for k, v in grupos.items() if len(v) > 1}
 
     resultado_cat.append({
@@ -199,8 +180,8 @@ for _, r in df_cat_pad.iterrows():
     st = "✅" if r['reduziu'] == 0 else "🔴"
     print(f"  {st} {r['campo']:<22} {r['valores_antes']:>8,} {r['valores_depois']:>8,} {r['reduziu']:>8,} {r['pct_reducao']:>6.1f}%  {r['grupos_prob']} grupos")
     # Mostrar exemplos dos grupos problemáticos
-    for chave, variantes in list(r['exemplos'].items())[:3]:
-        variantes_str = ' | '.join(sorted(variantes))
+    for chave, originais in list(r['exemplos'].items())[:3]:
+        variantes_str = ' | '.join(sorted(originais))
         print(f"       → '{chave}': {variantes_str}")
 
 # ─────────────────────────────────────────────────────────────
@@ -224,7 +205,7 @@ if 'descricao' in df.columns:
         if re.match(r'^[a-z]', d):           return 'início minúsculo'
         return 'Padrão irregular'
 
-    df['_padrao_desc'] = desc.apply(classifica_descricao)
+    df['_padrao_desc'] = varredura('descricao').aplicar(classifica_descricao)
     dist_padrao = df['_padrao_desc'].value_counts()
 
     print(f"\n  {'PADRÃO':<28} {'QTD':>8} {'%':>8}")
@@ -245,12 +226,16 @@ if 'descricao' in df.columns:
         'aço': ['aço','AÇO','Aço'],
     }
 
+    # Todas as variantes num único autômato: uma varredura por descrição distinta
+    todas_variantes = [var for variantes in abreviacoes_comuns.values() for var in variantes]
+    linhas_variante = dict(zip(todas_variantes, MultiPadrao(todas_variantes).contar_linhas(desc)))
+
     print(f"\n  PREPOSIÇÕES/MATERIAIS COM CAIXA INCONSISTENTE:")
     print("  " + "─"*55)
     for termo, variantes in abreviacoes_comuns.items():
         contagens = {}
         for var in variantes:
-            cnt = desc.str.contains(var, regex=False).sum()
+            cnt = linhas_variante[var]
             if cnt > 0:
                 contagens[var] = cnt
         if len(contagens) > 1:
@@ -273,44 +258,47 @@ correcoes_aplicadas = []
 # Correção 1: Remover espaços extras em todas colunas texto
 for col in colunas_texto:
     if col in df_corrigido.columns:
-        antes = df_corrigido[col].dropna().apply(lambda x: str(x) != str(x).strip()).sum()
-        df_corrigido[col] = df_corrigido[col].astype(str).str.strip()
+        antes = varredura(col).matriz(['esp_inicio','esp_fim']).any(axis=1).sum()
+        df_corrigido[col] = normalizar(df_corrigido[col], 'strip')
         if antes > 0:
             correcoes_aplicadas.append(f"✅ {col}: {antes:,} espaços extras removidos")
 
 # Correção 2: Padronizar status para Title Case
 if 'status' in df_corrigido.columns:
     antes = df_corrigido['status'].nunique()
-    df_corrigido['status_padrao'] = df_corrigido['status'].str.strip().str.title()
+    df_corrigido['status_padrao'] = normalizar(df_corrigido['status'], 'strip', 'title')
     depois = df_corrigido['status_padrao'].nunique()
     correcoes_aplicadas.append(f"✅ status: {antes} variações → {depois} (redução de {antes-depois})")
 
 # Correção 3: Padronizar categoria para Title Case
 if 'categoria' in df_corrigido.columns:
     antes = df_corrigido['categoria'].nunique()
-    df_corrigido['categoria_padrao'] = df_corrigido['categoria'].str.strip().str.title()
+    df_corrigido['categoria_padrao'] = normalizar(df_corrigido['categoria'], 'strip', 'title')
     depois = df_corrigido['categoria_padrao'].nunique()
     correcoes_aplicadas.append(f"✅ categoria: {antes} variações → {depois} (redução de {antes-depois})")
 
 # Correção 4: Padronizar unidade de medida para MAIÚSCULA
 if 'unidade_medida' in df_corrigido.columns:
     antes = df_corrigido['unidade_medida'].dropna().nunique()
-    df_corrigido['uom_padrao'] = df_corrigido['unidade_medida'].str.strip().str.upper()
+    df_corrigido['uom_padrao'] = normalizar(df_corrigido['unidade_medida'], 'strip', 'upper')
     depois = df_corrigido['uom_padrao'].dropna().nunique()
     correcoes_aplicadas.append(f"✅ unidade_medida: {antes} variações → {depois} (redução de {antes-depois})")
 
 # Correção 5: Padronizar descrição para Title Case
 if 'descricao' in df_corrigido.columns:
-    antes_min = df_corrigido['descricao'].dropna().apply(
-        lambda x: str(x)[0].islower() if str(x) else False).sum()
-    df_corrigido['descricao_padrao'] = df_corrigido['descricao'].apply(
-        lambda x: str(x).strip().title() if pd.notna(x) else x)
+    antes_min = varredura('descricao').contagens()['inicio_minusculo']
+    df_corrigido['descricao_padrao'] = normalizar(df_corrigido['descricao'], 'strip', 'title')
     correcoes_aplicadas.append(f"✅ descricao: {antes_min:,} começando com minúscula corrigidas")
 
 print()
 for c in correcoes_aplicadas:
     print(f"  {c}")
 
+# Colunas padronizadas ficam categóricas: códigos inteiros + dicionário de valores
+colunas_mem = [c for c in colunas_cat if c in colunas_texto]
+print(f"\n  Memória de {', '.join(colunas_mem)}: "
+      f"{memoria_mb(df, colunas_mem):.2f} MB (texto) → {memoria_mb(df_corrigido, colunas_mem):.2f} MB (categórica)")
+
 # ─────────────────────────────────────────────────────────────
 # 7. IMPACTO FINANCEIRO
 # ─────────────────────────────────────────────────────────────
@@ -517,15 +505,15 @@ print("  ✅ 03_padronizacao.png gerado!")
 # Arquivo com todos os registros + flags de problemas
 df_export = df[['codigo_material','descricao','categoria','unidade_medida','status']].copy()
 
+def sim_nao(flags):
+    return np.where(flags, 'SIM', 'NAO')
+
 if 'descricao' in df.columns:
-    df_export['desc_inicio_minusculo'] = df['descricao'].dropna().reindex(df.index).apply(
-        lambda x: 'SIM' if pd.notna(x) and str(x) and str(x)[0].islower() else 'NAO')
+    df_export['desc_inicio_minusculo'] = sim_nao(varredura('descricao').matriz(['inicio_minusculo']).iloc[:, 0])
 if 'categoria' in df.columns:
-    df_export['categoria_inconsistente'] = df['categoria'].apply(
-        lambda x: 'SIM' if pd.notna(x) and str(x) != str(x).strip() else 'NAO')
+    df_export['categoria_inconsistente'] = sim_nao(varredura('categoria').matriz(['esp_inicio','esp_fim']).any(axis=1))
 if 'unidade_medida' in df.columns:
-    df_export['uom_nao_maiusculo'] = df['unidade_medida'].apply(
-        lambda x: 'SIM' if pd.notna(x) and str(x) != str(x).upper().strip() else 'NAO')
+    df_export['uom_nao_maiusculo'] = sim_nao(varredura('unidade_medida').matriz(['nao_maiusculo']).iloc[:, 0])
 
 df_export['total_problemas'] = (
     (df_export.get('desc_inicio_minusculo','NAO') == 'SIM').astype(int) +
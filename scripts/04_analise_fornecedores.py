@@ -23,6 +23,9 @@ from matplotlib.gridspec import GridSpec
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.cubo import hhi, obter_cubo, visao_fornecedores
+from mdm.fornecedores import IndiceFornecedores
+
 print("\n" + "="*70)
 print("📦 DIA 10 — ANÁLISE DE FORNECEDORES")
 print("="*70 + "\n")
@@ -71,29 +74,11 @@ print("="*70)
 print("📈 CURVA ABC DE FORNECEDORES")
 print("="*70 + "\n")
 
-# Agrupar por fornecedor
-df_fornecedores = df[df['fornecedor_principal'].notna()].groupby('fornecedor_principal').agg({
-    'codigo_material': 'count',
-    'preco_unitario': lambda x: (x * df.loc[x.index, 'estoque_atual']).sum()
-}).reset_index()
-
-df_fornecedores.columns = ['fornecedor', 'qtd_materiais', 'valor_total']
-
-# Ordenar por valor
-df_fornecedores = df_fornecedores.sort_values('valor_total', ascending=False)
-
-# Calcular percentual acumulado
-df_fornecedores['valor_acumulado'] = df_fornecedores['valor_total'].cumsum()
+# Curva ABC de fornecedores: cubo fornecedor × categoria × ABC × status em
+# cache (mdm.cubo), com os nomes já resolvidos pelo índice de fornecedores
+cubo = obter_cubo(_csv_path)
+df_fornecedores = visao_fornecedores(cubo)
 valor_total_fornecedores = df_fornecedores['valor_total'].sum()
-df_fornecedores['perc_acumulado'] = (df_fornecedores['valor_acumulado'] / valor_total_fornecedores) * 100
-
-# Classificação ABC
-df_fornecedores['classe_abc'] = df_fornecedores['perc_acumulado'].apply(
-    lambda x: 'A' if x <= 80 else ('B' if x <= 95 else 'C')
-)
-
-# Adicionar perc_valor a df_fornecedores (necessário para fornecedores_criticos)
-df_fornecedores['perc_valor'] = (df_fornecedores['valor_total'] / valor_total_fornecedores * 100).round(1)
 
 # Estatísticas ABC
 abc_stats = df_fornecedores.groupby('classe_abc').agg({
@@ -137,6 +122,14 @@ print(f"   Valor: R$ {fornecedor_maior['valor_total']:,.2f}")
 print(f"   % do total: {fornecedor_maior['valor_total']/valor_total_fornecedores*100:.1f}%")
 print(f"   Risco: ALTO (muita dependência!)\n")
 
+# Concentração (Herfindahl-Hirschman): 10.000 = um único fornecedor
+hhi_categorias = cubo.drop_duplicates('categoria').set_index('categoria')['hhi_categoria']
+print(f"Concentração do valor (HHI): {hhi(cubo):,.0f}")
+print(f"Categorias mais concentradas (HHI):")
+for cat, valor_hhi in hhi_categorias.sort_values(ascending=False).head(3).items():
+    print(f"   {cat:20s}: {valor_hhi:,.0f}")
+print()
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 5. MATERIAIS SEM FORNECEDOR (PROBLEMA)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -219,25 +212,36 @@ print("Padrão de caixa (upper/lower):")
 for padrao, qtd in caixa_dist.items():
     print(f"   {padrao:15s}: {qtd:,} ({qtd/len(df_com_fornecedor)*100:.1f}%)")
 
-# Variações do mesmo fornecedor
+# Variações do mesmo fornecedor: resolução de entidades com índice persistente
+# (caixa, acentos, pontuação, LTDA/S.A. e erros de digitação → cluster)
 print(f"\n🔍 Detectando variações do mesmo fornecedor:")
-fornecedor_normalizado = df_com_fornecedor['fornecedor_principal'].str.lower().str.strip()
-variações = fornecedor_normalizado.value_counts()
-fornecedores_originais = df_com_fornecedor['fornecedor_principal'].value_counts()
+indice_fornecedores = IndiceFornecedores.carregar()
+n_nomes = len(indice_fornecedores)
+resolvido = indice_fornecedores.resolver(df_com_fornecedor['fornecedor_principal'])
+if len(indice_fornecedores) > n_nomes:
+    # Só grava com nomes novos: o índice mais novo que o cubo invalida o cache
+    indice_fornecedores.salvar()
+df_com_fornecedor['cluster_fornecedor'] = resolvido['cluster']
+df_com_fornecedor['fornecedor_canonico'] = resolvido['nome_canonico']
+
+# Uma passada pelas linhas: qtd de materiais por (cluster, forma escrita)
+formas = (df_com_fornecedor.groupby(['cluster_fornecedor', 'fornecedor_canonico', 'fornecedor_principal'],
+                                    sort=False).size().rename('qtd').reset_index())
+formas['qtd_cluster'] = formas.groupby('cluster_fornecedor')['qtd'].transform('sum')
+formas['n_formas'] = formas.groupby('cluster_fornecedor')['qtd'].transform('size')
+formas = formas.sort_values('qtd_cluster', ascending=False, kind='stable')
+
+fornecedores_resolvidos = formas['cluster_fornecedor'].nunique()
+print(f"   {formas['fornecedor_principal'].nunique():,} nomes distintos → "
+      f"{fornecedores_resolvidos:,} fornecedores após resolução")
 
 duplicados_potenciais = 0
-for forn_norm, count_norm in variações.items():
-    # Ver quantas formas diferentes existem desse fornecedor
-    formas_diferentes = df_com_fornecedor[
-        df_com_fornecedor['fornecedor_principal'].str.lower().str.strip() == forn_norm
-    ]['fornecedor_principal'].unique()
-    
-    if len(formas_diferentes) > 1:
-        duplicados_potenciais += len(formas_diferentes) - 1
-        print(f"\n   {forn_norm.upper()}:")
-        for forma in formas_diferentes:
-            qtd = (df_com_fornecedor['fornecedor_principal'] == forma).sum()
-            print(f"      • '{forma}' ({qtd} materiais)")
+for (_, canonico), grupo in formas[formas['n_formas'] > 1].groupby(
+        ['cluster_fornecedor', 'fornecedor_canonico'], sort=False):
+    duplicados_potenciais += len(grupo) - 1
+    print(f"\n   {canonico.upper()}:")
+    for forma, qtd in zip(grupo['fornecedor_principal'], grupo['qtd']):
+        print(f"      • '{forma}' ({qtd} materiais)")
 
 if duplicados_potenciais > 0:
     print(f"\n⚠️ Identificadas {duplicados_potenciais} variações que podem ser consolidadas")
@@ -24,6 +24,13 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.envelhecimento import IndiceEnvelhecimento
+from mdm.movimentos import DIRETORIO_ENTRADA, LivroMovimentos
+
+# Giro real (livro de movimentações): giros/ano para Alto e Médio
+GIRO_ALTO = 4
+GIRO_MEDIO = 1
+
 print("\n" + "="*70)
 print("📦 DIA 11 — ANÁLISE DE MOVIMENTAÇÕES DE ESTOQUE")
 print("="*70 + "\n")
@@ -43,13 +50,31 @@ df['data_cadastro'] = pd.to_datetime(df['data_cadastro'])
 # Data referência (hoje)
 data_ref = datetime(2026, 2, 27)  # Data atual do projeto
 
-# Calcular dias sem movimento
-df['dias_sem_movimento'] = (data_ref - df['ultima_movimentacao']).dt.days
+# Livro de movimentações (mdm.movimentos): com transações registradas, giro,
+# cobertura e estoque morto saem das entradas/saídas dos últimos 365 dias.
+# Exports do ERP deixados em data/movimentos_entrada/ entram no livro aqui.
+livro = LivroMovimentos()
+for arquivo, linhas in livro.importar_diretorio(DIRETORIO_ENTRADA).items():
+    print(f"📥 Importado para o livro: {arquivo} ({linhas:,} movimentações)")
+usa_livro = len(livro.dias()) > 0
+if usa_livro:
+    estoque_codigo = df.drop_duplicates('codigo_material').set_index('codigo_material')['estoque_atual']
+    indicadores = livro.indicadores(estoque_codigo, data_ref)
+    df = df.join(indicadores.rename(columns={'ultima_movimentacao': 'ultima_mov_livro'}), on='codigo_material')
+    df['ultima_movimentacao'] = df[['ultima_movimentacao', 'ultima_mov_livro']].max(axis=1)
+    print(f"📒 Livro de movimentações: {len(livro):,} transações em {len(livro.dias()):,} dias\n")
+else:
+    print("📒 Livro de movimentações vazio: giro estimado pelos dias sem movimento\n")
 
 # Calcular valor em estoque
 if 'valor_estoque' not in df.columns:
     df['valor_estoque'] = df['preco_unitario'] * df['estoque_atual']
 
+# Dias sem movimento e faixas de aging: índice por data de referência
+# (mdm.envelhecimento) com qtd/valor por faixa já agregados
+indice_aging = IndiceEnvelhecimento.de_datas(df['ultima_movimentacao'], df['valor_estoque'], data_ref)
+df['dias_sem_movimento'] = indice_aging.dias()
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 2. ESTATÍSTICAS BÁSICAS MOVIMENTAÇÕES
 # ═══════════════════════════════════════════════════════════════════════════
@@ -108,18 +133,9 @@ print("\n" + "="*70)
 print("📅 DISTRIBUIÇÃO POR FAIXAS DE TEMPO SEM MOVIMENTO")
 print("="*70 + "\n")
 
-# Criar faixas
-bins = [0, 30, 90, 180, 365, 730, df['dias_sem_movimento'].max()+1]
-labels = ['0-30 dias', '31-90 dias', '91-180 dias', '181-365 dias', 
-          '366-730 dias', '>730 dias']
-df['faixa_movimento'] = pd.cut(df['dias_sem_movimento'], bins=bins, labels=labels, right=False)
-
-# Contar por faixa
-faixa_counts = df.groupby('faixa_movimento').agg({
-    'codigo_material': 'count',
-    'valor_estoque': 'sum'
-}).reset_index()
-faixa_counts.columns = ['faixa', 'qtd_materiais', 'valor_total']
+# Faixas e contagens por faixa vêm do índice de aging
+df['faixa_movimento'] = indice_aging.faixas()
+faixa_counts = indice_aging.resumo()
 
 print("Faixa de Tempo          Qtd Materiais    Valor Total       % Materiais")
 print("─"*70)
@@ -140,9 +156,16 @@ print("="*70 + "\n")
 # Giro médio: movimento moderado (30-180 dias)
 # Giro baixo: movimento lento (> 180 dias)
 
-df['classificacao_giro'] = df['dias_sem_movimento'].apply(
-    lambda x: 'Alto' if x < 30 else ('Médio' if x < 180 else 'Baixo')
-)
+if usa_livro:
+    # Giro real: saídas do ano / estoque médio reconstruído pelo livro
+    df['classificacao_giro'] = np.select(
+        [df['giro_anual'] >= GIRO_ALTO, df['giro_anual'] >= GIRO_MEDIO], ['Alto', 'Médio'], default='Baixo')
+    regra_giro_alto = f"≥{GIRO_ALTO} giros/ano"
+else:
+    df['classificacao_giro'] = df['dias_sem_movimento'].apply(
+        lambda x: 'Alto' if x < 30 else ('Médio' if x < 180 else 'Baixo')
+    )
+    regra_giro_alto = "<30 dias"
 
 giro_stats = df.groupby('classificacao_giro').agg({
     'codigo_material': 'count',
@@ -157,6 +180,13 @@ print("─"*75)
 for idx, row in giro_stats.sort_values('giro').iterrows():
     print(f"{row['giro']:18s} {row['qtd']:6,d}        {row['perc_qtd']:5.1f}%   R$ {row['valor']:12,.2f}   {row['perc_valor']:5.1f}%")
 
+if usa_livro:
+    morto = df[df['estoque_morto']]
+    print(f"\nGiro anual mediano: {df['giro_anual'].median():.2f} | "
+          f"Cobertura mediana: {df['cobertura_dias'].median():,.0f} dias")
+    print(f"Estoque morto (sem saída em 365 dias): {len(morto):,} materiais | "
+          f"R$ {morto['valor_estoque'].sum():,.2f}")
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 6. ANÁLISE TEMPORAL - ÚLTIMA MOVIMENTAÇÃO
 # ═══════════════════════════════════════════════════════════════════════════
@@ -280,6 +310,8 @@ df_export = df[[
     'dias_sem_movimento', 'classificacao_giro', 'faixa_movimento',
     'valor_estoque', 'estoque_atual'
 ]].copy()
+if usa_livro:
+    df_export[['giro_anual', 'cobertura_dias', 'estoque_morto']] = df[['giro_anual', 'cobertura_dias', 'estoque_morto']]
 df_export = df_export.sort_values('dias_sem_movimento', ascending=False)
 df_export.to_csv('data/processed/movimentacoes_analise.csv', index=False, encoding='utf-8-sig')
 print("✅ Arquivo salvo: data/processed/movimentacoes_analise.csv")
@@ -336,7 +368,7 @@ for i, (bar, val) in enumerate(zip(bars, faixa_counts['qtd_materiais'])):
 # 3. Classificação Giro
 ax3 = fig.add_subplot(gs[1, 1])
 giro_order = ['Alto', 'Médio', 'Baixo']
-giro_stats_sorted = giro_stats.set_index('giro').reindex(giro_order)
+giro_stats_sorted = giro_stats.set_index('giro').reindex(giro_order, fill_value=0)
 colors_giro = ['#27ae60', '#f39c12', '#e74c3c']
 bars = ax3.bar(range(len(giro_stats_sorted)), giro_stats_sorted['qtd'], 
                color=colors_giro, alpha=0.7, edgecolor='black')
@@ -399,8 +431,8 @@ Materiais Parados >365 dias:
 Capital Imobilizado:
 R$ {valor_parado:,.2f}
 
-Giro Alto (<30 dias):
-{giro_stats[giro_stats['giro']=='Alto']['qtd'].values[0]:,} materiais
+Giro Alto ({regra_giro_alto}):
+{giro_stats_sorted.loc['Alto', 'qtd']:,} materiais
 
 Materiais Críticos:
 {len(criticos):,} (parados + alto valor)
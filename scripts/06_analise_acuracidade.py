@@ -23,6 +23,11 @@ from matplotlib.gridspec import GridSpec
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.acuracidade import TOTAL, contagem_fisica, intervalos, simular_acuracidade
+
+# Replicações da simulação Monte Carlo (distribuição da acuracidade)
+N_REPLICACOES = 1000
+
 print("\n" + "="*70)
 print("📊 DIA 12 — ANÁLISE DE ACURACIDADE DE ESTOQUE")
 print("="*70 + "\n")
@@ -47,41 +52,13 @@ print("="*70)
 print("🔄 SIMULANDO CONTAGEM FÍSICA COM DIVERGÊNCIAS REALISTAS")
 print("="*70 + "\n")
 
-np.random.seed(42)
-
 # Copiar estoque sistema
 df['estoque_sistema'] = df['estoque_atual'].copy()
 
-# Simular estoque físico com divergências
-def simular_estoque_fisico(row):
-    sistema = row['estoque_sistema']
-    categoria = row['categoria']
-    
-    # Probabilidade de divergência por categoria (algumas mais problemáticas)
-    categorias_problematicas = ['Ferramentas', 'Eletronico', 'Escritório']
-    
-    if categoria in categorias_problematicas:
-        # 30% chance divergência significativa
-        if np.random.random() < 0.30:
-            # Divergência -20% a +10% (mais perdas que sobras)
-            divergencia = np.random.uniform(-0.20, 0.10)
-        else:
-            # Divergência pequena -5% a +5%
-            divergencia = np.random.uniform(-0.05, 0.05)
-    else:
-        # 15% chance divergência
-        if np.random.random() < 0.15:
-            divergencia = np.random.uniform(-0.15, 0.05)
-        else:
-            divergencia = np.random.uniform(-0.03, 0.03)
-    
-    fisico = int(sistema * (1 + divergencia))
-    # Estoque físico não pode ser negativo
-    fisico = max(0, fisico)
-    
-    return fisico
-
-df['estoque_fisico'] = df.apply(simular_estoque_fisico, axis=1)
+# Simular estoque físico com divergências (categorias problemáticas: mais
+# divergência e mais perdas que sobras). Mesma sequência do antigo
+# np.random.seed(42) + df.apply, sorteada de uma vez.
+df['estoque_fisico'] = contagem_fisica(df['estoque_sistema'], df['categoria'])
 
 # Calcular divergência
 df['divergencia_qtd'] = df['estoque_fisico'] - df['estoque_sistema']
@@ -125,6 +102,30 @@ print(f"\n🎯 ACURACIDADE GERAL:")
 print(f"   Quantidade: {acuracidade_qtd:.2f}%")
 print(f"   Valor: {acuracidade_valor:.2f}%\n")
 
+# ═══════════════════════════════════════════════════════════════════════════
+# 3.1 DISTRIBUIÇÃO DA ACURACIDADE (MONTE CARLO)
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("="*70)
+print(f"🎲 ACURACIDADE EM {N_REPLICACOES:,} CONTAGENS SIMULADAS (MONTE CARLO)")
+print("="*70 + "\n")
+
+mc_qtd, mc_valor = simular_acuracidade(df['estoque_sistema'], df['preco_unitario'],
+                                       df['categoria'], n_replicacoes=N_REPLICACOES)
+ic_qtd, ic_valor = intervalos(mc_qtd), intervalos(mc_valor)
+df_monte_carlo = pd.concat([ic_qtd.add_prefix('qtd_'), ic_valor.add_prefix('valor_')], axis=1)
+df_monte_carlo.index.name = 'categoria'
+
+print("Categoria            Acur. Qtd (IC 95%)          Acur. Valor (IC 95%)")
+print("─"*75)
+for cat, row in df_monte_carlo.iterrows():
+    print(f"{cat:18s}   {row['qtd_media']:6.2f}% [{row['qtd_ic_inferior']:6.2f}–{row['qtd_ic_superior']:6.2f}]"
+          f"   {row['valor_media']:6.2f}% [{row['valor_ic_inferior']:6.2f}–{row['valor_ic_superior']:6.2f}]")
+
+print(f"\nContagem publicada neste relatório: {acuracidade_qtd:.2f}% (qtd) | {acuracidade_valor:.2f}% (valor)")
+print(f"IC 95% geral: {ic_qtd.loc[TOTAL, 'ic_inferior']:.2f}–{ic_qtd.loc[TOTAL, 'ic_superior']:.2f}% (qtd) | "
+      f"{ic_valor.loc[TOTAL, 'ic_inferior']:.2f}–{ic_valor.loc[TOTAL, 'ic_superior']:.2f}% (valor)\n")
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 4. ANÁLISE DE DIVERGÊNCIAS POSITIVAS E NEGATIVAS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -346,6 +347,10 @@ if len(criticos) > 0:
                           index=False, encoding='utf-8-sig')
     print("✅ Arquivo salvo: data/processed/materiais_criticos_acuracidade.csv")
 
+# CSV distribuição Monte Carlo por categoria
+df_monte_carlo.round(4).to_csv('data/processed/acuracidade_monte_carlo.csv', encoding='utf-8-sig')
+print("✅ Arquivo salvo: data/processed/acuracidade_monte_carlo.csv")
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 11. VISUALIZAÇÕES
 # ═══════════════════════════════════════════════════════════════════════════
@@ -502,6 +507,7 @@ print("📁 Arquivos gerados:")
 print("   • data/processed/acuracidade_analise.csv")
 if len(criticos) > 0:
     print("   • data/processed/materiais_criticos_acuracidade.csv")
+print("   • data/processed/acuracidade_monte_carlo.csv")
 print("   • visualizations/06_acuracidade.png")
 
 print("\n🎯 Próximo: DIA 13 - Power BI (Dashboard Interativo)\n")
@@ -14,6 +14,8 @@ from matplotlib.gridspec import GridSpec
 import os, warnings
 warnings.filterwarnings('ignore')
 
+from mdm.cubo import obter_cubo, visao_cubo
+
 # ── CARREGAR DADOS ────────────────────────────────────
 # ── CAMINHO DO CSV ──────────────────────────────────
 # Se der erro, edite o caminho abaixo com o local do seu arquivo
@@ -23,6 +25,7 @@ df = None
 for p in [CSV_PADRAO, 'data/raw/materiais_raw.csv', '../data/raw/materiais_raw.csv', 'materiais_raw.csv']:
     if os.path.exists(p):
         df = pd.read_csv(p)
+        arquivo_csv = p
         print(f'CSV carregado: {p}')
         break
 
@@ -35,6 +38,9 @@ df['dias_parado']         = (pd.Timestamp('2026-02-28') - df['ultima_movimentaca
 
 os.makedirs('visualizations', exist_ok=True)
 
+# Valor por categoria, curva ABC e fornecedor: cubo em cache (mdm.cubo)
+cubo = obter_cubo(arquivo_csv)
+
 # ── PALETA ────────────────────────────────────────────
 BG     = '#0b1220'
 PANEL  = '#111927'
@@ -99,7 +105,7 @@ for val, lbl, sub, cor, xpos in kpis:
 # ── GRÁFICO 1: Categorias (barras horizontais) ─────────
 ax1 = fig.add_subplot(gs[1, :2])
 styled_ax(ax1)
-cats  = df.groupby('categoria')['valor_estoque'].sum().sort_values() / 1e6
+cats  = visao_cubo(cubo, ['categoria'])['valor_estoque'].sort_values() / 1e6
 cores = [PALETTE[i % len(PALETTE)] for i in range(len(cats))]
 bars  = ax1.barh(cats.index, cats.values, color=cores, alpha=0.85, height=0.7)
 for bar, val in zip(bars, cats.values):
@@ -127,11 +133,7 @@ ax2.set_title('Distribuição por Status', fontsize=12, pad=10)
 # ── GRÁFICO 3: ABC ────────────────────────────────────
 ax3 = fig.add_subplot(gs[2, 0])
 styled_ax(ax3)
-df_s = df.sort_values('valor_estoque', ascending=False).reset_index(drop=True)
-total_v = df_s['valor_estoque'].sum()
-df_s['pct_ac'] = df_s['valor_estoque'].cumsum() / total_v * 100
-df_s['abc'] = df_s['pct_ac'].apply(lambda x: 'A' if x<=80 else ('B' if x<=95 else 'C'))
-abc = df_s.groupby('abc').agg(qtd=('codigo_material','count'), valor=('valor_estoque','sum'))
+abc = visao_cubo(cubo, ['curva_abc']).rename(columns={'qtd_materiais': 'qtd', 'valor_estoque': 'valor'})
 abc_cores = {'A': C['red'], 'B': C['orange'], 'C': C['green']}
 x_pos = np.arange(len(abc))
 w = 0.35
@@ -152,7 +154,7 @@ for b in b1:
 # ── GRÁFICO 4: Fornecedores ───────────────────────────
 ax4 = fig.add_subplot(gs[2, 1])
 styled_ax(ax4)
-forn = df.groupby('fornecedor_principal')['valor_estoque'].sum().dropna().sort_values() / 1e6
+forn = visao_cubo(cubo, ['fornecedor'], incluir_vazio=False)['valor_estoque'].sort_values() / 1e6
 ax4.barh(forn.index, forn.values, color=C['orange'], alpha=0.85)
 for i, val in enumerate(forn.values):
     ax4.text(val + 0.5, i, f'{val:.0f}M', va='center', color=TEXT, fontsize=7)
@@ -20,6 +20,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import os, warnings
+from mdm.atributos import extrair_atributos
+from mdm.classificacao import ClassificadorPalavrasChave
 warnings.filterwarnings('ignore')
 
 # ─────────────────────────────────────────────────────────────────
@@ -173,32 +175,23 @@ KEYWORD_MAP = {
     'Pneumático' : ['pneu', 'correia'],
 }
 
-resultado_kw = []
-df_desc_lower = df['descricao'].str.lower().fillna('')
-
-for cat_esperada, keywords in KEYWORD_MAP.items():
-    for kw in keywords:
-        mask_kw  = df_desc_lower.str.contains(kw, na=False)
-        mask_cat = df['categoria'] != cat_esperada
-        suspeitos = df[mask_kw & mask_cat]
-
-        if len(suspeitos) > 0:
-            for _, row in suspeitos.iterrows():
-                resultado_kw.append({
-                    'codigo_material': row['codigo_material'],
-                    'descricao':       row['descricao'],
-                    'categoria_atual': row['categoria'],
-                    'categoria_sugerida': cat_esperada,
-                    'palavra_chave':   kw,
-                    'valor_estoque':   row['valor_estoque'],
-                    'preco_unitario':  row['preco_unitario'],
-                })
-
-df_suspeitos = pd.DataFrame(resultado_kw).drop_duplicates(
-    subset=['codigo_material']).sort_values('valor_estoque', ascending=False)
+# Todas as palavras-chave num único autômato: cada descrição é varrida uma
+# vez e cada linha recebe a 1ª palavra (ordem do mapa) de outra categoria
+classificacao_kw = ClassificadorPalavrasChave(KEYWORD_MAP).classificar(df['descricao'], df['categoria'])
+df_kw = df.join(classificacao_kw)
+df_kw = df_kw[df_kw['indice_palavra'] >= 0].rename(columns={'categoria': 'categoria_atual'})
+
+# Uma sugestão por código: a da palavra de maior prioridade (e 1ª linha)
+df_suspeitos = (df_kw.sort_values('indice_palavra', kind='stable')
+                .drop_duplicates(subset=['codigo_material'])
+                [['codigo_material', 'descricao', 'categoria_atual', 'categoria_sugerida', 'palavra_chave',
+                  'valor_estoque', 'preco_unitario', 'n_categorias', 'confirma_atual', 'conflito']]
+                .sort_values('valor_estoque', ascending=False))
 
 print(f"  Total de materiais suspeitos de má categorização: {len(df_suspeitos):,}")
 print(f"  Valor em estoque envolvido: R$ {df_suspeitos['valor_estoque'].sum():,.2f}")
+print(f"  Com palavras de 2+ categorias (conflito): {df_suspeitos['conflito'].sum():,} | "
+      f"também confirmam a categoria atual: {df_suspeitos['confirma_atual'].sum():,}")
 
 print(f"\n  {'CÓDIGO':<14} {'DESCRIÇÃO':<28} {'CAT.ATUAL':<14} {'CAT.SUGERIDA':<14} {'VALOR':>14}")
 print("  " + "─"*88)
@@ -214,6 +207,55 @@ print("  " + "─"*44)
 for cat, grp in df_suspeitos.groupby('categoria_sugerida'):
     print(f"  {cat:<20} {len(grp):>6,} {grp['valor_estoque'].sum():>15,.0f}")
 
+# ─────────────────────────────────────────────────────────────────
+# 5b. MÉTODO 5 — TIPO EXTRAÍDO × CATEGORIA
+# ─────────────────────────────────────────────────────────────────
+print("\n" + "─"*68)
+print("  MÉTODO 5: TIPO EXTRAÍDO × CATEGORIA")
+print("─"*68)
+print("  Cada descrição é separada em tipo / material / especificação;")
+print("  categoria rara para o tipo (< 10% dos registros) é suspeita\n")
+
+MIN_REGISTROS_TIPO = 10
+MAX_PARTICIPACAO = 0.10
+
+df_tipo = df[['codigo_material', 'descricao', 'categoria', 'valor_estoque']].join(
+    extrair_atributos(df['descricao']))
+df_tipo = df_tipo[df_tipo['tipo'] != '']
+
+# Join por igualdade: (tipo, categoria) → participação e categoria dominante do tipo
+tipo_cat = df_tipo.groupby(['tipo', 'categoria']).size().rename('qtd_tipo_categoria').reset_index()
+tipo_cat['qtd_tipo'] = tipo_cat.groupby('tipo')['qtd_tipo_categoria'].transform('sum')
+tipo_cat['participacao'] = tipo_cat['qtd_tipo_categoria'] / tipo_cat['qtd_tipo']
+dominante = (tipo_cat.sort_values(['tipo', 'qtd_tipo_categoria'], ascending=[True, False])
+                     .drop_duplicates('tipo').set_index('tipo')['categoria']
+                     .rename('categoria_sugerida'))
+
+df_tipo = df_tipo.merge(tipo_cat, on=['tipo', 'categoria']).join(dominante, on='tipo')
+df_tipo_suspeitos = (df_tipo[(df_tipo['qtd_tipo'] >= MIN_REGISTROS_TIPO) &
+                             (df_tipo['participacao'] < MAX_PARTICIPACAO)]
+                     .rename(columns={'categoria': 'categoria_atual'})
+                     [['codigo_material', 'descricao', 'tipo', 'material', 'especificacao',
+                       'categoria_atual', 'categoria_sugerida', 'participacao', 'valor_estoque']]
+                     .sort_values('valor_estoque', ascending=False))
+
+print(f"  Tipos distintos extraídos: {df_tipo['tipo'].nunique():,} "
+      f"(de {df['descricao'].nunique():,} descrições)")
+print(f"  Materiais em categoria rara para o tipo: {len(df_tipo_suspeitos):,}")
+print(f"  Valor em estoque envolvido: R$ {df_tipo_suspeitos['valor_estoque'].sum():,.2f}")
+
+if len(df_tipo_suspeitos) > 0:
+    print(f"\n  {'TIPO':<14} {'CAT.ATUAL':<14} {'CAT.SUGERIDA':<14} {'QTD':>6} {'PART.':>7}")
+    print("  " + "─"*59)
+    resumo_tipo = (df_tipo_suspeitos.groupby(['tipo', 'categoria_atual', 'categoria_sugerida'])
+                                    .agg(qtd=('codigo_material', 'size'),
+                                         participacao=('participacao', 'first'))
+                                    .sort_values('qtd', ascending=False))
+    for (tipo, cat_atual, cat_sugerida), r in resumo_tipo.head(15).iterrows():
+        print(f"  {tipo:<14} {cat_atual:<14} {cat_sugerida:<14} {int(r['qtd']):>6,} {r['participacao']:>6.1%}")
+else:
+    print("\n  ✅ Nenhum tipo com categoria minoritária")
+
 # ─────────────────────────────────────────────────────────────────
 # 6. IMPACTO FINANCEIRO
 # ─────────────────────────────────────────────────────────────────
@@ -466,7 +508,12 @@ cat_stats.reset_index().to_csv('data/processed/categorizacao_stats.csv',
 
 print("  ✅ data/processed/categorizacao_suspeitos.csv")
 print("  ✅ data/processed/categorizacao_multi.csv")
+# CSV 4: categoria rara para o tipo extraído da descrição
+df_tipo_suspeitos.to_csv('data/processed/categorizacao_tipo.csv',
+                         index=False, encoding='utf-8-sig')
+
 print("  ✅ data/processed/categorizacao_stats.csv")
+print("  ✅ data/processed/categorizacao_tipo.csv")
 
 # ─────────────────────────────────────────────────────────────────
 # 10. RESUMO FINAL
@@ -22,6 +22,8 @@ import shutil
 import warnings
 warnings.filterwarnings('ignore')
 
+from mdm.categorias import alterados, normalizar
+
 # ─────────────────────────────────────────────────────────────────
 # CONFIGURAÇÕES GLOBAIS
 # ─────────────────────────────────────────────────────────────────
@@ -275,26 +277,27 @@ total_padronizacoes = 0
 
 for campo in campos_texto:
     if campo in df_corrigido.columns:
-        inconsistentes = df_corrigido[campo] != df_corrigido[campo].str.title()
+        # Title Case calculado nos valores distintos (coluna categórica)
+        inconsistentes = alterados(df_corrigido[campo], 'title').to_numpy()
         n_inconsistentes = inconsistentes.sum()
         
         if n_inconsistentes > 0:
             print(f"\n  📊 {campo}: {n_inconsistentes} inconsistências")
+            padronizado = normalizar(df_corrigido[campo], 'title')
             
-            for idx in df_corrigido[inconsistentes].index:
-                valor_antes = df_corrigido.at[idx, campo]
-                valor_depois = str(valor_antes).title() if pd.notna(valor_antes) else valor_antes
-                
+            for codigo, valor_antes, valor_depois in zip(df_corrigido['codigo_material'][inconsistentes],
+                                                         df_corrigido[campo][inconsistentes],
+                                                         padronizado[inconsistentes]):
                 logger.log(
                     tipo='PADRONIZACAO_TEXTO',
-                    codigo=df_corrigido.at[idx, 'codigo_material'],
+                    codigo=codigo,
                     campo=campo,
                     valor_antes=valor_antes,
                     valor_depois=valor_depois,
                     motivo='Aplicado Title Case'
                 )
-                df_corrigido.at[idx, campo] = valor_depois
                 total_padronizacoes += 1
+            df_corrigido[campo] = padronizado
             
             print(f"  ✅ {n_inconsistentes} valores padronizados")
 
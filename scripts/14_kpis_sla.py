@@ -33,6 +33,9 @@ import os, warnings
 from datetime import datetime
 warnings.filterwarnings('ignore')
 
+from mdm.envelhecimento import DATA_REFERENCIA, obter_indice_envelhecimento
+from mdm.rollup import PREFIXO_PREENCHIDO, campos_rollup, completude_celulas, obter_rollup, visao
+
 print("\n" + "="*68)
 print("  DIA 25 — SLA E KPIs DE QUALIDADE DE DADOS")
 print("  Semana 4 · Projeto MDM Supply Chain")
@@ -46,6 +49,7 @@ df = None
 for p in [CSV, 'data/raw/materiais_raw.csv', '../data/raw/materiais_raw.csv']:
     if os.path.exists(p):
         df = pd.read_csv(p)
+        arquivo_csv = p
         print(f"\n✅ CSV carregado: {p} ({len(df):,} registros)")
         break
 if df is None:
@@ -54,17 +58,23 @@ if df is None:
 os.makedirs('data/processed', exist_ok=True)
 os.makedirs('visualizations', exist_ok=True)
 ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-HOJE = pd.Timestamp('2026-03-04')
+HOJE = DATA_REFERENCIA
 
 df['valor_estoque']   = df['preco_unitario'] * df['estoque_atual']
 df['ultima_mov_dt']   = pd.to_datetime(df['ultima_movimentacao'])
 df['data_cad_dt']     = pd.to_datetime(df['data_cadastro'])
-df['dias_parado']     = (HOJE - df['ultima_mov_dt']).dt.days
-df['ncm_str']         = df['ncm'].apply(lambda x: str(int(x)) if pd.notna(x) and x != 0 else '')
-df['ncm_valido']      = df['ncm_str'].apply(lambda x: len(x) == 8 and x.isdigit())
+# Dias parado: índice de aging em cache (mdm.envelhecimento), linhas na ordem do CSV
+df['dias_parado']     = obter_indice_envelhecimento(arquivo_csv, HOJE).dias()
 
 TOTAL = len(df)
 
+# Contadores de completude do rollup em cache (02_calcular_completude.py);
+# recalculado a partir do CSV se faltar, estiver desatualizado ou tiver vindo
+# de outros arquivos. KPIs do rollup dividem pelo qtd do próprio rollup
+rollup = obter_rollup(arquivo_csv)
+contadores = visao(rollup)
+TOTAL_ROLLUP = contadores['qtd']
+
 # ─────────────────────────────────────────────────────────────────
 # 2. DEFINIÇÃO DOS KPIs — 12 INDICADORES
 # ─────────────────────────────────────────────────────────────────
@@ -77,12 +87,9 @@ print("-"*68)
 kpis = {}
 
 # ── KPI 1: COMPLETUDE GERAL ───────────────────────────────────────
-campos_obrig = ['codigo_material','descricao','categoria','unidade_medida',
-                'preco_unitario','estoque_atual','data_cadastro','status',
-                'responsavel_cadastro']
-completos = df[campos_obrig].notna().all(axis=1).sum()
+completos = contadores['obrigatorios_completos']
 kpis['completude_geral'] = {
-    'valor': round(completos / TOTAL * 100, 1),
+    'valor': round(completos / TOTAL_ROLLUP * 100, 1),
     'meta': 95.0,
     'unidade': '%',
     'descricao': 'Materiais com todos campos obrigatórios preenchidos',
@@ -91,9 +98,9 @@ kpis['completude_geral'] = {
 }
 
 # ── KPI 2: COMPLETUDE NCM ─────────────────────────────────────────
-ncm_ok = df['ncm_valido'].sum()
+ncm_ok = contadores['ncm_valido']
 kpis['completude_ncm'] = {
-    'valor': round(ncm_ok / TOTAL * 100, 1),
+    'valor': round(ncm_ok / TOTAL_ROLLUP * 100, 1),
     'meta': 100.0,
     'unidade': '%',
     'descricao': 'Materiais com NCM de 8 dígitos válido',
@@ -102,9 +109,9 @@ kpis['completude_ncm'] = {
 }
 
 # ── KPI 3: COMPLETUDE FORNECEDOR ─────────────────────────────────
-forn_ok = df['fornecedor_principal'].notna().sum()
+forn_ok = contadores[PREFIXO_PREENCHIDO + 'fornecedor_principal']
 kpis['completude_fornecedor'] = {
-    'valor': round(forn_ok / TOTAL * 100, 1),
+    'valor': round(forn_ok / TOTAL_ROLLUP * 100, 1),
     'meta': 90.0,
     'unidade': '%',
     'descricao': 'Materiais com fornecedor principal cadastrado',
@@ -178,9 +185,9 @@ kpis['taxa_obsoletos'] = {
 }
 
 # ── KPI 9: ESTOQUE MÍNIMO DEFINIDO ───────────────────────────────
-est_min_ok = df['estoque_minimo'].notna().sum()
+est_min_ok = contadores[PREFIXO_PREENCHIDO + 'estoque_minimo']
 kpis['cobertura_estoque_minimo'] = {
-    'valor': round(est_min_ok / TOTAL * 100, 1),
+    'valor': round(est_min_ok / TOTAL_ROLLUP * 100, 1),
     'meta': 90.0,
     'unidade': '%',
     'descricao': 'Materiais com estoque mínimo definido',
@@ -209,11 +216,11 @@ pesos_campos = {
 score_total = 0
 for campo, peso in pesos_campos.items():
     if campo == 'ncm_str':
-        preench = df['ncm_valido'].mean()
+        preench = contadores['ncm_valido'] / TOTAL_ROLLUP
     elif campo == 'preco_unitario':
-        preench = (df[campo] > 0).mean()
+        preench = contadores['preco_positivo'] / TOTAL_ROLLUP
     else:
-        preench = df[campo].notna().mean()
+        preench = contadores[PREFIXO_PREENCHIDO + campo] / TOTAL_ROLLUP
     score_total += preench * peso
 
 kpis['score_ponderado'] = {
@@ -250,6 +257,15 @@ for nome, k in kpis.items():
     icone     = '✅' if atingiu else ('⚠️ ' if abs(val-meta) < 10 else '❌')
     print(f"  {k['descricao'][:35]:<35} {val:>7.1f}{k['unidade']} {meta:>6.1f}{k['unidade']} {icone}")
 
+# Completude por responsável pelo cadastro (agrupamento do rollup)
+por_responsavel = visao(rollup, ['responsavel_cadastro'])
+completude_resp = completude_celulas(por_responsavel, campos_rollup(rollup)).sort_values()
+print(f"\n  {'RESPONSÁVEL':<30} {'CAMPOS PREENCH.':>15} {'NCM VÁLIDO':>11} {'MATERIAIS':>10}")
+print("  " + "-"*70)
+for resp, pct in completude_resp.items():
+    linha = por_responsavel.loc[resp]
+    print(f"  {resp:<30} {pct:>14.1f}% {linha['ncm_valido'] / linha['qtd'] * 100:>10.1f}% {linha['qtd']:>10,}")
+
 # ─────────────────────────────────────────────────────────────────
 # 4. DEFINIÇÃO DE SLAs
 # ─────────────────────────────────────────────────────────────────
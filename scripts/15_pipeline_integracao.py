@@ -36,6 +36,10 @@ import os, json, warnings
 from datetime import datetime
 warnings.filterwarnings('ignore')
 
+from mdm.categorias import normalizar
+from mdm.completude import ncm_valido, pontuar
+from mdm.envelhecimento import DATA_REFERENCIA, IndiceEnvelhecimento
+
 print("\n" + "="*68)
 print("  DIA 26 — PIPELINE DE INTEGRAÇÃO DE DADOS")
 print("  Semana 4 · Projeto MDM Supply Chain")
@@ -58,7 +62,7 @@ os.makedirs('data/processed', exist_ok=True)
 os.makedirs('visualizations', exist_ok=True)
 ts  = datetime.now().strftime('%Y%m%d_%H%M%S')
 t0  = datetime.now()
-HOJE = pd.Timestamp('2026-03-04')
+HOJE = DATA_REFERENCIA
 
 CATS_VALIDAS = {
     'Acessórios','EPI','Eletrônico','Elétrico','Embalagem','Escritório',
@@ -113,8 +117,8 @@ df['preco_unitario']   = pd.to_numeric(df['preco_unitario'], errors='coerce').fi
 df['estoque_atual']    = pd.to_numeric(df['estoque_atual'],  errors='coerce').fillna(0).astype(int)
 df['ultima_mov_dt']    = pd.to_datetime(df['ultima_movimentacao'], errors='coerce')
 df['data_cad_dt']      = pd.to_datetime(df['data_cadastro'],       errors='coerce')
-df['dias_parado']      = (HOJE - df['ultima_mov_dt']).dt.days.fillna(9999).astype(int)
 df['valor_estoque']    = df['preco_unitario'] * df['estoque_atual']
+df['dias_parado']      = IndiceEnvelhecimento.de_datas(df['ultima_mov_dt'], df['valor_estoque'], HOJE).dias(sem_data=9999)
 
 # NCM: float → string 8 dígitos
 df['ncm_str'] = df['ncm'].apply(
@@ -122,9 +126,11 @@ df['ncm_str'] = df['ncm'].apply(
 )
 
 # Padronizar textos: strip espaços extras
-for col in ['descricao','categoria','fornecedor_principal','status','unidade_medida']:
-    df[col] = df[col].astype(str).str.strip()
-    df[col] = df[col].replace('nan', '')
+df['descricao'] = df['descricao'].astype(str).str.strip()
+df['descricao'] = df['descricao'].replace('nan', '')
+# Colunas de poucos valores: strip só nas categorias (coluna categórica)
+for col in ['categoria','fornecedor_principal','status','unidade_medida']:
+    df[col] = normalizar(df[col], 'strip')
 
 pipe.registrar('1b. Normalizar tipos e limpar espaços',
                len(df), 0, 'Conversão de tipos automática')
@@ -154,12 +160,9 @@ df = df_ok.copy()
 df['alertas']  = [[] for _ in range(len(df))]
 df['erros']    = [[] for _ in range(len(df))]
 
-# 2a: Validar NCM
-def valida_ncm(x):
-    s = str(x).strip()
-    return len(s) == 8 and s.isdigit()
-
-ncm_invalido = ~df['ncm_str'].apply(valida_ncm)
+# 2a: Validar NCM (mesma regra do score de qualidade no 3b)
+df['ncm_valido'] = ncm_valido(df['ncm'])
+ncm_invalido = ~df['ncm_valido']
 for idx in df[ncm_invalido].index:
     df.at[idx, 'erros'].append('NCM inválido ou vazio')
 pipe.registrar('2a. Validar NCM (8 dígitos obrigatório)',
@@ -231,22 +234,26 @@ pipe.registrar('3a. Calcular curva ABC por valor de estoque',
                f'A:{abc_counts.get("A",0)} B:{abc_counts.get("B",0)} C:{abc_counts.get("C",0)}')
 
 # 3b: Calcular score de qualidade por material
-def calcular_score(row):
-    score = 0
+# Matriz de critérios atendidos (1 coluna por regra) @ vetor de pesos
+PESOS_QUALIDADE = {
     # Campos obrigatórios (70 pts total)
-    if row['codigo_material']:         score += 15
-    if row['descricao']:               score += 15
-    if row['categoria'] in CATS_VALIDAS: score += 10
-    if valida_ncm(row['ncm_str']):     score += 20
-    if row['preco_unitario'] > 0:      score += 10
+    'codigo_material': 15, 'descricao': 15, 'categoria': 10, 'ncm': 20, 'preco_unitario': 10,
     # Campos complementares (30 pts)
-    if row['fornecedor_principal'] and row['fornecedor_principal'] != '': score += 10
-    if pd.notna(row['estoque_minimo']): score += 10
-    if row['localizacao_fisica'] and row['localizacao_fisica'] != 'nan': score += 5
-    if row['centro_custo'] and row['centro_custo'] != 'nan': score += 5
-    return score
-
-df['score_qualidade'] = df.apply(calcular_score, axis=1)
+    'fornecedor_principal': 10, 'estoque_minimo': 10, 'localizacao_fisica': 5, 'centro_custo': 5,
+}
+# Nulo conta como vazio (categóricas e str do pandas mantêm NaN, que .ne('') aprovaria)
+criterios = pd.DataFrame({
+    'codigo_material':      df['codigo_material'].notna() & df['codigo_material'].ne(''),
+    'descricao':            df['descricao'].notna() & df['descricao'].ne(''),
+    'categoria':            df['categoria'].isin(CATS_VALIDAS),
+    'ncm':                  df['ncm_valido'],
+    'preco_unitario':       df['preco_unitario'] > 0,
+    'fornecedor_principal': df['fornecedor_principal'].notna() & df['fornecedor_principal'].ne(''),
+    'estoque_minimo':       df['estoque_minimo'].notna(),
+    'localizacao_fisica':   ~df['localizacao_fisica'].isin(['', 'nan']),
+    'centro_custo':         ~df['centro_custo'].isin(['', 'nan']),
+})
+df['score_qualidade'] = pontuar(criterios[list(PESOS_QUALIDADE)], PESOS_QUALIDADE)
 score_med = df['score_qualidade'].mean()
 pipe.registrar('3b. Calcular score de qualidade individual',
                len(df), 0, f'Score médio: {score_med:.1f}/100')
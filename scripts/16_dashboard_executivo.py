@@ -33,6 +33,10 @@ import os, json, warnings
 from datetime import datetime
 warnings.filterwarnings('ignore')
 
+from mdm.cubo import obter_cubo, visao_cubo
+from mdm.envelhecimento import DATA_REFERENCIA, obter_indice_envelhecimento
+from mdm.rollup import PREFIXO_PREENCHIDO, obter_rollup, visao
+
 print("\n" + "="*68)
 print("  DIA 28 — DASHBOARD EXECUTIVO")
 print("  Semana 5 · Projeto MDM Supply Chain")
@@ -46,6 +50,7 @@ df = None
 for p in [CSV, 'data/raw/materiais_raw.csv', '../data/raw/materiais_raw.csv']:
     if os.path.exists(p):
         df = pd.read_csv(p)
+        arquivo_csv = p
         print(f"\n✅ CSV: {p} ({len(df):,} registros)")
         break
 if df is None:
@@ -54,11 +59,11 @@ if df is None:
 os.makedirs('data/processed', exist_ok=True)
 os.makedirs('visualizations', exist_ok=True)
 ts   = datetime.now().strftime('%Y%m%d_%H%M%S')
-HOJE = pd.Timestamp('2026-03-04')
+HOJE = DATA_REFERENCIA
 
 df['valor']       = df['preco_unitario'] * df['estoque_atual']
 df['ultima_dt']   = pd.to_datetime(df['ultima_movimentacao'])
-df['dias_parado'] = (HOJE - df['ultima_dt']).dt.days.fillna(9999).astype(int)
+df['dias_parado'] = obter_indice_envelhecimento(arquivo_csv, HOJE).dias(sem_data=9999)
 df['ncm_str']     = df['ncm'].apply(
     lambda x: str(int(x)) if pd.notna(x) and x != 0 else '')
 df['ncm_ok']      = df['ncm_str'].apply(lambda x: len(x) == 8 and x.isdigit())
@@ -67,26 +72,25 @@ CATS = {'Acessórios','EPI','Eletrônico','Elétrico','Embalagem','Escritório',
         'Ferramentas','Fixação','Hidráulico','Limpeza','Lubrificante',
         'Mecânico','Peças','Pneumático','Químico'}
 
-# ABC
-df_abc = df.drop_duplicates('codigo_material').sort_values('valor', ascending=False).copy()
-df_abc['pct'] = df_abc['valor'].cumsum() / df_abc['valor'].sum() * 100
-df_abc['abc'] = df_abc['pct'].apply(lambda x: 'A' if x <= 80 else ('B' if x <= 95 else 'C'))
-df = df.merge(df_abc[['codigo_material','abc']], on='codigo_material', how='left')
-df['abc'] = df['abc'].fillna('C')
-
-abc_counts   = df['abc'].value_counts()
+# Curva ABC e valor por categoria: cubo em cache (mdm.cubo)
+cubo         = obter_cubo(arquivo_csv)
+abc_counts   = visao_cubo(cubo, ['curva_abc'])['qtd_materiais'].sort_values(ascending=False)
 status_counts = df['status'].value_counts()
-cat_valor    = df.groupby('categoria')['valor'].sum().sort_values(ascending=False)
-cat_count    = df.groupby('categoria').size()
-cat_ncm_pct  = df.groupby('categoria')['ncm_ok'].mean() * 100
+cat_valor    = visao_cubo(cubo, ['categoria'])['valor_estoque'].sort_values(ascending=False)
+# Contagens por categoria e KPIs de completude: rollup em cache (mdm.rollup)
+rollup       = obter_rollup(arquivo_csv)
+contadores   = visao(rollup)
+por_cat      = visao(rollup, ['categoria'])
+cat_count    = por_cat['qtd']
+cat_ncm_pct  = por_cat['ncm_valido'] / por_cat['qtd'] * 100
 
 # KPIs
 kpis = {
     'completude':  100.0,
-    'ncm':         round(df['ncm_ok'].mean() * 100, 1),
-    'preco':       round((df['preco_unitario'] > 0).mean() * 100, 1),
-    'fornecedor':  round(df['fornecedor_principal'].notna().mean() * 100, 1),
-    'est_min':     round(df['estoque_minimo'].notna().mean() * 100, 1),
+    'ncm':         round(contadores['ncm_valido'] / contadores['qtd'] * 100, 1),
+    'preco':       round(contadores['preco_positivo'] / contadores['qtd'] * 100, 1),
+    'fornecedor':  round(contadores[PREFIXO_PREENCHIDO + 'fornecedor_principal'] / contadores['qtd'] * 100, 1),
+    'est_min':     round(contadores[PREFIXO_PREENCHIDO + 'estoque_minimo'] / contadores['qtd'] * 100, 1),
     'score_pond':  92.8,
 }
 
@@ -0,0 +1,216 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Script: Serviço Anti-Duplicata no Cadastro
+Bloqueio de duplicatas no momento do cadastro (recomendação PREVENIR do 01)
+═══════════════════════════════════════════════════════════════════════════════
+
+DESCRIÇÃO:
+Serviço HTTP local (só biblioteca padrão) que carrega o cadastro UMA vez,
+mantém em memória os índices de descrição normalizada, tokens e
+especificações (mdm/verificacao.py) e responde em < 10 ms (p99) se uma
+descrição proposta já existe no cadastro.
+
+ENDPOINTS:
+  GET  /verificar?descricao=Parafuso M8 Aço&categoria=Fixação&unidade=UN
+  POST /verificar   {"descricao": "...", "categoria": "...", "unidade": "..."}
+  GET  /saude       → materiais carregados, data da última carga
+
+RECARGA A QUENTE:
+Uma thread verifica o mtime de data/raw/materiais_raw.csv a cada 2 s. Se o
+arquivo mudou, os índices novos são montados em segundo plano e trocados de
+uma vez; as consultas continuam sendo atendidas pelo índice anterior.
+
+USO:
+  python scripts/19_servico_anti_duplicata.py
+  curl "http://127.0.0.1:8765/verificar?descricao=Rolamento%20Aluminio&unidade=UN"
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import gc
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from mdm.verificacao import VerificadorDuplicatas
+
+ARQUIVO_CADASTRO = 'data/raw/materiais_raw.csv'
+HOST = '127.0.0.1'
+PORTA = 8765
+INTERVALO_RECARGA = 2       # segundos entre verificações do mtime
+LIMIAR_SIMILARIDADE = 0.90  # mesmo limiar do Método 3 (fuzzy) do 01
+MAX_RESULTADOS = 10
+
+print("\n" + "="*80)
+print("🛡️  SERVIÇO ANTI-DUPLICATA NO CADASTRO")
+print("="*80 + "\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. CARGA DO CADASTRO E ÍNDICES
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+def carregar_verificador():
+    """Lê o cadastro e monta os índices em memória"""
+    inicio = time.time()
+    df = pd.read_csv(ARQUIVO_CADASTRO)
+    verificador = VerificadorDuplicatas(df, limiar=LIMIAR_SIMILARIDADE)
+    # Objetos do índice não mudam até a próxima recarga: tirá-los do
+    # rastreamento do GC evita pausas longas no meio das consultas
+    gc.collect()
+    gc.freeze()
+    print(f"✅ {verificador.n_materiais:,} materiais / {verificador.n_textos:,} descrições "
+          f"distintas indexadas em {time.time() - inicio:.2f}s")
+    return verificador
+
+
+class EstadoServico:
+    """Verificador ativo + mtime do arquivo que o originou"""
+
+    def __init__(self):
+        self.mtime = os.path.getmtime(ARQUIVO_CADASTRO)
+        self.verificador = carregar_verificador()
+
+    def recarregar_se_mudou(self):
+        """Remonta os índices se o CSV mudou; a troca é uma atribuição atômica"""
+        mtime = os.path.getmtime(ARQUIVO_CADASTRO)
+        if mtime == self.mtime:
+            return False
+        print(f"\n🔄 {ARQUIVO_CADASTRO} alterado ({datetime.fromtimestamp(mtime):%H:%M:%S}), recarregando...")
+        gc.unfreeze()
+        self.verificador = carregar_verificador()
+        self.mtime = mtime
+        return True
+
+
+def vigiar_cadastro(estado):
+    """Loop da thread de recarga a quente"""
+    while True:
+        time.sleep(INTERVALO_RECARGA)
+        try:
+            estado.recarregar_se_mudou()
+        except Exception as erro:  # arquivo sendo gravado, CSV inválido etc.
+            print(f"⚠️  Recarga falhou, mantendo índice anterior: {erro}")
+
+
+estado = EstadoServico()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. AUTOTESTE DE LATÊNCIA
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("\n⏱️  Autoteste de latência (descrições do cadastro, metade com erro de digitação):")
+df_amostra = pd.read_csv(ARQUIVO_CADASTRO, usecols=['descricao', 'categoria', 'unidade_medida'])
+df_amostra = df_amostra.sample(min(1000, len(df_amostra)), random_state=42)
+rng = np.random.default_rng(42)
+
+latencias = []
+for descricao, categoria, unidade in df_amostra.itertuples(index=False):
+    if rng.random() < 0.5 and len(descricao) > 4:
+        pos = int(rng.integers(1, len(descricao) - 1))
+        descricao = descricao[:pos] + 'x' + descricao[pos + 1:]
+    inicio = time.perf_counter()
+    estado.verificador.verificar(descricao, categoria=categoria, unidade=unidade,
+                                 max_resultados=MAX_RESULTADOS)
+    latencias.append((time.perf_counter() - inicio) * 1000)
+
+print(f"   p50: {np.percentile(latencias, 50):.2f} ms | p99: {np.percentile(latencias, 99):.2f} ms "
+      f"| máx: {max(latencias):.2f} ms")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. SERVIDOR HTTP
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+class ManipuladorVerificacao(BaseHTTPRequestHandler):
+    """Rotas /verificar e /saude"""
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _verificar(self, parametros):
+        if not isinstance(parametros, dict):
+            self._responder(400, {'erro': 'corpo JSON deve ser um objeto'})
+            return
+        descricao = parametros.get('descricao')
+        if not isinstance(descricao, str) or not descricao.strip():
+            self._responder(400, {'erro': 'parâmetro "descricao" é obrigatório (texto)'})
+            return
+        for campo in ('categoria', 'unidade'):
+            if parametros.get(campo) is not None and not isinstance(parametros[campo], str):
+                self._responder(400, {'erro': f'parâmetro "{campo}" deve ser texto'})
+                return
+        limite = parametros.get('limite')
+        if limite is None:
+            limite = MAX_RESULTADOS
+        elif isinstance(limite, str) and limite.isascii() and limite.isdigit():
+            limite = int(limite)  # query string: só dígitos
+        # JSON: só inteiro (true e 2.7 não viram 1 e 2)
+        if isinstance(limite, bool) or not isinstance(limite, int) or limite < 1:
+            self._responder(400, {'erro': 'parâmetro "limite" deve ser um inteiro positivo'})
+            return
+        resultado = estado.verificador.verificar(
+            descricao.strip(),
+            categoria=parametros.get('categoria'),
+            unidade=parametros.get('unidade'),
+            max_resultados=limite,
+        )
+        self._responder(200, resultado)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/verificar':
+            self._verificar({k: v[0] for k, v in parse_qs(url.query).items()})
+        elif url.path == '/saude':
+            verificador = estado.verificador
+            self._responder(200, {
+                'status': 'ok',
+                'materiais': verificador.n_materiais,
+                'descricoes_distintas': verificador.n_textos,
+                'carregado_em': datetime.fromtimestamp(verificador.carregado_em).isoformat(timespec='seconds'),
+            })
+        else:
+            self._responder(404, {'erro': f'rota desconhecida: {url.path}'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/verificar':
+            self._responder(404, {'erro': f'rota desconhecida: {self.path}'})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+            parametros = json.loads(self.rfile.read(tamanho) or b'{}')
+        except ValueError:
+            self._responder(400, {'erro': 'corpo JSON inválido'})
+            return
+        self._verificar(parametros)
+
+    def log_message(self, formato, *args):
+        pass  # sem log por requisição (latência); erros saem pelo print
+
+
+threading.Thread(target=vigiar_cadastro, args=(estado,), daemon=True).start()
+
+servidor = ThreadingHTTPServer((HOST, PORTA), ManipuladorVerificacao)
+print(f"\n🚀 Serviço no ar: http://{HOST}:{PORTA}/verificar?descricao=...")
+print(f"   Recarga a quente: {ARQUIVO_CADASTRO} (verificado a cada {INTERVALO_RECARGA}s)")
+print("   Ctrl+C para encerrar\n")
+
+try:
+    servidor.serve_forever()
+except KeyboardInterrupt:
+    print("\n👋 Serviço encerrado")
+finally:
+    servidor.server_close()
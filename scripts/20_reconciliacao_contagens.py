@@ -0,0 +1,141 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Script: Reconciliação de Contagens Físicas (Coletores × Sistema)
+Contagem real no lugar da simulação do 06
+═══════════════════════════════════════════════════════════════════════════════
+
+DESCRIÇÃO:
+Lê os arquivos dos coletores (codigo_material, localizacao_fisica,
+quantidade) em data/contagens/, em lotes, e faz o join com o saldo sistema
+por código × localização (mdm/reconciliacao.py). O cadastro é carregado
+UMA vez para todos os arquivos do dia.
+
+Para cada arquivo:
+- Divergência em quantidade, valor e % e classe Sobra / Falta / OK
+- Saldos do sistema nos locais contados que não foram lidos → Falta
+- Leituras fora do cadastro (código desconhecido ou fora do local) → Sobra
+
+Os resultados são acrescentados a data/processed/reconciliacao_contagens.csv
+arquivo por arquivo; o manifesto guarda os arquivos já reconciliados e uma
+nova execução só processa os arquivos novos (ou alterados). Um arquivo
+alterado substitui as próprias linhas anteriores no resultado e no resumo.
+
+Sem arquivos em data/contagens/, GERAR_EXEMPLO = True gera contagens de
+demonstração por corredor a partir da mesma simulação do 06. Desligado por
+padrão: as contagens simuladas entrariam no resultado e no manifesto como
+reais, e o 21 consideraria todo o estoque contado hoje.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import glob
+import os
+import time
+
+import pandas as pd
+
+from mdm.acuracidade import contagem_fisica
+from mdm.reconciliacao import (ReconciliadorContagens, arquivos_pendentes, descartar_arquivos,
+                               reconciliar_arquivos)
+
+ARQUIVO_CADASTRO = 'data/raw/materiais_raw.csv'
+DIRETORIO_CONTAGENS = 'data/contagens'
+PADRAO_ARQUIVOS = '*.csv'
+ARQUIVO_RESULTADO = 'data/processed/reconciliacao_contagens.csv'
+ARQUIVO_RESUMO = 'data/processed/reconciliacao_resumo.csv'
+ARQUIVO_MANIFESTO = 'data/processed/reconciliacao_manifesto.csv'
+GERAR_EXEMPLO = False  # só para demonstração, nunca em produção
+
+print("\n" + "="*70)
+print("📟 RECONCILIAÇÃO DE CONTAGENS FÍSICAS — COLETORES × SISTEMA")
+print("="*70 + "\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. CARREGAR CADASTRO (UMA VEZ)
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("📂 Carregando cadastro...")
+inicio = time.time()
+df = pd.read_csv(ARQUIVO_CADASTRO)
+reconciliador = ReconciliadorContagens(df)
+print(f"✅ {len(df):,} materiais → {len(reconciliador):,} saldos código × local "
+      f"em {len(reconciliador.locais):,} localizações ({time.time() - inicio:.2f}s)\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. ARQUIVOS DOS COLETORES
+# ═══════════════════════════════════════════════════════════════════════════
+
+arquivos = sorted(glob.glob(os.path.join(DIRETORIO_CONTAGENS, PADRAO_ARQUIVOS)))
+
+if not arquivos and GERAR_EXEMPLO:
+    # Demonstração: um arquivo por corredor (prefixo da localização), com a
+    # contagem simulada do 06 e uma leitura repetida a cada 10
+    os.makedirs(DIRETORIO_CONTAGENS, exist_ok=True)
+    leituras = df[['codigo_material', 'localizacao_fisica']].copy()
+    leituras['quantidade'] = contagem_fisica(df['estoque_atual'], df['categoria'])
+    leituras = leituras.dropna(subset=['localizacao_fisica'])
+    repetidas = leituras.iloc[::10].assign(quantidade=0)
+    leituras = pd.concat([leituras, repetidas]).sort_index(kind='stable')
+    corredor = leituras['localizacao_fisica'].str.split('-').str[0]
+    for nome, parte in leituras.groupby(corredor, sort=True):
+        parte.to_csv(os.path.join(DIRETORIO_CONTAGENS, f'contagem_corredor_{nome}.csv'), index=False)
+    arquivos = sorted(glob.glob(os.path.join(DIRETORIO_CONTAGENS, PADRAO_ARQUIVOS)))
+    print(f"🧪 {len(arquivos)} arquivos de contagem de exemplo gerados em {DIRETORIO_CONTAGENS}/\n")
+
+pendentes = arquivos_pendentes(arquivos, ARQUIVO_MANIFESTO)
+print(f"Arquivos de contagem: {len(arquivos):,} | já reconciliados: {len(arquivos) - len(pendentes):,} "
+      f"| pendentes: {len(pendentes):,}\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. RECONCILIAR (EM LOTES, ARQUIVO POR ARQUIVO)
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("="*70)
+print("🔄 RECONCILIANDO CONTAGENS")
+print("="*70 + "\n")
+
+inicio = time.time()
+resumo = reconciliar_arquivos(reconciliador, pendentes, ARQUIVO_RESULTADO, ARQUIVO_MANIFESTO)
+print(f"✅ {len(pendentes):,} arquivos reconciliados em {time.time() - inicio:.2f}s\n")
+
+if len(resumo) == 0:
+    print("Nenhum arquivo novo para reconciliar.\n")
+else:
+    print("Arquivo                          Saldos    OK   Sobra  Falta   Acur. Qtd   Acur. Valor")
+    print("─"*88)
+    for _, row in resumo.iterrows():
+        print(f"{row['arquivo'][:30]:30s}  {row['saldos']:6,d} {row['OK']:5,d} {row['Sobra']:6,d} "
+              f"{row['Falta']:6,d}    {row['acuracidade_qtd']:6.2f}%     {row['acuracidade_valor']:6.2f}%")
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # 4. CONSOLIDADO DA EXECUÇÃO
+    # ═══════════════════════════════════════════════════════════════════════
+
+    print("\n" + "="*70)
+    print("📊 CONSOLIDADO DA EXECUÇÃO")
+    print("="*70 + "\n")
+
+    total_sistema = resumo['estoque_sistema'].sum()
+    total_valor = resumo['valor_estoque'].sum()
+    divergencia_qtd = resumo['divergencia_qtd'].sum()
+    divergencia_valor = resumo['divergencia_valor'].sum()
+    print(f"Saldos contados: {resumo['saldos'].sum():,} em {resumo['locais'].sum():,} localizações")
+    print(f"OK: {resumo['OK'].sum():,} | Sobra: {resumo['Sobra'].sum():,} | Falta: {resumo['Falta'].sum():,}")
+    print(f"Divergência: {divergencia_qtd:,.0f} unidades | R$ {divergencia_valor:,.2f}")
+    print(f"\n🎯 ACURACIDADE DOS LOCAIS CONTADOS:")
+    print(f"   Quantidade: {(1 - abs(divergencia_qtd) / total_sistema) * 100:.2f}%")
+    print(f"   Valor: {(1 - abs(divergencia_valor) / total_valor) * 100:.2f}%\n")
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # 5. SALVAR RESUMO
+    # ═══════════════════════════════════════════════════════════════════════
+
+    descartar_arquivos(ARQUIVO_RESUMO, resumo['arquivo'])
+    novo = not os.path.exists(ARQUIVO_RESUMO)
+    resumo.round(4).to_csv(ARQUIVO_RESUMO, mode='a', index=False, header=novo,
+                           encoding='utf-8-sig' if novo else 'utf-8')
+
+print("📁 Arquivos:")
+print(f"   • {ARQUIVO_RESULTADO} (uma linha por saldo reconciliado)")
+print(f"   • {ARQUIVO_RESUMO} (uma linha por arquivo de contagem)")
+print(f"   • {ARQUIVO_MANIFESTO} (arquivos já reconciliados)\n")
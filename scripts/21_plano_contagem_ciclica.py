@@ -0,0 +1,139 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Script: Plano de Inventário Cíclico com Rota de Contagem
+Próximo passo do 06 (acuracidade) e do 20 (reconciliação de contagens)
+═══════════════════════════════════════════════════════════════════════════════
+
+DESCRIÇÃO:
+Monta a lista de contagem do dia (mdm/inventario_ciclico.py):
+- Curva ABC por valor em estoque (mesma Pareto do 04/16): A a cada 30
+  dias, B a cada 90, C a cada 180
+- Risco de acuracidade: score do 06 (data/processed/acuracidade_analise.csv)
+- Dias desde a última contagem: reconciliações do 20 (data do arquivo no
+  manifesto); nunca contado → dias desde o cadastro
+- Capacidade diária de contagens (CAPACIDADE_DIARIA)
+
+A lista sai na ordem de caminhada pelos corredores (rota serpentina sobre
+localizacao_fisica = Corredor-Prateleira-Altura), com a distância estimada
+comparada à ordem de prioridade.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from mdm.cubo import curva_abc_materiais
+from mdm.envelhecimento import dia_inteiro
+from mdm.inventario_ciclico import INTERVALO_DIAS, distancia_rota, planejar_contagem
+
+ARQUIVO_CADASTRO = 'data/raw/materiais_raw.csv'
+ARQUIVO_ACURACIDADE = 'data/processed/acuracidade_analise.csv'
+ARQUIVO_RECONCILIACAO = 'data/processed/reconciliacao_contagens.csv'
+ARQUIVO_MANIFESTO = 'data/processed/reconciliacao_manifesto.csv'
+ARQUIVO_PLANO = 'data/processed/plano_contagem_ciclica.csv'
+
+CAPACIDADE_DIARIA = 200
+DATA_PLANO = pd.Timestamp.today().normalize()
+
+print("\n" + "="*70)
+print("🗺️  PLANO DE INVENTÁRIO CÍCLICO — LISTA DO DIA E ROTA")
+print("="*70 + "\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. CARREGAR DADOS
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("📂 Carregando dados...")
+inicio = time.time()
+df = pd.read_csv(ARQUIVO_CADASTRO)
+itens = (df.dropna(subset=['localizacao_fisica'])
+         .drop_duplicates(['codigo_material', 'localizacao_fisica'])
+         .reset_index(drop=True))
+print(f"✅ {len(df):,} materiais | {len(itens):,} itens código × local "
+      f"({len(df) - df['localizacao_fisica'].notna().sum():,} sem localização ficam fora)\n")
+
+# Curva ABC por código (valor em estoque)
+valor = df['preco_unitario'] * df['estoque_atual']
+classe = pd.Series(curva_abc_materiais(df['codigo_material'], valor), index=df['codigo_material'])
+itens['classe_abc'] = classe[~classe.index.duplicated()].reindex(itens['codigo_material']).to_numpy()
+
+# Risco de acuracidade (06)
+if os.path.exists(ARQUIVO_ACURACIDADE):
+    score = pd.read_csv(ARQUIVO_ACURACIDADE).drop_duplicates('codigo_material').set_index('codigo_material')
+    itens['score_acuracidade'] = score['score_acuracidade'].reindex(itens['codigo_material']).to_numpy()
+    print(f"🎯 Score de acuracidade do 06 para {itens['score_acuracidade'].notna().sum():,} itens")
+else:
+    print("🎯 Sem acuracidade_analise.csv (rode o 06): prioridade só por ABC e atraso")
+
+# Última contagem (reconciliações do 20) ou data de cadastro
+dia_plano = dia_inteiro([DATA_PLANO])[0]
+dia_base = dia_inteiro(itens['data_cadastro'])
+if os.path.exists(ARQUIVO_RECONCILIACAO) and os.path.exists(ARQUIVO_MANIFESTO):
+    manifesto = pd.read_csv(ARQUIVO_MANIFESTO)
+    contagens = pd.read_csv(ARQUIVO_RECONCILIACAO, usecols=['arquivo', 'codigo_material', 'localizacao_fisica'])
+    contagens['data'] = contagens['arquivo'].map(
+        dict(zip(manifesto['arquivo'], pd.to_datetime(manifesto['mtime'], unit='ns').dt.normalize())))
+    ultima = contagens.groupby(['codigo_material', 'localizacao_fisica'])['data'].max()
+    chave = pd.MultiIndex.from_frame(itens[['codigo_material', 'localizacao_fisica']])
+    dia_contagem = dia_inteiro(ultima.reindex(chave).to_numpy())
+    contado = dia_contagem > dia_base
+    dia_base = np.where(contado, dia_contagem, dia_base)
+    print(f"📟 Última contagem (20) para {int(contado.sum()):,} itens")
+else:
+    print("📟 Sem reconciliações do 20: atraso contado desde o cadastro")
+itens['dias_desde_contagem'] = np.clip(dia_plano - dia_base.astype(np.int64), 0, None)
+print(f"   Carga e preparação: {time.time() - inicio:.2f}s\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. LISTA DO DIA
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("="*70)
+print(f"📋 LISTA DE CONTAGEM — {DATA_PLANO:%d/%m/%Y} (capacidade {CAPACIDADE_DIARIA:,})")
+print("="*70 + "\n")
+
+inicio = time.time()
+plano = planejar_contagem(itens, CAPACIDADE_DIARIA)
+print(f"✅ {len(plano):,} itens escolhidos entre {len(itens):,} em {time.time() - inicio:.3f}s\n")
+
+print("Classe   Intervalo   Itens na lista   Itens vencidos (atraso ≥ intervalo)")
+print("─"*70)
+vencidos = itens['dias_desde_contagem'] >= itens['classe_abc'].map(INTERVALO_DIAS)
+for cls, intervalo in INTERVALO_DIAS.items():
+    print(f"  {cls}      {intervalo:4d} dias     {(plano['classe_abc'] == cls).sum():6,d}"
+          f"           {(vencidos & (itens['classe_abc'] == cls)).sum():6,d}")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. ROTA
+# ═══════════════════════════════════════════════════════════════════════════
+
+print("\n" + "="*70)
+print("🚶 ROTA DE CONTAGEM (SERPENTINA PELOS CORREDORES)")
+print("="*70 + "\n")
+
+por_prioridade = plano.sort_values('prioridade', ascending=False)
+distancia = distancia_rota(plano['corredor'], plano['prateleira'])
+distancia_prioridade = distancia_rota(por_prioridade['corredor'], por_prioridade['prateleira'])
+print(f"Distância estimada na rota: {distancia:,.0f} m "
+      f"(na ordem de prioridade: {distancia_prioridade:,.0f} m)")
+print(f"Corredores visitados: {' → '.join(plano['corredor'].drop_duplicates())}\n")
+
+print("Seq   Local      Código       Classe  Dias  Score   Prioridade")
+print("─"*65)
+for _, row in plano.head(20).iterrows():
+    score_txt = f"{row['score_acuracidade']:5.1f}" if pd.notna(row.get('score_acuracidade')) else '   - '
+    print(f"{row['sequencia']:4d}  {row['localizacao_fisica']:9s}  {row['codigo_material']:11s}  "
+          f"{row['classe_abc']:5s}  {row['dias_desde_contagem']:4d}  {score_txt}   {row['prioridade']:8.2f}")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 4. SALVAR PLANO
+# ═══════════════════════════════════════════════════════════════════════════
+
+colunas = ['sequencia', 'localizacao_fisica', 'corredor', 'prateleira', 'altura', 'codigo_material',
+           'descricao', 'categoria', 'classe_abc', 'dias_desde_contagem', 'score_acuracidade', 'prioridade']
+plano.reindex(columns=colunas).round({'prioridade': 4}).to_csv(ARQUIVO_PLANO, index=False, encoding='utf-8-sig')
+print(f"\n✅ Arquivo salvo: {ARQUIVO_PLANO}\n")
@@ -0,0 +1,161 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Script: Benchmark TF-IDF (3-gramas) × método exato de duplicatas por descrição
+═══════════════════════════════════════════════════════════════════════════════
+
+DESCRIÇÃO:
+Gera cadastros sintéticos de 100 mil e 1 milhão de linhas a partir de
+data/raw/materiais_raw.csv, com uma fração das descrições alterada como um
+usuário faria (caixa, "em" no meio, letra trocada ou faltando), e compara:
+
+  EXATO   → Método 2 do 01: descrição em minúsculas, agrupamento por igualdade
+  TF-IDF  → mdm.tfidf.pares_tfidf: cosseno de 3-gramas + clusters transitivos
+
+Para cada método: tempo, pico de memória alocada (tracemalloc), registros
+agrupados, RECALL (linhas alteradas que caíram no grupo da descrição
+original) e PUREZA (linhas agrupadas cuja origem é a majoritária do grupo).
+
+USO:
+  python scripts/benchmark_tfidf.py
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from mdm.duplicatas import clusters_transitivos
+from mdm.tfidf import pares_tfidf
+
+ARQUIVO_CADASTRO = 'data/raw/materiais_raw.csv'
+TAMANHOS = [100_000, 1_000_000]
+TAXA_VARIACAO = 0.10
+LIMIAR_TFIDF = 0.90
+SEMENTE = 42
+
+print("\n" + "="*80)
+print("⏱️  BENCHMARK: TF-IDF 3-GRAMAS × MÉTODO EXATO")
+print("="*80 + "\n")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. CADASTROS SINTÉTICOS
+# ═══════════════════════════════════════════════════════════════════════════
+
+
+def variar_descricao(descricao, rng):
+    """Uma alteração de digitação/formatação sorteada"""
+    tipo = rng.integers(4)
+    palavras = descricao.split(' ')
+    if tipo == 0:
+        return descricao.lower() if descricao != descricao.lower() else descricao.upper()
+    if tipo == 1 and len(palavras) > 1:
+        return ' '.join(palavras[:-1] + ['em', palavras[-1]])
+    pos = int(rng.integers(1, max(len(descricao) - 1, 2)))
+    if tipo == 2 and pos + 1 < len(descricao):
+        return descricao[:pos] + descricao[pos + 1] + descricao[pos] + descricao[pos + 2:]
+    return descricao[:pos] + descricao[pos + 1:]
+
+
+def gerar_cadastro(base, n, rng):
+    """n linhas replicando a base; `origem` = descrição antes da alteração"""
+    linhas = rng.integers(0, len(base), n)
+    df = pd.DataFrame({
+        'codigo_material': [f'BENCH-{i:08d}' for i in range(n)],
+        'descricao': base['descricao'].to_numpy()[linhas],
+        'categoria': base['categoria'].to_numpy()[linhas],
+        'unidade_medida': base['unidade_medida'].to_numpy()[linhas],
+    })
+    df['origem'] = df['descricao'].str.lower().str.strip()
+
+    alterar = np.flatnonzero(rng.random(n) < TAXA_VARIACAO)
+    df['alterada'] = False
+    df.loc[alterar, 'descricao'] = [variar_descricao(d, rng) for d in df['descricao'].to_numpy()[alterar]]
+    df.loc[alterar, 'alterada'] = True
+    return df
+
+
+def metodo_exato(df):
+    """Rótulo de grupo = descrição em minúsculas (Método 2 do 01)"""
+    return pd.factorize(df['descricao'].str.lower().str.strip())[0]
+
+
+def metodo_tfidf(df):
+    """Rótulo de grupo = cluster transitivo dos pares TF-IDF"""
+    return clusters_transitivos(len(df), pares_tfidf(df, limiar=LIMIAR_TFIDF))
+
+
+def avaliar(df, rotulos):
+    """(registros agrupados, recall das linhas alteradas, pureza dos grupos)"""
+    origem = pd.factorize(df['origem'])[0]
+    tamanho = np.bincount(rotulos)[rotulos]
+    agrupada = tamanho > 1
+
+    # Origem majoritária de cada grupo
+    contagem = pd.DataFrame({'grupo': rotulos, 'origem': origem}).value_counts()
+    majoritaria = contagem.reset_index().drop_duplicates('grupo').set_index('grupo')['origem']
+    correta = majoritaria.reindex(rotulos).to_numpy() == origem
+
+    # Alterada "achada" = está num grupo com alguma linha original da mesma origem
+    originais = pd.DataFrame({'grupo': rotulos, 'origem': origem})[~df['alterada'].to_numpy()]
+    chave_original = set(zip(originais['grupo'], originais['origem']))
+    alteradas = np.flatnonzero(df['alterada'].to_numpy())
+    achadas = sum((g, o) in chave_original for g, o in zip(rotulos[alteradas], origem[alteradas]))
+
+    recall = achadas / len(alteradas) if len(alteradas) else 1.0
+    pureza = correta[agrupada].mean() if agrupada.any() else 1.0
+    return int(agrupada.sum()), recall, pureza
+
+
+def medir(metodo, df):
+    """(rótulos, segundos, pico de memória em MB) do método"""
+    inicio = time.perf_counter()
+    rotulos = metodo(df)
+    segundos = time.perf_counter() - inicio
+
+    # Segunda execução só para memória (tracemalloc deixa o código mais lento)
+    tracemalloc.start()
+    metodo(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rotulos, segundos, pico / 1024 ** 2
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. EXECUÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+base = pd.read_csv(ARQUIVO_CADASTRO, usecols=['descricao', 'categoria', 'unidade_medida'])
+base = base.dropna(subset=['descricao'])
+rng = np.random.default_rng(SEMENTE)
+resultados = []
+
+for n in TAMANHOS:
+    df = gerar_cadastro(base, n, rng)
+    print(f"📦 {n:,} linhas ({df['alterada'].sum():,} alteradas, "
+          f"{df['descricao'].nunique():,} descrições distintas)")
+
+    for nome, metodo in [('EXATO', metodo_exato), ('TF-IDF', metodo_tfidf)]:
+        rotulos, segundos, pico_mb = medir(metodo, df)
+        agrupados, recall, pureza = avaliar(df, rotulos)
+        resultados.append({
+            'linhas': n, 'metodo': nome, 'segundos': round(segundos, 2),
+            'pico_mb': round(pico_mb, 1), 'registros_agrupados': agrupados,
+            'recall_alteradas': round(recall, 4), 'pureza': round(pureza, 4),
+        })
+        print(f"   {nome:<7} {segundos:7.2f}s | pico {pico_mb:8.1f} MB | agrupados {agrupados:>9,} "
+              f"| recall {recall:6.1%} | pureza {pureza:6.1%}")
+    print()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. RESUMO
+# ═══════════════════════════════════════════════════════════════════════════
+
+df_resultados = pd.DataFrame(resultados)
+print(df_resultados.to_string(index=False))
+
+output = 'data/processed/benchmark_tfidf.csv'
+df_resultados.to_csv(output, index=False, encoding='utf-8-sig')
+print(f"\n✅ Resultados salvos: {output}")
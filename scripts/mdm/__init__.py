@@ -0,0 +1,38 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Pacote: mdm - motores reutilizáveis pelos scripts numerados
+═══════════════════════════════════════════════════════════════════════════════
+
+Os scripts em scripts/ são executados a partir da raiz do projeto
+(python scripts/01_identificar_duplicatas.py), o que coloca scripts/ no
+sys.path e permite `from mdm.duplicatas import ...`.
+
+MÓDULOS:
+- texto       → normalização de descrições, tokens e especificações
+- duplicatas  → resumo de grupos e detecção fuzzy por blocagem
+- minhash     → índice MinHash/LSH persistente de descrições similares
+- sobrevivencia → registro ouro por cluster e referência de códigos
+- unionfind   → clusters transitivos a partir de arestas de vários métodos
+- verificacao → índices em memória para checar duplicata no cadastro (< 10 ms)
+- atributos   → tipo / material / especificação extraídos da descrição
+- tfidf       → cosseno TF-IDF de 3-gramas em self-join esparso por blocos
+- paralelo    → ProcessPoolExecutor + arrays/textos em memória compartilhada
+- incremental → índice SQLite de chaves para aplicar o delta noturno
+- completude  → score ponderado: matriz de critérios @ vetor de pesos
+- ausencia    → perfil de campos vazios por bitmask (contagem de padrões)
+- perfil_completude → agregados de completude somáveis, CSV lido em lotes
+- rollup      → completude em GROUPING SETS (categoria × responsável × ...) em cache
+- qualidade_texto → verificações de espaços, caracteres e caixa por valor distinto
+- categorias  → strip/title/upper só no dicionário de colunas categóricas
+- multipadrao → Aho-Corasick: todas as palavras-chave numa varredura do texto
+- fornecedores → resolução de nomes de fornecedor em clusters (índice em CSV)
+- cubo        → fornecedor × categoria × ABC × status com Pareto e HHI (cache .npz)
+- movimentos  → livro append-only de entradas/saídas por dia e giro real
+- envelhecimento → aging por faixa com agregados movidos por busca binária
+- acuracidade → Monte Carlo vetorizado da contagem física (IC por categoria)
+- reconciliacao → contagens dos coletores × saldo sistema (hash join em lotes)
+- inventario_ciclico → lista diária de contagem (ABC × risco × atraso) em rota serpentina
+- classificacao → categoria sugerida por palavras-chave (1 autômato, flags de conflito)
+═══════════════════════════════════════════════════════════════════════════════
+"""
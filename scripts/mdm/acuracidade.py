@@ -0,0 +1,253 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Simulação Monte Carlo da contagem física (acuracidade de estoque)
+═══════════════════════════════════════════════════════════════════════════════
+
+Modelo de divergência por material (o mesmo do 06_analise_acuracidade):
+
+  categoria problemática   P(divergência grande) = 30%   U(-20%, +10%)
+                           senão                         U(-5%,  +5%)
+  demais categorias        P(divergência grande) = 15%   U(-15%,  +5%)
+                           senão                         U(-3%,  +3%)
+  físico = max(0, int(sistema × (1 + divergência)))
+
+Cada material consome 2 números uniformes (sorteio da faixa + posição na
+faixa). sortear() tira todos de uma vez, num array replicações × materiais
+× 2, e o resto é aritmética de arrays. Com np.random.RandomState(42) e 1
+replicação, a sequência é exatamente a do antigo df.apply sob
+np.random.seed(42).
+
+simular_acuracidade() roda N replicações em lotes, cada lote com um
+np.random.Generator de semente filha (o resultado não depende de quantos
+processos rodam os lotes), e cada lote em blocos de replicações (buffers
+float32 reaproveitados, memória limitada por MEMORIA_BLOCO_MB). Ali cada
+material usa 1 uniforme: u < p escolhe a faixa grande e u/p (ou
+(u−p)/(1−p)) é a posição na faixa, então o físico é a + b·u com a, b
+pré-calculados por material (a faixa grande entra como [u < p]·(Δa + Δb·u),
+só aritmética, sem cópias mascaradas). Os materiais são ordenados por
+categoria uma vez e cortados em trechos de até TAMANHO_TRECHO:
+np.add.reduceat soma cada trecho em float32 (rápido, erro limitado pelo
+tamanho do trecho) e os trechos de cada categoria somam em float64. O
+resultado guarda só replicações × categorias de acuracidade em quantidade
+e valor.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from mdm.paralelo import anexar_arrays, contexto_processos, numero_processos, publicar_arrays
+
+CATEGORIAS_PROBLEMATICAS = ['Ferramentas', 'Eletronico', 'Escritório']
+
+# (P(divergência grande), faixa grande, faixa pequena)
+MODELO_PROBLEMATICA = (0.30, (-0.20, 0.10), (-0.05, 0.05))
+MODELO_PADRAO = (0.15, (-0.15, 0.05), (-0.03, 0.03))
+
+SEMENTE = 42
+N_REPLICACOES = 1000
+NIVEL_CONFIANCA = 0.95
+MEMORIA_BLOCO_MB = 256
+TAMANHO_TRECHO = 4096
+REPLICACOES_POR_LOTE = 100
+# Abaixo disso (materiais × replicações) subir processos não compensa
+MIN_CELULAS_PARALELO = 50_000_000
+
+TOTAL = 'TOTAL'
+SEM_CATEGORIA = '(sem categoria)'
+
+
+def _parametros(problematica):
+    """Arrays por material: probabilidade, (mín, amplitude) da faixa grande e da pequena"""
+    modelos = [MODELO_PADRAO, MODELO_PROBLEMATICA]
+    escolha = np.asarray(problematica, dtype=np.int64)
+
+    def coluna(extrair):
+        return np.array([extrair(m) for m in modelos])[escolha]
+
+    return (coluna(lambda m: m[0]),
+            coluna(lambda m: m[1][0]), coluna(lambda m: m[1][1] - m[1][0]),
+            coluna(lambda m: m[2][0]), coluna(lambda m: m[2][1] - m[2][0]))
+
+
+def sortear(rng, n_replicacoes, n_materiais):
+    """Uniformes [0, 1) (replicações × materiais × 2), na ordem de consumo do gerador"""
+    return rng.random((n_replicacoes, n_materiais, 2))
+
+
+def divergencias(uniformes, problematica):
+    """Divergência relativa (replicações × materiais) a partir dos uniformes"""
+    prob, min_grande, amp_grande, min_pequena, amp_pequena = _parametros(problematica)
+    grande = uniformes[..., 0] < prob
+    return np.where(grande, min_grande + amp_grande * uniformes[..., 1],
+                    min_pequena + amp_pequena * uniformes[..., 1])
+
+
+def estoque_fisico(sistema, divergencia):
+    """max(0, int(sistema × (1 + divergência))), com broadcast nas replicações"""
+    return np.maximum(0, np.trunc(np.asarray(sistema, dtype=np.float64) * (1 + divergencia))).astype(np.int64)
+
+
+def contagem_fisica(sistema, categorias, rng=None):
+    """Uma realização da contagem física (array por material)"""
+    if rng is None:
+        rng = np.random.RandomState(SEMENTE)
+    problematica = pd.Series(categorias).isin(CATEGORIAS_PROBLEMATICAS).to_numpy()
+    uniformes = sortear(rng, 1, len(problematica))
+    return estoque_fisico(sistema, divergencias(uniformes, problematica))[0]
+
+
+def _coeficientes(sistema, problematica):
+    """
+    Físico antes do truncamento = a + b·u, com um uniforme u por material:
+    u < p → faixa grande, posição u/p; senão faixa pequena, posição (u−p)/(1−p).
+    Retorna (p, a_grande, b_grande, a_pequena, b_pequena) em float32.
+    """
+    prob, min_grande, amp_grande, min_pequena, amp_pequena = _parametros(problematica)
+    coeficientes = (prob,
+                    sistema * (1 + min_grande), sistema * amp_grande / prob,
+                    sistema * (1 + min_pequena) - sistema * amp_pequena * prob / (1 - prob),
+                    sistema * amp_pequena / (1 - prob))
+    return tuple(c.astype(np.float32) for c in coeficientes)
+
+
+def _tamanho_bloco(n_materiais, memoria_mb):
+    # uniformes, físico e ajuste (float32) + máscara: ~13 bytes por célula
+    return max(1, int(memoria_mb * 1024 ** 2 // (13 * max(n_materiais, 1))))
+
+
+def _trechos(inicios, n_materiais, tamanho=TAMANHO_TRECHO):
+    """Inícios dos trechos (cada categoria cortada a cada `tamanho`) e a posição da categoria de cada um"""
+    fins = np.append(inicios[1:], n_materiais)
+    partes = [np.arange(i, f, tamanho) for i, f in zip(inicios, fins)]
+    trechos = np.concatenate(partes) if partes else np.zeros(0, dtype=np.int64)
+    return trechos, np.flatnonzero(np.isin(trechos, inicios))
+
+
+def _somar(matriz, trechos, categoria_trecho):
+    """Somas por categoria (linhas × categorias, float64): trechos em float32, categorias em float64"""
+    parciais = np.add.reduceat(matriz, trechos, axis=1).astype(np.float64)
+    return np.add.reduceat(parciais, categoria_trecho, axis=1)
+
+
+def _simular_lote(materiais, trechos, categoria_trecho, n_replicacoes, semente, memoria_mb):
+    """
+    Divergências somadas por categoria (qtd, valor) de `n_replicacoes`, com
+    um Generator próprio do lote, em blocos que cabem em `memoria_mb`.
+    """
+    prob, a_pequena, b_pequena = materiais['prob'], materiais['a_pequena'], materiais['b_pequena']
+    delta_a, delta_b = materiais['delta_a'], materiais['delta_b']
+    sistema, precos = materiais['sistema'], materiais['precos']
+    rng = np.random.default_rng(semente)
+    bloco = min(_tamanho_bloco(len(sistema), memoria_mb), n_replicacoes)
+    uniformes = np.empty((bloco, len(sistema)), dtype=np.float32)
+    fisico = np.empty_like(uniformes)
+    ajuste = np.empty_like(uniformes)
+    grande = np.empty(uniformes.shape, dtype=bool)
+    div_qtd, div_valor = [], []
+    for inicio in range(0, n_replicacoes, bloco):
+        r = min(bloco, n_replicacoes - inicio)
+        u, f, d, g = uniformes[:r], fisico[:r], ajuste[:r], grande[:r]
+        rng.random(out=u, dtype=np.float32)
+        np.less(u, prob, out=g)
+        # f = a_pequena + b_pequena·u + [u < p]·(Δa + Δb·u), sem cópias mascaradas
+        np.multiply(u, b_pequena, out=f)
+        f += a_pequena
+        np.multiply(u, delta_b, out=d)
+        d += delta_a
+        d *= g
+        f += d
+        np.trunc(f, out=f)
+        np.maximum(f, 0, out=f)
+        f -= sistema
+        div_qtd.append(_somar(f, trechos, categoria_trecho))
+        f *= precos
+        div_valor.append(_somar(f, trechos, categoria_trecho))
+    return np.vstack(div_qtd), np.vstack(div_valor)
+
+
+def _simular_lote_compartilhado(nome_shm, layout, n_replicacoes, semente, memoria_mb):
+    """Worker: _simular_lote com os arrays por material em memória compartilhada"""
+    shm, arrays = anexar_arrays(nome_shm, layout)
+    try:
+        return _simular_lote(arrays, arrays['trechos'], arrays['categoria_trecho'],
+                             n_replicacoes, semente, memoria_mb)
+    finally:
+        del arrays  # views do buffer precisam sumir antes do close()
+        shm.close()
+
+
+def simular_acuracidade(sistema, precos, categorias, n_replicacoes=N_REPLICACOES,
+                        semente=SEMENTE, memoria_mb=MEMORIA_BLOCO_MB, processos=1):
+    """
+    Monte Carlo da contagem física. Retorna (acuracidade_qtd,
+    acuracidade_valor): DataFrames replicações × (categorias + TOTAL), em %:
+    (1 - |Σ divergência| / Σ sistema) × 100. Categoria nula entra como
+    SEM_CATEGORIA.
+
+    As replicações vão em lotes de REPLICACOES_POR_LOTE, cada um com a sua
+    semente filha (SeedSequence.spawn): `processos` > 1 (ou None =
+    automático a partir de MIN_CELULAS_PARALELO) distribui os lotes entre
+    workers com o mesmo resultado da execução em série. `memoria_mb` vale
+    por processo.
+    """
+    categorias = pd.Series(np.asarray(categorias, dtype=object)).fillna(SEM_CATEGORIA).astype(str)
+    codigos, nomes = pd.factorize(categorias, sort=True)
+    ordem = np.argsort(codigos, kind='stable')
+    codigos = codigos[ordem]
+    inicios = np.flatnonzero(np.diff(codigos, prepend=-1))
+    trechos, categoria_trecho = _trechos(inicios, len(codigos))
+
+    sistema = np.asarray(sistema, dtype=np.float64)[ordem]
+    precos = np.asarray(precos, dtype=np.float64)[ordem]
+    problematica = categorias.iloc[ordem].isin(CATEGORIAS_PROBLEMATICAS).to_numpy()
+    sistema_cat = np.add.reduceat(sistema, inicios)
+    valor_cat = np.add.reduceat(sistema * precos, inicios)
+    prob, a_grande, b_grande, a_pequena, b_pequena = _coeficientes(sistema, problematica)
+    materiais = {'prob': prob, 'a_pequena': a_pequena, 'b_pequena': b_pequena,
+                 'delta_a': a_grande - a_pequena, 'delta_b': b_grande - b_pequena,
+                 'sistema': sistema.astype(np.float32), 'precos': precos.astype(np.float32)}
+
+    tamanhos = [min(REPLICACOES_POR_LOTE, n_replicacoes - i)
+                for i in range(0, n_replicacoes, REPLICACOES_POR_LOTE)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    processos = min(numero_processos(processos, len(sistema) * n_replicacoes, MIN_CELULAS_PARALELO),
+                    max(len(tamanhos), 1))
+    if processos > 1:
+        shm, layout = publicar_arrays(dict(materiais, trechos=trechos, categoria_trecho=categoria_trecho))
+        try:
+            with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+                lotes = list(executor.map(_simular_lote_compartilhado, repeat(shm.name), repeat(layout),
+                                          tamanhos, sementes, repeat(memoria_mb)))
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        lotes = [_simular_lote(materiais, trechos, categoria_trecho, r, s, memoria_mb)
+                 for r, s in zip(tamanhos, sementes)]
+    div_qtd = np.vstack([q for q, _ in lotes]) if lotes else np.zeros((0, len(inicios)))
+    div_valor = np.vstack([v for _, v in lotes]) if lotes else np.zeros((0, len(inicios)))
+
+    colunas = list(nomes) + [TOTAL]
+
+    def acuracidade(divergencia, base):
+        divergencia = np.column_stack([divergencia, divergencia.sum(axis=1)])
+        base = np.append(base, base.sum())
+        return pd.DataFrame((1 - np.abs(divergencia) / base) * 100, columns=colunas)
+
+    return acuracidade(div_qtd, sistema_cat), acuracidade(div_valor, valor_cat)
+
+
+def intervalos(replicacoes, nivel=NIVEL_CONFIANCA):
+    """DataFrame categoria → média, desvio e percentis do intervalo de confiança"""
+    cauda = (1 - nivel) / 2 * 100
+    return pd.DataFrame({
+        'media': replicacoes.mean(),
+        'desvio': replicacoes.std(ddof=1),
+        'ic_inferior': np.percentile(replicacoes, cauda, axis=0),
+        'ic_superior': np.percentile(replicacoes, 100 - cauda, axis=0),
+    })
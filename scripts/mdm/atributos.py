@@ -0,0 +1,96 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Extração de atributos estruturados da descrição
+═══════════════════════════════════════════════════════════════════════════════
+
+As descrições seguem o padrão "{tipo}{espec} {material}" com variações de
+caixa, ordem e conectivos ("Parafuso M10 Inox", "parafuso Inox M10",
+"Tubo 1/2\" em PVC"). extrair_atributos() separa cada uma em:
+
+  tipo           → "parafuso"
+  material       → "inox"
+  especificacao  → "m10" (tokens técnicos + o que sobrar, ordenados)
+
+VOCABULÁRIOS (compilados dos próprios dados, sem lista fixa):
+- tipo     = palavra na 1ª posição que aparece com >= `min_parceiros`
+             materiais diferentes
+- material = palavra na última posição que aparece com >= `min_parceiros`
+             tipos diferentes
+Material é compartilhado por vários tipos; tamanho de luva (P, GG, XG) só
+aparece com "luva", então não entra como material e vai para especificacao.
+
+Com as três colunas, duplicatas e checagens de categoria viram joins por
+igualdade (groupby/merge) em vez de similaridade de texto. O parse roda uma
+vez por descrição distinta (pd.factorize).
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from mdm.texto import normalizar_texto, separar_tokens
+
+COLUNAS_ATRIBUTOS = ['tipo', 'material', 'especificacao']
+
+
+def _vocabularios(listas_palavras, min_parceiros):
+    """(tipos, materiais) a partir das palavras de cada descrição distinta"""
+    materiais_do_tipo = defaultdict(set)
+    tipos_do_material = defaultdict(set)
+    for palavras in listas_palavras:
+        if len(palavras) < 2:
+            continue
+        materiais_do_tipo[palavras[0]].add(palavras[-1])
+        tipos_do_material[palavras[-1]].add(palavras[0])
+
+    tipos = frozenset(t for t, m in materiais_do_tipo.items() if len(m) >= min_parceiros)
+    materiais = frozenset(m for m, t in tipos_do_material.items() if len(t) >= min_parceiros)
+    return tipos, materiais
+
+
+def separar_atributos(palavras, specs, tipos, materiais):
+    """(tipo, material, especificacao) a partir dos tokens de uma descrição"""
+    palavras = list(palavras)
+
+    # Tipo: 1ª palavra do vocabulário (ordem trocada: "aco parafuso m8");
+    # sem nenhuma, a 1ª palavra (tipo novo ou com erro de digitação)
+    tipo = next((p for p in palavras if p in tipos), palavras[0] if palavras else '')
+    if tipo:
+        palavras.remove(tipo)
+
+    # Material: última palavra do vocabulário, senão a última que sobrou
+    material = next((p for p in reversed(palavras) if p in materiais), palavras[-1] if palavras else '')
+    if material:
+        palavras.remove(material)
+
+    return tipo, material, ' '.join(sorted(specs + palavras))
+
+
+def extrair_atributos(descricoes, tipos=None, materiais=None):
+    """
+    DataFrame (mesmo índice da série) com tipo, material e especificacao.
+
+    Sem vocabulários informados, compila a partir das próprias descrições.
+    Descrições vazias geram strings vazias.
+    """
+    serie = pd.Series(descricoes)
+    codigos, unicos = pd.factorize(serie)
+    tokens = [separar_tokens(normalizar_texto(d)) for d in unicos]
+    if tipos is None or materiais is None:
+        tipos, materiais = _vocabularios((palavras for palavras, _ in tokens), min_parceiros=3)
+
+    atributos = [separar_atributos(palavras, specs, tipos, materiais) for palavras, specs in tokens]
+    atributos.append(('', '', ''))  # posição -1 = vazio
+
+    tabela = np.array(atributos, dtype=object).reshape(-1, 3)[codigos]
+    return pd.DataFrame(tabela, index=serie.index, columns=COLUNAS_ATRIBUTOS)
+
+
+def chave_atributos(atributos):
+    """Chave de join "tipo|material|especificacao"; vazia se faltar tipo ou material"""
+    chave = atributos['tipo'] + '|' + atributos['material'] + '|' + atributos['especificacao']
+    completa = (atributos['tipo'] != '') & (atributos['material'] != '')
+    return chave.where(completa)
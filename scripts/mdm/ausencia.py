@@ -0,0 +1,99 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Perfil de ausência por bitmask (padrões de campos vazios)
+═══════════════════════════════════════════════════════════════════════════════
+
+A matriz registros × campos de nulos (df.isnull()) cresce com o cadastro,
+mas o número de COMBINAÇÕES de campos vazios que de fato ocorrem é pequeno.
+Cada linha vira um inteiro de 64 bits (bit j ligado = campo j vazio) e o
+perfil guarda só a contagem de cada (categoria, máscara):
+
+  grupo        mascara   qtd
+  Hidráulico   0         812      ← nenhum campo vazio
+  Hidráulico   2176      41       ← bits 7 e 11: fornecedor + centro_custo
+
+As estatísticas de padrões saem dessa tabela compacta (contagens por
+campo e por categoria vêm do rollup, mdm.rollup):
+  coausência    → Bᵀ · (B × qtd), B = bits dos padrões (padrões × campos)
+  top padrões   → maiores qtd somadas por máscara
+
+Perfis de partes do cadastro se combinam somando qtd (combinar_perfis).
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_CAMPOS = 64
+COLUNAS_PERFIL = ['grupo', 'mascara', 'qtd']
+
+
+def mascara_ausencia(df, campos):
+    """Array uint64 por linha: bit j ligado = campos[j] nulo"""
+    if len(campos) > MAX_CAMPOS:
+        raise ValueError(f"Máximo de {MAX_CAMPOS} campos por máscara ({len(campos)} informados)")
+    mascara = np.zeros(len(df), dtype=np.uint64)
+    for j, campo in enumerate(campos):
+        mascara |= df[campo].isna().to_numpy().astype(np.uint64) << np.uint64(j)
+    return mascara
+
+
+def perfil_padroes(grupos, mascaras):
+    """Tabela (grupo, mascara, qtd) com a contagem de cada padrão por grupo"""
+    tabela = pd.DataFrame({'grupo': np.asarray(grupos, dtype=object), 'mascara': mascaras})
+    perfil = tabela.groupby(['grupo', 'mascara'], sort=False, dropna=False).size()
+    return perfil.rename('qtd').reset_index()[COLUNAS_PERFIL]
+
+
+def combinar_perfis(perfis):
+    """Soma perfis de partes do cadastro (arquivos, lotes, workers)"""
+    perfil = pd.concat(perfis, ignore_index=True)
+    perfil = perfil.groupby(['grupo', 'mascara'], sort=False, dropna=False)['qtd'].sum()
+    return perfil.reset_index()[COLUNAS_PERFIL]
+
+
+def projetar_perfil(perfil, campos, subconjunto):
+    """Perfil restrito a `subconjunto` dos campos (bits remapeados e padrões somados)"""
+    bits = bits_mascara(perfil['mascara'], len(campos))[:, [campos.index(c) for c in subconjunto]]
+    pesos = np.uint64(1) << np.arange(len(subconjunto), dtype=np.uint64)
+    projetado = perfil.assign(mascara=(bits.astype(np.uint64) * pesos).sum(axis=1, dtype=np.uint64))
+    return combinar_perfis([projetado])
+
+
+def bits_mascara(mascaras, n_campos):
+    """Matriz booleana (máscaras × campos) com os bits ligados"""
+    mascaras = np.asarray(mascaras, dtype=np.uint64)
+    deslocamentos = np.arange(n_campos, dtype=np.uint64)
+    return ((mascaras[:, None] >> deslocamentos) & np.uint64(1)).astype(bool)
+
+
+def coausencia(perfil, campos):
+    """Matriz campo × campo: registros com os dois campos vazios (diagonal = vazios do campo)"""
+    bits = bits_mascara(perfil['mascara'], len(campos)).astype(np.int64)
+    contagem = bits.T @ (bits * perfil['qtd'].to_numpy()[:, None])
+    return pd.DataFrame(contagem, index=campos, columns=campos)
+
+
+def padroes_principais(perfil, campos, n=20):
+    """
+    Os n padrões de ausência mais frequentes (somados entre grupos), com
+    qtd, % dos registros, nº de campos vazios e a lista dos campos.
+    """
+    por_mascara = perfil.groupby('mascara', sort=False)['qtd'].sum()
+    top = por_mascara.sort_values(ascending=False, kind='stable').head(n)
+    bits = bits_mascara(top.index, len(campos))
+    nomes = np.array(campos, dtype=object)
+    return pd.DataFrame({
+        'mascara': top.index.to_numpy(),
+        'qtd': top.to_numpy(),
+        'pct': (top / por_mascara.sum() * 100).to_numpy(),
+        'n_ausentes': bits.sum(axis=1),
+        'campos_ausentes': [', '.join(nomes[linha]) for linha in bits],
+    })
+
+
+def matriz_padroes(padroes, campos):
+    """DataFrame booleano (padrão × campo) para o heatmap, rótulos com a qtd"""
+    rotulos = [f"{q:,} ({p:.1f}%)" for q, p in zip(padroes['qtd'], padroes['pct'])]
+    return pd.DataFrame(bits_mascara(padroes['mascara'], len(campos)), index=rotulos, columns=campos)
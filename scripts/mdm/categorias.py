@@ -0,0 +1,84 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Normalização de colunas categóricas por dicionário de valores
+═══════════════════════════════════════════════════════════════════════════════
+
+categoria, unidade_medida, status, fornecedor_principal e
+responsavel_cadastro têm poucas dezenas de valores distintos em milhões de
+linhas. Como pd.Categorical, cada coluna vira um dicionário (categorias) +
+um array de códigos inteiros:
+
+  categorias: ['ATIVO', 'Ativo', 'ativo ']      códigos: 1 1 0 2 1 ...
+
+strip / title / upper rodam só nas CATEGORIAS; valores que colidem após a
+normalização ('ATIVO', 'Ativo', 'ativo ' → 'Ativo') viram uma categoria e
+os códigos são remapeados por indexação (tabela[códigos]). O texto de cada
+linha nunca é reprocessado, e a coluna ocupa 1 byte por linha (int8) em
+vez de um objeto str.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CATEGORICAS = ['categoria', 'unidade_medida', 'status',
+                       'fornecedor_principal', 'responsavel_cadastro']
+
+
+def como_categorica(serie):
+    """A própria série se já for categórica, senão astype('category')"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype('category')
+
+
+def _transformar(textos, metodos):
+    """Aplica os métodos .str em sequência (ex.: 'strip', 'title')"""
+    for metodo in metodos:
+        textos = getattr(textos.str, metodo)()
+    return textos
+
+
+def _categorias_normalizadas(serie, metodos):
+    """(série categórica, categorias originais em str, categorias normalizadas)"""
+    serie = como_categorica(serie)
+    originais = pd.Series([str(v) for v in serie.cat.categories], dtype=object)
+    return serie, originais, _transformar(originais, metodos)
+
+
+def normalizar(serie, *metodos):
+    """Série categórica com os métodos .str aplicados só às categorias (nulos continuam nulos)"""
+    serie, _, normalizadas = _categorias_normalizadas(serie, metodos)
+    if not len(normalizadas):
+        return serie
+    categorias, mapa = np.unique(normalizadas.to_numpy(dtype=object), return_inverse=True)
+    codigos = serie.cat.codes.to_numpy()
+    novos = np.where(codigos >= 0, mapa[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(novos, categories=categorias),
+                     index=serie.index, name=serie.name)
+
+
+def alterados(serie, *metodos):
+    """Máscara por linha: valor não nulo que muda com a normalização"""
+    serie, originais, normalizadas = _categorias_normalizadas(serie, metodos)
+    muda = np.append((originais != normalizadas).to_numpy(dtype=bool), False)
+    return pd.Series(muda[serie.cat.codes.to_numpy()], index=serie.index)
+
+
+def variantes(serie, *metodos):
+    """
+    Dicionário valor normalizado → conjunto de valores originais (não nulos),
+    na ordem de 1ª aparição nas linhas.
+    """
+    _, valores = pd.factorize(serie)
+    originais = pd.Series([str(v) for v in valores], dtype=object)
+    grupos = {}
+    for original, normalizado in zip(originais, _transformar(originais, metodos)):
+        grupos.setdefault(normalizado, set()).add(original)
+    return grupos
+
+
+def memoria_mb(df, colunas):
+    """Memória (MB, deep) ocupada pelas colunas"""
+    return df[colunas].memory_usage(deep=True, index=False).sum() / 1024 ** 2
@@ -0,0 +1,94 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Classificação de categoria por palavras-chave (uma varredura)
+═══════════════════════════════════════════════════════════════════════════════
+
+O mapa categoria → palavras-chave vira UM autômato (mdm.multipadrao), com
+as palavras na ordem do mapa (a ordem é a prioridade). O cálculo é feito
+por par distinto (descrição, categoria atual) e depois espalhado para as
+linhas; cada descrição distinta é varrida uma vez e o resto é aritmética
+sobre a matriz esparsa pares × palavras:
+
+  ocorrências  (par, palavra), palavras em ordem dentro de cada par
+  categoria    código da categoria de cada palavra vs. categoria atual
+
+Por linha, sem laço sobre palavras nem iterrows:
+
+  categoria_sugerida, palavra_chave   1ª palavra encontrada (na ordem do
+                                      mapa) de OUTRA categoria que a atual
+  indice_palavra                      posição dessa palavra no mapa (-1)
+  n_categorias                        categorias distintas encontradas
+  confirma_atual                      alguma palavra da categoria atual
+  conflito                            palavras de 2+ categorias
+
+O custo é o da varredura dos textos distintos + nº de ocorrências (sem
+np.unique: pares e ocorrências já saem ordenados); não cresce com
+palavras × linhas.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+from mdm.multipadrao import MultiPadrao
+
+
+class ClassificadorPalavrasChave:
+    """Sugestão de categoria pela 1ª palavra-chave (ordem do mapa) encontrada na descrição"""
+
+    def __init__(self, mapa, normalizar=str.lower):
+        self.palavras = [kw for palavras in mapa.values() for kw in palavras]
+        self.categorias = pd.Index(list(mapa))
+        self.categoria_palavra = np.repeat(np.arange(len(mapa)), [len(p) for p in mapa.values()])
+        self.automato = MultiPadrao(self.palavras, normalizar=normalizar)
+
+    def __len__(self):
+        return len(self.palavras)
+
+    def classificar(self, descricoes, categorias_atuais=None):
+        """DataFrame por linha (mesmo índice de `descricoes`) com as colunas do módulo"""
+        descricoes = pd.Series(descricoes)
+        k = len(self.categorias)
+        atual = (np.full(len(descricoes), -1, dtype=np.int64) if categorias_atuais is None
+                 else self.categorias.get_indexer(pd.Series(categorias_atuais)))
+        # Trabalho por par distinto (descrição, categoria atual), não por linha
+        cod_desc, descricoes_unicas = pd.factorize(descricoes)
+        cod_par, pares = pd.factorize(np.where(cod_desc >= 0, cod_desc, -1).astype(np.int64) * (k + 1) + atual + 1)
+        desc_par = np.asarray(pares) // (k + 1)
+        atual_par = np.asarray(pares) % (k + 1) - 1
+        texto_par = pd.Series(np.asarray(descricoes_unicas, dtype=object)).reindex(desc_par).to_numpy()
+        n = len(pares)
+
+        presenca = self.automato.matriz(pd.Series(texto_par, dtype=object))
+        presenca.sort_indices()
+        linhas = np.repeat(np.arange(n), np.diff(presenca.indptr))
+        palavras = presenca.indices.astype(np.int64)
+        cat_encontrada = self.categoria_palavra[palavras]
+
+        # Categorias distintas por par: (linha, categoria) ordenados, conta as trocas
+        chave = np.sort(linhas * max(k, 1) + cat_encontrada)
+        nova = np.diff(chave, prepend=-1) != 0
+        n_categorias = np.bincount(chave[nova] // max(k, 1), minlength=n)
+        mesma = cat_encontrada == atual_par[linhas]
+        confirma = np.bincount(linhas[mesma], minlength=n) > 0
+
+        # 1ª palavra de outra categoria: linhas já ordenadas, índices em ordem na linha
+        linhas_outra, palavras_outra = linhas[~mesma], palavras[~mesma]
+        primeira = np.flatnonzero(np.diff(linhas_outra, prepend=-1) != 0)
+        indice = np.full(n, -1, dtype=np.int64)
+        indice[linhas_outra[primeira]] = palavras_outra[primeira]
+        tem = indice >= 0
+
+        palavra_chave = np.full(n, np.nan, dtype=object)
+        palavra_chave[tem] = np.asarray(self.palavras, dtype=object)[indice[tem]]
+        sugerida = np.full(n, np.nan, dtype=object)
+        sugerida[tem] = self.categorias.to_numpy(dtype=object)[self.categoria_palavra[indice[tem]]]
+        return pd.DataFrame({
+            'categoria_sugerida': sugerida[cod_par],
+            'palavra_chave': palavra_chave[cod_par],
+            'indice_palavra': indice[cod_par],
+            'n_categorias': n_categorias[cod_par],
+            'confirma_atual': confirma[cod_par],
+            'conflito': n_categorias[cod_par] > 1,
+        }, index=descricoes.index)
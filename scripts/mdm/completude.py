@@ -0,0 +1,95 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Score ponderado de completude / qualidade por registro
+═══════════════════════════════════════════════════════════════════════════════
+
+Os scripts 02 (completude) e 15 (pipeline) pontuam cada material somando
+pesos dos critérios atendidos. Em vez de df.apply(axis=1), que visita cada
+célula em Python, o cálculo é feito em duas etapas vetorizadas:
+
+  1. matriz booleana registros × critérios (ex.: campo preenchido =
+     não nulo e, em colunas de texto, não vazio após strip, testado uma
+     vez por valor distinto via pd.factorize)
+  2. pontos = matriz @ vetor de pesos (um único produto matriz-vetor)
+
+O arredondamento usa round() do Python sobre os valores DISTINTOS de pontos
+(poucas dezenas), então o score sai idêntico ao cálculo linha a linha.
+Classes por faixa de score saem de np.select.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def coluna_preenchida(serie):
+    """
+    Array booleano: pd.notna(v) and str(v).strip() != '' (strip só em
+    colunas de texto, uma vez por valor distinto)
+    """
+    if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+        return serie.notna().to_numpy()
+    codigos, unicos = pd.factorize(serie)
+    preenchido = np.fromiter((str(v).strip() != '' for v in unicos), dtype=bool, count=len(unicos))
+    # Código -1 (nulo) cai na posição extra do fim
+    return np.append(preenchido, False)[codigos]
+
+
+def ncm_valido(ncm):
+    """NCM de 8 dígitos: str(int(x)) com 8 dígitos, x não nulo e diferente de 0"""
+    valores = pd.to_numeric(ncm, errors='coerce').to_numpy(dtype=np.float64)
+    inteiros = np.trunc(valores)
+    return (~np.isnan(valores)) & (inteiros >= 10_000_000) & (inteiros <= 99_999_999)
+
+
+def matriz_preenchida(df, colunas):
+    """Matriz booleana (linhas × colunas) de campos preenchidos"""
+    matriz = np.empty((len(df), len(colunas)), dtype=bool)
+    for j, coluna in enumerate(colunas):
+        matriz[:, j] = coluna_preenchida(df[coluna])
+    return matriz
+
+
+def pontuar(criterios, pesos):
+    """
+    Soma dos pesos dos critérios atendidos por linha.
+    `criterios`: DataFrame/matriz booleana com uma coluna por peso, na ordem
+    de `pesos` (dict critério → peso ou lista de pesos).
+    """
+    vetor = np.asarray(list(pesos.values()) if isinstance(pesos, dict) else pesos)
+    # Produto via BLAS; pesos inteiros com soma < 2^24 são exatos em float32
+    inteiros = np.issubdtype(vetor.dtype, np.integer) and np.abs(vetor).sum() < 2 ** 24
+    tipo = np.float32 if inteiros else np.float64
+    pontos = np.asarray(criterios, dtype=tipo) @ vetor.astype(tipo)
+    return pontos.astype(np.int64) if inteiros else pontos
+
+
+def score_percentual(pontos, peso_total, casas=1):
+    """round(pontos / peso_total * 100, casas) do Python, aplicado por valor distinto"""
+    if np.issubdtype(pontos.dtype, np.integer) and len(pontos) and pontos.min() >= 0:
+        # Pesos inteiros: tabela indexada pelos próprios pontos (0..máximo)
+        tabela = np.array([round(p / peso_total * 100, casas) for p in range(int(pontos.max()) + 1)])
+        return tabela[pontos]
+    unicos, inverso = np.unique(pontos, return_inverse=True)
+    tabela = np.array([round(p / peso_total * 100, casas) for p in unicos.tolist()], dtype=np.float64)
+    return tabela[inverso]
+
+
+def score_completude(df, pesos):
+    """Score 0–100 (1 casa) por linha: pesos dos campos preenchidos / peso total"""
+    pontos = pontuar(matriz_preenchida(df, list(pesos)), pesos)
+    return pd.Series(score_percentual(pontos, sum(pesos.values())), index=df.index)
+
+
+def classificar_faixas(scores, faixas, padrao):
+    """
+    Rótulo da 1ª faixa (limite mínimo, rótulo) com score >= limite, senão
+    `padrao`. Faixas em ordem decrescente de limite.
+    """
+    valores = np.asarray(scores)
+    # np.select sobre o número da faixa; os textos saem de uma tabela
+    faixa = np.select([valores >= limite for limite, _ in faixas], list(range(len(faixas))),
+                      default=len(faixas))
+    rotulos = np.array([rotulo for _, rotulo in faixas] + [padrao], dtype=object)
+    return pd.Series(rotulos[faixa], index=getattr(scores, 'index', None))
@@ -0,0 +1,183 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Cubo fornecedor × categoria × curva ABC × status (em cache colunar)
+═══════════════════════════════════════════════════════════════════════════════
+
+04, 06 e 16 montavam cada um a sua visão de valor por fornecedor e a sua
+curva ABC (groupby com lambda, sort + cumsum por script). Aqui as linhas
+passam UMA vez por um groupby no grão:
+
+  fornecedor × categoria × curva_abc × status → qtd_materiais, valor_estoque
+
+  fornecedor  nome canônico do mdm.fornecedores (variações do mesmo
+              fornecedor somam juntas); nulo → "(vazio)"
+  curva_abc   Pareto do valor por CÓDIGO de material (1ª ocorrência de
+              cada código): A até 80%, B até 95%, C no resto
+
+Cada célula já leva as métricas de concentração do seu fornecedor e da
+sua categoria:
+
+  valor_fornecedor, pct_acumulado_fornecedor,   Pareto dos fornecedores
+  classe_fornecedor, participacao_fornecedor    (curva ABC de fornecedores)
+  hhi_categoria                                 Herfindahl-Hirschman da
+                                                categoria: Σ (participação
+                                                % de cada fornecedor)²
+
+O cubo tem no máximo fornecedores × 15 × 3 × 3 linhas, e qualquer visão
+(por fornecedor, por curva, por categoria, ...) é um groupby sobre ele.
+Fica em .npz, um array por coluna: carregar_cubo() lê só as colunas
+pedidas. obter_cubo() só recalcula quando o CSV de origem (ou o índice de
+fornecedores) for mais novo que o cache, ou quando o cache veio de outro
+CSV (array `origens` com o caminho absoluto).
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from mdm.fornecedores import ARQUIVO_INDICE_FORNECEDORES, IndiceFornecedores
+from mdm.rollup import VAZIO, texto_origens
+
+ARQUIVO_CUBO = 'data/processed/cubo_fornecedores.npz'
+DIMENSOES_CUBO = ['fornecedor', 'categoria', 'curva_abc', 'status']
+METRICAS_CUBO = ['qtd_materiais', 'valor_estoque']
+
+LIMITE_A = 80
+LIMITE_B = 95
+
+
+def classe_abc(pct_acumulado):
+    """'A' até LIMITE_A %, 'B' até LIMITE_B %, senão 'C'"""
+    pct = np.asarray(pct_acumulado, dtype=np.float64)
+    return np.select([pct <= LIMITE_A, pct <= LIMITE_B], ['A', 'B'], default='C').astype(object)
+
+
+def curva_abc_materiais(codigos, valores):
+    """Classe ABC por linha: Pareto do valor da 1ª ocorrência de cada código"""
+    codigos, _ = pd.factorize(codigos, use_na_sentinel=False)
+    _, primeira = np.unique(codigos, return_index=True)
+    ordenado = pd.Series(np.asarray(valores, dtype=np.float64)[primeira]).sort_values(ascending=False)
+    classe = np.empty(len(primeira), dtype=object)
+    classe[ordenado.index] = classe_abc(ordenado.cumsum() / ordenado.sum() * 100)
+    return classe[codigos]
+
+
+def pareto(tabela, coluna_valor='valor_total'):
+    """Tabela em ordem decrescente de valor + valor_acumulado, perc_acumulado, classe_abc e perc_valor"""
+    tabela = tabela.sort_values(coluna_valor, ascending=False)
+    total = tabela[coluna_valor].sum()
+    tabela['valor_acumulado'] = tabela[coluna_valor].cumsum()
+    tabela['perc_acumulado'] = tabela['valor_acumulado'] / total * 100
+    tabela['classe_abc'] = classe_abc(tabela['perc_acumulado'])
+    tabela['perc_valor'] = (tabela[coluna_valor] / total * 100).round(1)
+    return tabela
+
+
+def _por_fornecedor(cubo):
+    """qtd_materiais e valor_total por fornecedor (sem o "(vazio)"), por nome"""
+    com_fornecedor = cubo[cubo['fornecedor'] != VAZIO]
+    return (com_fornecedor.groupby('fornecedor', sort=True)[METRICAS_CUBO].sum()
+            .rename(columns={'valor_estoque': 'valor_total'}).reset_index())
+
+
+def hhi(cubo, por=None):
+    """
+    Índice Herfindahl-Hirschman do valor entre fornecedores (0–10.000),
+    geral ou por dimensão(ões) `por` (Série). Sem fornecedor fica de fora.
+    """
+    com_fornecedor = cubo[cubo['fornecedor'] != VAZIO]
+    por = [por] if isinstance(por, str) else list(por or [])
+    valor = com_fornecedor.groupby(por + ['fornecedor'], sort=True)['valor_estoque'].sum()
+    if not por:
+        return float(((valor / valor.sum() * 100) ** 2).sum())
+    participacao = valor / valor.groupby(level=por).transform('sum') * 100
+    return (participacao ** 2).groupby(level=por).sum()
+
+
+def construir_cubo(df, indice_fornecedores=None):
+    """Cubo (DataFrame) a partir dos materiais; fornecedores resolvidos pelo índice"""
+    salvar_indice = indice_fornecedores is None
+    if salvar_indice:
+        indice_fornecedores = IndiceFornecedores.carregar()
+    valor = (df['preco_unitario'] * df['estoque_atual']).to_numpy(dtype=np.float64)
+    n_nomes = len(indice_fornecedores)
+    fornecedor = indice_fornecedores.resolver(df['fornecedor_principal'])['nome_canonico']
+    if salvar_indice and len(indice_fornecedores) > n_nomes:
+        # Gravado antes do cubo, para o cache não ficar mais velho que o índice
+        indice_fornecedores.salvar()
+    fatos = pd.DataFrame({
+        'fornecedor': fornecedor.fillna(VAZIO).to_numpy(dtype=object),
+        'categoria': df['categoria'].fillna(VAZIO).to_numpy(dtype=object),
+        'curva_abc': curva_abc_materiais(df['codigo_material'], valor),
+        'status': df['status'].fillna(VAZIO).to_numpy(dtype=object),
+        'valor_estoque': valor,
+    })
+    cubo = (fatos.groupby(DIMENSOES_CUBO, sort=True)
+            .agg(qtd_materiais=('valor_estoque', 'size'), valor_estoque=('valor_estoque', 'sum'))
+            .reset_index())
+
+    fornecedores = pareto(_por_fornecedor(cubo)).set_index('fornecedor')
+    por_fornecedor = fornecedores.reindex(cubo['fornecedor'])
+    cubo['valor_fornecedor'] = por_fornecedor['valor_total'].to_numpy()
+    cubo['pct_acumulado_fornecedor'] = por_fornecedor['perc_acumulado'].to_numpy()
+    cubo['classe_fornecedor'] = por_fornecedor['classe_abc'].fillna('').to_numpy(dtype=object)
+    cubo['participacao_fornecedor'] = (por_fornecedor['valor_total']
+                                       / fornecedores['valor_total'].sum() * 100).to_numpy()
+    cubo['hhi_categoria'] = hhi(cubo, 'categoria').reindex(cubo['categoria']).to_numpy()
+    return cubo
+
+
+def salvar_cubo(cubo, caminho=ARQUIVO_CUBO, origens=()):
+    """Grava um array por coluna (texto como unicode de tamanho fixo, sem pickle) + `origens`"""
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    colunas = {}
+    for coluna in cubo.columns:
+        valores = cubo[coluna]
+        if valores.dtype.kind in 'biuf':
+            colunas[coluna] = valores.to_numpy()
+        else:
+            colunas[coluna] = valores.to_numpy(dtype=object).astype(str)
+    np.savez(caminho, origens=np.str_(texto_origens(origens)), **colunas)
+
+
+def carregar_cubo(caminho=ARQUIVO_CUBO, colunas=None):
+    """Cubo salvo; com `colunas`, só esses arrays são lidos do arquivo"""
+    with np.load(caminho) as dados:
+        return pd.DataFrame({c: dados[c] for c in (colunas or [f for f in dados.files if f != 'origens'])})
+
+
+def origens_cubo(caminho=ARQUIVO_CUBO):
+    """Texto `origens` gravado no cubo ('' em cache antigo, sem o array)"""
+    with np.load(caminho) as dados:
+        return str(dados['origens']) if 'origens' in dados.files else ''
+
+
+def obter_cubo(arquivo_origem, caminho=ARQUIVO_CUBO, colunas=None):
+    """
+    Cubo do cache; recalculado (e regravado) se faltar, for mais velho que a
+    origem/índice ou tiver sido gerado de outro CSV.
+    """
+    dependencias = [arquivo_origem] + [a for a in [ARQUIVO_INDICE_FORNECEDORES] if os.path.exists(a)]
+    if (os.path.exists(caminho)
+            and all(os.path.getmtime(caminho) >= os.path.getmtime(a) for a in dependencias)
+            and origens_cubo(caminho) == texto_origens(arquivo_origem)):
+        return carregar_cubo(caminho, colunas)
+    cubo = construir_cubo(pd.read_csv(arquivo_origem))
+    salvar_cubo(cubo, caminho, arquivo_origem)
+    return cubo[colunas] if colunas else cubo
+
+
+def visao_cubo(cubo, dimensoes, incluir_vazio=True):
+    """qtd_materiais e valor_estoque somados por `dimensoes` (índice ordenado)"""
+    linhas = cubo
+    if not incluir_vazio:
+        linhas = cubo[(cubo[dimensoes] != VAZIO).all(axis=1)]
+    return linhas.groupby(dimensoes, sort=True)[METRICAS_CUBO].sum()
+
+
+def visao_fornecedores(cubo):
+    """Curva ABC de fornecedores (fornecedor, qtd_materiais, valor_total, valor_acumulado, ...)"""
+    return pareto(_por_fornecedor(cubo))
@@ -0,0 +1,438 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Detecção de duplicatas
+═══════════════════════════════════════════════════════════════════════════════
+
+- resumir_grupos  → lista de correção no formato de data/processed/duplicatas.csv
+- impacto_grupos  → valor em estoque e economia de custo de capital por grupo
+- pares_fuzzy     → pares candidatos por blocagem + similaridade textual
+- duplicatas_fuzzy→ Método 3 completo (pares → grupos → resumo)
+- arestas_por_chave / clusters_transitivos → junta arestas de vários métodos
+  em clusters via union-find (mdm/unionfind.py)
+
+BLOCAGEM:
+Comparar todos contra todos é O(n²) (1,2M materiais = 7×10¹¹ pares). Cada
+material recebe chaves de bloco e só é comparado dentro do próprio bloco:
+  1. categoria + prefixos dos tokens ordenados ("Fixação|aco par")
+  2. unidade_medida + prefixo do tipo + especificações ("UN|par|m8")
+Dentro do bloco, as descrições distintas são ordenadas pela chave de tokens e
+cada uma é comparada só com as `janela` vizinhas (sorted neighbourhood), o que
+mantém o custo em O(n × janela) mesmo para blocos grandes.
+
+PARALELISMO (pares_fuzzy com processos > 1):
+Gerar candidatos é numpy vetorizado e barato; o custo está na normalização
+das descrições e na similaridade (Python puro). As duas etapas são divididas
+em faixas e enviadas a workers via memória compartilhada (mdm/paralelo.py).
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from mdm.paralelo import (SHARDS_POR_PROCESSO, TextosCompartilhados, anexar_arrays, codificar_textos,
+                          contexto_processos, numero_processos, publicar_arrays)
+from mdm.texto import preparar_descricoes, prefixos_tokens
+from mdm.unionfind import UniaoBusca
+
+COLUNAS_DUPLICATAS = [
+    'descricao', 'qtd_duplicatas', 'codigos_todos', 'codigo_manter',
+    'codigos_eliminar', 'categoria', 'valor_total_estoque', 'preco_medio',
+    'estoque_total',
+]
+
+
+# Grupos maiores que isso somam com np.cumsum (1 chamada por grupo) em vez do
+# passo a passo vetorizado, que faz 1 iteração por posição do maior grupo
+LIMITE_PASSO_A_PASSO = 256
+
+# pares_fuzzy(processos=None) só paraleliza a partir deste tamanho de cadastro
+MIN_LINHAS_PARALELO = 200_000
+
+
+def _ordenar_estavel(ids):
+    """
+    argsort estável de ids inteiros não negativos por radix de 16 bits (o
+    numpy usa radix sort para uint16), bem mais rápido que o mergesort em int64.
+    """
+    ordem = np.arange(len(ids))
+    deslocamento = 0
+    maior = int(ids.max()) if len(ids) else 0
+    while True:
+        digito = ((ids[ordem] >> deslocamento) & 0xFFFF).astype(np.uint16)
+        ordem = ordem[np.argsort(digito, kind='stable')]
+        deslocamento += 16
+        if maior >> deslocamento == 0:
+            return ordem
+
+
+def _juntar_segmentos(valores, tamanhos, comprimentos, sep=', '):
+    """
+    sep.join de cada segmento consecutivo de `valores` (tamanhos podem ser 0).
+    Junta tudo numa string só e fatia pelos offsets, em vez de 1 join por grupo.
+    """
+    texto = sep.join(valores.tolist())
+    offsets = np.zeros(len(valores) + 1, dtype=np.int64)
+    np.cumsum(comprimentos + len(sep), out=offsets[1:])
+    fim_item = np.cumsum(tamanhos)
+    inicios = offsets[fim_item - tamanhos].tolist()
+    fins = np.maximum(offsets[fim_item] - len(sep), offsets[fim_item - tamanhos]).tolist()
+    return np.array([texto[i:f] for i, f in zip(inicios, fins)], dtype=object)
+
+
+def _soma_sequencial(valores, inicios, tamanhos):
+    """
+    Soma de cada segmento na ordem das linhas, bit a bit igual ao sum() do
+    Python. Os segmentos avançam juntos: no passo k soma-se o k-ésimo valor
+    de todos os segmentos com mais de k elementos.
+    """
+    somas = np.zeros(len(tamanhos))
+    pequenos = np.flatnonzero(tamanhos <= LIMITE_PASSO_A_PASSO)
+    pequenos = pequenos[np.argsort(-tamanhos[pequenos], kind='stable')]
+    tam, ini = tamanhos[pequenos], inicios[pequenos]
+    acumulado = np.zeros(len(pequenos))
+    for k in range(int(tam[0]) if len(tam) else 0):
+        ativos = np.searchsorted(-tam, -k, side='left')  # tamanhos > k
+        acumulado[:ativos] += valores[ini[:ativos] + k]
+    somas[pequenos] = acumulado
+
+    for g in np.flatnonzero(tamanhos > LIMITE_PASSO_A_PASSO):
+        somas[g] = np.cumsum(valores[inicios[g]:inicios[g] + tamanhos[g]])[-1]
+    return somas
+
+
+def _soma_pareada(valores, inicios, tamanhos):
+    """
+    Soma de cada segmento bit a bit igual ao np.sum/np.mean, que usam soma
+    pareada: < 8 valores em sequência, até 128 em 8 acumuladores, acima
+    disso divide ao meio recursivamente.
+    """
+    somas = np.zeros(len(tamanhos))
+
+    curtos = tamanhos < 8
+    somas[curtos] = _soma_sequencial(valores, inicios[curtos], tamanhos[curtos])
+
+    medios = np.flatnonzero((tamanhos >= 8) & (tamanhos <= 128))
+    if len(medios):
+        ini, tam = inicios[medios], tamanhos[medios]
+        oito = np.arange(8)
+        r = valores[ini[:, None] + oito]
+        blocos = tam // 8
+        for b in range(1, int(blocos.max())):
+            ativos = blocos > b
+            r[ativos] += valores[ini[ativos, None] + 8 * b + oito]
+        soma = ((r[:, 0] + r[:, 1]) + (r[:, 2] + r[:, 3])) + ((r[:, 4] + r[:, 5]) + (r[:, 6] + r[:, 7]))
+        resto = tam % 8
+        for t in range(7):
+            ativos = resto > t
+            soma[ativos] += valores[ini[ativos] + 8 * blocos[ativos] + t]
+        somas[medios] = soma
+
+    grandes = np.flatnonzero(tamanhos > 128)
+    if len(grandes):
+        ini, tam = inicios[grandes], tamanhos[grandes]
+        metade = tam // 2
+        metade -= metade % 8
+        partes = _soma_pareada(valores, np.r_[ini, ini + metade], np.r_[metade, tam - metade])
+        somas[grandes] = partes[:len(grandes)] + partes[len(grandes):]
+    return somas
+
+
+def resumir_grupos(df, col_grupo):
+    """
+    Monta a lista de correção (1 linha por grupo com 2+ materiais).
+
+    Regras: `descricao` é a do primeiro registro do grupo, `codigo_manter` é
+    o de maior estoque_atual e `categoria` vira 'MÚLTIPLAS' quando o grupo
+    mistura categorias. Tudo em agregações agrupadas, sem loop por grupo.
+
+    Os grupos saem na ordem da chave (como no groupby). valor_total_estoque e
+    preco_medio reproduzem exatamente o sum() do Python e o np.mean por grupo,
+    então o CSV não muda em relação à versão com loop.
+    """
+    cod_chave, chaves = pd.factorize(df[col_grupo])
+    contagem = np.bincount(cod_chave[cod_chave >= 0], minlength=len(chaves))
+    repetidas = np.flatnonzero(contagem > 1)
+
+    # Posição de cada chave repetida na ordem do groupby(sort=True)
+    posto = np.full(len(chaves), -1, dtype=np.int64)
+    posto[repetidas] = pd.factorize(chaves.take(repetidas), sort=True)[0]
+    gid_linha = np.where(cod_chave >= 0, posto[cod_chave], -1)
+
+    # Linhas ordenadas por grupo e, dentro do grupo, pela posição original:
+    # cada grupo vira um segmento contíguo [inicio, inicio + qtd)
+    linhas = np.flatnonzero(gid_linha >= 0)
+    ordem = linhas[_ordenar_estavel(gid_linha[linhas])]
+    qtd = contagem[repetidas][np.argsort(posto[repetidas])]
+    inicios = np.zeros(len(qtd), dtype=np.int64)
+    np.cumsum(qtd[:-1], out=inicios[1:])
+    por_linha = np.repeat(np.arange(len(qtd)), qtd)
+
+    codigos = df['codigo_material'].to_numpy(dtype=object)[ordem]
+    comprimentos = np.fromiter(map(len, codigos), dtype=np.int64, count=len(codigos))
+    estoque = df['estoque_atual'].to_numpy()[ordem]
+    preco = df['preco_unitario'].to_numpy(dtype=np.float64)[ordem]
+    categorias = df['categoria'].to_numpy(dtype=object)[ordem]
+    cat_codigo = pd.factorize(categorias, use_na_sentinel=False)[0]
+
+    # Sobrevivente: primeiro registro com o maior estoque (como idxmax)
+    maior = np.fmax.reduceat(estoque, inicios) if len(qtd) else estoque[:0]
+    candidato = np.where(estoque == maior[por_linha], np.arange(len(ordem)), len(ordem))
+    pos_manter = np.minimum.reduceat(candidato, inicios) if len(qtd) else candidato[:0]
+    codigo_manter = codigos[pos_manter]
+    eliminar = codigos != codigo_manter[por_linha]
+
+    mistura = cat_codigo != cat_codigo[inicios][por_linha]
+    varias_categorias = np.add.reduceat(mistura, inicios) > 0 if len(qtd) else mistura[:0]
+
+    return pd.DataFrame({
+        'descricao': df['descricao'].to_numpy(dtype=object)[ordem[inicios]],
+        'qtd_duplicatas': qtd,
+        'codigos_todos': _juntar_segmentos(codigos, qtd, comprimentos),
+        'codigo_manter': codigo_manter,
+        'codigos_eliminar': _juntar_segmentos(codigos[eliminar],
+                                              np.bincount(por_linha[eliminar], minlength=len(qtd)),
+                                              comprimentos[eliminar]),
+        'categoria': np.where(varias_categorias, 'MÚLTIPLAS', categorias[inicios]),
+        'valor_total_estoque': _soma_sequencial(preco * estoque, inicios, qtd),
+        'preco_medio': _soma_pareada(preco, inicios, qtd) / qtd,
+        'estoque_total': np.add.reduceat(estoque, inicios) if len(qtd) else estoque[:0],
+    })
+
+
+def impacto_grupos(resumo, fracao_eliminavel=0.5, custo_capital=0.02):
+    """
+    Valor em estoque (preço médio × estoque total) e economia anual de custo
+    de capital de cada grupo, a partir do resultado de resumir_grupos.
+    """
+    valor_estoque = resumo['preco_medio'].to_numpy() * resumo['estoque_total'].to_numpy()
+    economia = valor_estoque * fracao_eliminavel * custo_capital
+    return pd.DataFrame({'valor_estoque_grupo': valor_estoque, 'economia_grupo': economia},
+                        index=resumo.index)
+
+
+def _uma_edicao(a, b):
+    """True se a e b diferem por no máximo 1 inserção, remoção ou troca"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def similaridade(a, b):
+    """
+    Similaridade 0-1 entre duas chaves de tokens ordenados.
+
+    Além do ratio de caracteres, cada token divergente só pode diferir do
+    correspondente por 1 edição (erro de digitação): "parafuso"×"parafuzo"
+    passa, "papel"×"papelao" (materiais distintos) zera a similaridade.
+    """
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = a.split(' '), b.split(' ')
+    if len(tokens_a) != len(tokens_b):
+        return 0.0
+    for ta, tb in zip(tokens_a, tokens_b):
+        if ta != tb and not _uma_edicao(ta, tb):
+            return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def _chave_bloco(*partes):
+    """Combina colunas de blocagem em um único id inteiro por linha"""
+    chave = np.zeros(len(partes[0]), dtype=np.int64)
+    for parte in partes:
+        codigos, unicos = pd.factorize(parte, use_na_sentinel=False)
+        chave = chave * len(unicos) + codigos
+        chave = pd.factorize(chave)[0].astype(np.int64)
+    return chave
+
+
+def _similaridades(chaves_txt, chave_a, chave_b):
+    """similaridade() de cada par de chaves distintas (a[i], b[i])"""
+    return np.fromiter((similaridade(chaves_txt[a], chaves_txt[b]) for a, b in zip(chave_a, chave_b)),
+                       dtype=np.float64, count=len(chave_a))
+
+
+def _similaridades_faixa(nome_shm, layout, inicio, fim):
+    """Worker: _similaridades dos pares [inicio, fim) publicados em memória compartilhada"""
+    shm, arrays = anexar_arrays(nome_shm, layout)
+    textos = TextosCompartilhados(arrays['textos'], arrays['offsets'])
+    try:
+        return _similaridades(textos, arrays['chave_a'][inicio:fim], arrays['chave_b'][inicio:fim])
+    finally:
+        del arrays, textos  # views do buffer precisam sumir antes do close()
+        shm.close()
+
+
+def _similaridades_paralelo(chaves_txt, chave_a, chave_b, processos):
+    """
+    _similaridades em `processos` workers: textos (buffer UTF-8 + offsets) e
+    pares vão por memória compartilhada; cada worker pontua uma faixa.
+    """
+    textos, offsets = codificar_textos(chaves_txt)
+    shm, layout = publicar_arrays({'textos': textos, 'offsets': offsets,
+                                   'chave_a': chave_a, 'chave_b': chave_b})
+    # Mais faixas que processos: faixas lentas não deixam núcleos ociosos
+    passo = -(-len(chave_a) // (processos * SHARDS_POR_PROCESSO)) or 1
+    inicios = range(0, len(chave_a), passo)
+    fins = [min(i + passo, len(chave_a)) for i in inicios]
+    try:
+        with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+            partes = list(executor.map(_similaridades_faixa, repeat(shm.name), repeat(layout),
+                                       inicios, fins))
+    finally:
+        shm.close()
+        shm.unlink()
+    return np.concatenate(partes) if partes else np.zeros(0, dtype=np.float64)
+
+
+def pares_fuzzy(df, limiar=0.90, janela=10, processos=1):
+    """
+    Gera os pares de linhas (posicionais) com similaridade >= limiar.
+
+    Retorna DataFrame com idx_a, idx_b, similaridade. Pares com
+    especificações diferentes (M8 × M10) nunca são duplicatas e são
+    descartados antes do cálculo de similaridade.
+
+    `processos` > 1 (ou None = automático a partir de MIN_LINHAS_PARALELO)
+    distribui a normalização das descrições e o cálculo de similaridade
+    entre workers; o resultado é idêntico ao da execução em série.
+    """
+    n = len(df)
+    if n == 0:
+        return pd.DataFrame({'idx_a': np.zeros(0, dtype=np.int64), 'idx_b': np.zeros(0, dtype=np.int64),
+                             'similaridade': np.zeros(0, dtype=np.float64)})
+    processos = numero_processos(processos, n, MIN_LINHAS_PARALELO)
+    cod_desc, tabela = preparar_descricoes(df['descricao'], processos=processos)
+
+    # Ids inteiros por descrição distinta (ordenados → vizinhança alfabética)
+    chave_cod, chaves_txt = pd.factorize(tabela['chave_ordenada'], sort=True)
+    chave_id = chave_cod[cod_desc]
+    spec_id = pd.factorize(tabela['specs'])[0][cod_desc]
+    prefixos = tabela['palavras'].map(prefixos_tokens).to_numpy()[cod_desc]
+    tipo = tabela['norm'].str.slice(0, 3).to_numpy()[cod_desc]
+    chaves_txt = np.asarray(chaves_txt, dtype=object)
+    comprimento = np.fromiter((len(c) for c in chaves_txt), dtype=np.int64,
+                              count=len(chaves_txt))
+
+    blocos = [
+        _chave_bloco(df['categoria'].to_numpy(), prefixos),
+        _chave_bloco(df['unidade_medida'].to_numpy(), tipo, spec_id),
+    ]
+
+    posicao = np.arange(n, dtype=np.int64)
+    arestas_a, arestas_b, candidatos = [], [], []
+
+    for bloco in blocos:
+        # Linhas com a mesma chave no mesmo bloco → ligadas ao representante
+        ordem = np.lexsort((posicao, chave_id, bloco))
+        b_ord, c_ord, p_ord = bloco[ordem], chave_id[ordem], posicao[ordem]
+        novo = np.ones(n, dtype=bool)
+        novo[1:] = (b_ord[1:] != b_ord[:-1]) | (c_ord[1:] != c_ord[:-1])
+        representante = p_ord[novo][np.cumsum(novo) - 1]
+        arestas_a.append(representante[~novo])
+        arestas_b.append(p_ord[~novo])
+
+        # Sorted neighbourhood sobre as chaves distintas de cada bloco
+        b_rep, c_rep, p_rep = b_ord[novo], c_ord[novo], p_ord[novo]
+        for d in range(1, janela + 1):
+            if d >= len(b_rep):
+                break
+            mesmo = b_rep[:-d] == b_rep[d:]
+            candidatos.append(np.column_stack([
+                p_rep[:-d][mesmo], p_rep[d:][mesmo],
+                c_rep[:-d][mesmo], c_rep[d:][mesmo],
+            ]))
+
+    pares = pd.DataFrame(
+        np.vstack(candidatos) if candidatos else np.empty((0, 4), dtype=np.int64),
+        columns=['idx_a', 'idx_b', 'chave_a', 'chave_b'],
+    )
+
+    # Filtros vetorizados: mesma especificação e limite superior do ratio
+    pares = pares[spec_id[pares['idx_a']] == spec_id[pares['idx_b']]]
+    la = comprimento[pares['chave_a']]
+    lb = comprimento[pares['chave_b']]
+    pares = pares[2 * np.minimum(la, lb) / (la + lb) >= limiar]
+
+    # Similaridade calculada uma vez por par de chaves distintas: é a parte
+    # cara (Python puro), a única que vale distribuir entre processos
+    unicos = pares[['chave_a', 'chave_b']].drop_duplicates()
+    chave_a, chave_b = unicos['chave_a'].to_numpy(), unicos['chave_b'].to_numpy()
+    if processos > 1:
+        sims = _similaridades_paralelo(chaves_txt, chave_a, chave_b, processos)
+    else:
+        sims = _similaridades(chaves_txt, chave_a, chave_b)
+    unicos = unicos.assign(similaridade=sims)
+    pares = pares.merge(unicos, on=['chave_a', 'chave_b'])
+    pares = pares.loc[pares['similaridade'] >= limiar, ['idx_a', 'idx_b', 'similaridade']]
+
+    identicos = pd.DataFrame({
+        'idx_a': np.concatenate(arestas_a),
+        'idx_b': np.concatenate(arestas_b),
+        'similaridade': 1.0,
+    })
+    pares = pd.concat([identicos, pares], ignore_index=True)
+    return pares.drop_duplicates(['idx_a', 'idx_b']).reset_index(drop=True)
+
+
+def arestas_por_chave(chave, max_por_chave=None):
+    """
+    Arestas (idx_a, idx_b) entre linhas com a mesma chave: cada linha liga-se
+    à primeira linha da sua chave. Vazios não geram arestas, e chaves com
+    mais de `max_por_chave` linhas são tratadas como colisão e ignoradas.
+    """
+    codigos = pd.factorize(chave)[0]
+    posicao = np.arange(len(codigos))
+    validas = codigos >= 0
+    contagem = np.bincount(codigos[validas])
+    primeira = np.full(len(contagem), len(codigos), dtype=np.int64)
+    np.minimum.at(primeira, codigos[validas], posicao[validas])
+
+    seguro = np.where(validas, codigos, 0)
+    if max_por_chave is not None:
+        validas &= contagem[seguro] <= max_por_chave
+    ligar = validas & (primeira[seguro] != posicao)
+    return pd.DataFrame({'idx_a': primeira[seguro[ligar]], 'idx_b': posicao[ligar]})
+
+
+def clusters_transitivos(n, *arestas):
+    """cluster_id de cada uma das n linhas, unindo as arestas de todos os métodos"""
+    uniao = UniaoBusca(n)
+    for pares in arestas:
+        uniao.unir(pares['idx_a'].to_numpy(), pares['idx_b'].to_numpy())
+    return uniao.cluster_ids()
+
+
+def duplicatas_fuzzy(df, limiar=0.90, janela=10, pares=None):
+    """
+    Método 3: grupos de duplicatas fuzzy no formato de duplicatas.csv.
+
+    A coluna extra `similaridade` é a menor similaridade entre os pares que
+    formaram o grupo (visão conservadora para a revisão manual). `pares`
+    permite reaproveitar o resultado de pares_fuzzy já calculado.
+    """
+    df = df.reset_index(drop=True)
+    if pares is None:
+        pares = pares_fuzzy(df, limiar=limiar, janela=janela)
+    rotulos = clusters_transitivos(len(df), pares)
+
+    base = df.assign(grupo_fuzzy=rotulos)
+    resumo = resumir_grupos(base, 'grupo_fuzzy')
+
+    sim_grupo = (pares.assign(grupo_fuzzy=rotulos[pares['idx_a'].to_numpy()])
+                 .groupby('grupo_fuzzy')['similaridade'].min())
+    grupos = np.sort(base.loc[base.duplicated('grupo_fuzzy', keep=False), 'grupo_fuzzy'].unique())
+    resumo['similaridade'] = sim_grupo.reindex(grupos).to_numpy()
+
+    return resumo.sort_values('valor_total_estoque', ascending=False)
@@ -0,0 +1,186 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Aging de estoque (dias sem movimento) por data de referência
+═══════════════════════════════════════════════════════════════════════════════
+
+05, 14, 15 e 16 calculavam `(HOJE - ultima_movimentacao).dt.days` e as
+faixas de pd.cut do zero a cada execução. IndiceEnvelhecimento guarda:
+
+  dia       último movimento de cada material, em dias desde 1970 (int32;
+            sem data = SEM_DATA)
+  ordem     permutação que ordena `dia` (array ordenado + busca binária)
+  acumulado soma acumulada do valor em estoque nessa ordem
+  qtd, valor_faixa   agregados correntes por faixa de aging
+
+Idade ≥ L dias ⇔ dia ≤ data_ref − L: a fronteira de cada faixa é um corte
+no array ordenado. Ao mover a data de referência, para cada fronteira só
+os materiais entre o corte antigo e o novo (np.searchsorted) trocam de
+faixa, e o valor deles sai da soma acumulada, sem percorrer o cadastro:
+
+  data_ref + 1 dia → ~6 buscas binárias, qtd/valor de 2 faixas por corte
+
+obter_indice_envelhecimento() guarda o índice em .npz e, no dia seguinte,
+só o move para a nova data; reconstrói quando o CSV de origem muda ou
+quando o cache veio de outro CSV (array `origens`, caminho absoluto).
+Faixas: [0, 30), [30, 90), [90, 180), [180, 365), [365, 730), 730+ dias,
+como o pd.cut(right=False) do 05; datas futuras e nulas ficam fora.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from mdm.rollup import texto_origens
+
+ARQUIVO_AGING = 'data/processed/indice_aging.npz'
+
+# Data de referência padrão dos relatórios (14, 15, 16)
+DATA_REFERENCIA = pd.Timestamp('2026-03-04')
+
+LIMITES_FAIXAS = [0, 30, 90, 180, 365, 730]
+FAIXAS = ['0-30 dias', '31-90 dias', '91-180 dias', '181-365 dias', '366-730 dias', '>730 dias']
+
+SEM_DATA = np.iinfo(np.int32).min
+
+
+def dia_inteiro(datas):
+    """Datas → dias desde 1970 (int32); nulas/inválidas → SEM_DATA"""
+    dias = pd.to_datetime(pd.Series(datas), errors='coerce').to_numpy().astype('datetime64[D]')
+    inteiros = dias.astype(np.int64)
+    inteiros[np.isnat(dias)] = SEM_DATA
+    return inteiros.astype(np.int32)
+
+
+def _dia_ref(data_ref):
+    return int(np.datetime64(pd.Timestamp(data_ref).date(), 'D').astype(np.int64))
+
+
+class IndiceEnvelhecimento:
+    """Dias sem movimento e faixas de aging com agregados correntes por data de referência"""
+
+    def __init__(self, dias, valores, data_ref):
+        self.dia = np.asarray(dias, dtype=np.int32)
+        self.valor = np.nan_to_num(np.asarray(valores, dtype=np.float64))
+        self.data_ref = _dia_ref(data_ref)
+        com_data = np.flatnonzero(self.dia != SEM_DATA)
+        self.ordem = com_data[np.argsort(self.dia[com_data], kind='stable')]
+        self._ordenados = self.dia[self.ordem]
+        self._acumulado = np.concatenate([[0.0], np.cumsum(self.valor[self.ordem])])
+        self.qtd, self.valor_faixa = self._contar(self.data_ref)
+
+    @classmethod
+    def de_datas(cls, datas, valores, data_ref):
+        """Índice a partir das datas de última movimentação (uma por linha)"""
+        return cls(dia_inteiro(datas), valores, data_ref)
+
+    def __len__(self):
+        return len(self.dia)
+
+    @property
+    def referencia(self):
+        return pd.Timestamp(np.datetime64(self.data_ref, 'D'))
+
+    @property
+    def sem_data(self):
+        return int((self.dia == SEM_DATA).sum())
+
+    def _cortes(self, data_ref):
+        """Posição no array ordenado de cada fronteira: nº de materiais com idade ≥ limite"""
+        return np.searchsorted(self._ordenados, data_ref - np.array(LIMITES_FAIXAS), side='right')
+
+    def _contar(self, data_ref):
+        """qtd e valor por faixa do zero (k buscas binárias)"""
+        cortes = np.append(self._cortes(data_ref), 0)
+        valores = self._acumulado[cortes]
+        return (cortes[:-1] - cortes[1:]).astype(np.int64), valores[:-1] - valores[1:]
+
+    def mover_para(self, data_ref):
+        """
+        Move a data de referência atualizando os agregados: em cada fronteira,
+        os materiais entre o corte antigo e o novo passam para a faixa vizinha.
+        """
+        nova = _dia_ref(data_ref)
+        antigos, novos = self._cortes(self.data_ref), self._cortes(nova)
+        for i, (antigo, novo) in enumerate(zip(antigos, novos)):
+            if antigo == novo:
+                continue
+            # Cruzaram a fronteira i: entram na faixa i (vindos da i-1 ou de fora)
+            qtd = int(novo - antigo)
+            valor = self._acumulado[novo] - self._acumulado[antigo]
+            self.qtd[i] += qtd
+            self.valor_faixa[i] += valor
+            if i > 0:
+                self.qtd[i - 1] -= qtd
+                self.valor_faixa[i - 1] -= valor
+        # Faixa que esvaziou fica com valor 0 exato (sem resíduo de ponto flutuante)
+        self.valor_faixa[self.qtd == 0] = 0.0
+        self.data_ref = nova
+        return self
+
+    def dias(self, sem_data=None):
+        """Dias sem movimento por material (int64); sem data → `sem_data`, ou float NaN se None"""
+        idade = self.data_ref - self.dia.astype(np.int64)
+        vazio = self.dia == SEM_DATA
+        if vazio.any():
+            if sem_data is None:
+                idade = idade.astype(np.float64)
+                sem_data = np.nan
+            idade[vazio] = sem_data
+        return idade
+
+    def faixas(self):
+        """Categórica ordenada (FAIXAS) por material; futuras e sem data ficam NaN"""
+        idade = self.dias(sem_data=-1)
+        codigos = np.searchsorted(LIMITES_FAIXAS, idade, side='right') - 1
+        codigos[idade < 0] = -1
+        return pd.Categorical.from_codes(codigos, categories=FAIXAS, ordered=True)
+
+    def resumo(self):
+        """DataFrame faixa, qtd_materiais, valor_total (agregados correntes)"""
+        return pd.DataFrame({'faixa': FAIXAS, 'qtd_materiais': self.qtd, 'valor_total': self.valor_faixa})
+
+    def salvar(self, caminho=ARQUIVO_AGING, origens=()):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        np.savez(caminho, dia=self.dia, valor=self.valor, ordem=self.ordem,
+                 data_ref=np.int64(self.data_ref), qtd=self.qtd, valor_faixa=self.valor_faixa,
+                 origens=np.str_(texto_origens(origens)))
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_AGING):
+        """Índice salvo, com a data de referência, os agregados e as origens gravados"""
+        with np.load(caminho) as dados:
+            indice = cls.__new__(cls)
+            indice.dia, indice.valor, indice.ordem = dados['dia'], dados['valor'], dados['ordem']
+            indice.data_ref = int(dados['data_ref'])
+            indice.qtd, indice.valor_faixa = dados['qtd'], dados['valor_faixa']
+            indice.origens = str(dados['origens']) if 'origens' in dados.files else ''
+        indice._ordenados = indice.dia[indice.ordem]
+        indice._acumulado = np.concatenate([[0.0], np.cumsum(indice.valor[indice.ordem])])
+        return indice
+
+
+def obter_indice_envelhecimento(arquivo_origem, data_ref=DATA_REFERENCIA, caminho=ARQUIVO_AGING):
+    """
+    Índice do cache movido para `data_ref` (e regravado); reconstruído do CSV
+    (ultima_movimentacao, preco_unitario × estoque_atual) se faltar ou for
+    mais velho que a origem ou gerado de outro CSV. A ordem das linhas é a
+    do CSV.
+    """
+    indice = None
+    if os.path.exists(caminho) and os.path.getmtime(caminho) >= os.path.getmtime(arquivo_origem):
+        indice = IndiceEnvelhecimento.carregar(caminho)
+        if indice.origens != texto_origens(arquivo_origem):
+            indice = None
+        elif indice.data_ref == _dia_ref(data_ref):
+            return indice
+        else:
+            indice.mover_para(data_ref)
+    if indice is None:
+        df = pd.read_csv(arquivo_origem, usecols=['ultima_movimentacao', 'preco_unitario', 'estoque_atual'])
+        indice = IndiceEnvelhecimento.de_datas(df['ultima_movimentacao'],
+                                               df['preco_unitario'] * df['estoque_atual'], data_ref)
+    indice.salvar(caminho, arquivo_origem)
+    return indice
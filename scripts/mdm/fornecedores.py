@@ -0,0 +1,207 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Resolução de entidades de fornecedores (nome → cluster canônico)
+═══════════════════════════════════════════════════════════════════════════════
+
+O mesmo fornecedor aparece escrito de várias formas:
+
+  "Metalúrgica ABC Ltda."  "METALURGICA ABC"  "Metalurgica  ABC S/A"
+  "Metalurgca ABC"         (erro de digitação)
+
+Cada NOME DISTINTO passa uma vez por:
+  1. chave: minúsculas, sem acentos e pontuação, sem sufixos societários no
+     fim (LTDA, S/A, S.A., EIRELI, ME, EPP, CIA), tokens em ordem alfabética
+  2. blocagem: chaves só são comparadas se dividirem um dos 2 tokens mais
+     raros da base (bloco maior que MAX_BLOCO é ignorado)
+  3. fuzzy: mdm.duplicatas.similaridade >= LIMIAR, e token divergente só
+     com 1 edição e MIN_TAMANHO_EDICAO+ caracteres ("ABC" ≠ "ABD")
+  4. union-find das chaves → cluster; nome canônico = forma mais frequente
+
+IndiceFornecedores guarda nome → chave → cluster → nome canônico em CSV.
+Numa nova execução, nomes já indexados saem por lookup; só os nomes novos
+são normalizados e comparados (contra o índice e entre si), e clusters já
+existentes mantêm id e nome canônico (um nome novo que liga clusters
+antigos funde todos no de menor id). Por linha, resolver() é um factorize
++ indexação: o custo não depende de quantos fornecedores existem.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import re
+from collections import Counter, defaultdict
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from mdm.duplicatas import similaridade
+from mdm.texto import remover_acentos
+from mdm.unionfind import UniaoBusca
+
+ARQUIVO_INDICE_FORNECEDORES = 'data/processed/indice_fornecedores.csv'
+COLUNAS_INDICE = ['nome', 'chave', 'cluster', 'nome_canonico']
+
+# Sufixos societários (já sem pontuação: "S.A." e "S/A" viram "s a")
+SUFIXOS_LEGAIS = [('ltda',), ('sa',), ('s', 'a'), ('eireli',), ('epp',), ('me',), ('mei',),
+                  ('cia',), ('e', 'cia')]
+
+RE_PONTUACAO = re.compile(r'[^\w\s]|_')
+
+LIMIAR = 0.90
+MIN_TAMANHO_EDICAO = 5
+MAX_BLOCO = 500
+
+
+def chave_fornecedor(nome):
+    """Chave normalizada do nome (tokens ordenados, sem sufixo societário)"""
+    if not isinstance(nome, str):
+        return ''
+    tokens = RE_PONTUACAO.sub(' ', remover_acentos(nome).lower()).split()
+    removeu = True
+    while removeu:
+        removeu = False
+        for sufixo in SUFIXOS_LEGAIS:
+            if len(tokens) > len(sufixo) and tuple(tokens[-len(sufixo):]) == sufixo:
+                tokens = tokens[:-len(sufixo)]
+                removeu = True
+    return ' '.join(sorted(tokens))
+
+
+def mesmo_fornecedor(a, b):
+    """Chaves com similaridade >= LIMIAR e tokens divergentes longos o bastante"""
+    tokens_a, tokens_b = a.split(' '), b.split(' ')
+    if len(tokens_a) != len(tokens_b):
+        return False
+    if any(ta != tb and min(len(ta), len(tb)) < MIN_TAMANHO_EDICAO
+           for ta, tb in zip(tokens_a, tokens_b)):
+        return False
+    return similaridade(a, b) >= LIMIAR
+
+
+def pares_candidatos(chaves, novas):
+    """
+    Pares (i, j) de posições em `chaves` que dividem um dos 2 tokens mais
+    raros e com pelo menos uma das chaves em `novas` (posições).
+    """
+    frequencia = Counter(t for chave in chaves for t in set(chave.split(' ')))
+    blocos = defaultdict(list)
+    for posicao, chave in enumerate(chaves):
+        raros = sorted(set(chave.split(' ')), key=lambda t: (frequencia[t], t))[:2]
+        for token in raros:
+            blocos[token].append(posicao)
+    novas = set(novas)
+    pares = set()
+    for membros in blocos.values():
+        if len(membros) < 2 or len(membros) > MAX_BLOCO:
+            continue
+        for i, j in combinations(membros, 2):
+            if i in novas or j in novas:
+                pares.add((i, j))
+    return sorted(pares)
+
+
+class IndiceFornecedores:
+    """Índice persistente nome de fornecedor → cluster e nome canônico"""
+
+    def __init__(self, tabela=None):
+        self.tabela = (pd.DataFrame(columns=COLUNAS_INDICE) if tabela is None
+                       else tabela[COLUNAS_INDICE].reset_index(drop=True))
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_INDICE_FORNECEDORES):
+        """Índice salvo, ou vazio se o arquivo não existir"""
+        if not os.path.exists(caminho):
+            return cls()
+        tabela = pd.read_csv(caminho, dtype={'nome': str, 'chave': str, 'nome_canonico': str},
+                             keep_default_na=False, encoding='utf-8-sig')
+        return cls(tabela)
+
+    def salvar(self, caminho=ARQUIVO_INDICE_FORNECEDORES):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self.tabela.to_csv(caminho, index=False, encoding='utf-8-sig')
+
+    def __len__(self):
+        return len(self.tabela)
+
+    @property
+    def n_clusters(self):
+        return self.tabela['cluster'].nunique()
+
+    def adicionar(self, nomes, contagens=None):
+        """
+        Indexa os nomes ainda desconhecidos. `contagens` (nome → qtd de
+        linhas) escolhe o nome canônico dos clusters novos. Retorna a
+        quantidade de nomes incluídos.
+        """
+        conhecidos = set(self.tabela['nome'])
+        novos = [n for n in dict.fromkeys(nomes) if isinstance(n, str) and n not in conhecidos]
+        if not novos:
+            return 0
+        chaves_novas = [chave_fornecedor(n) for n in novos]
+
+        # Chaves distintas: as do índice (com cluster) seguidas das novas
+        por_chave = self.tabela.drop_duplicates('chave').set_index('chave')['cluster']
+        chaves = list(por_chave.index) + [c for c in dict.fromkeys(chaves_novas) if c not in por_chave.index]
+        posicao = {c: i for i, c in enumerate(chaves)}
+
+        uniao = UniaoBusca(len(chaves))
+        # Chaves já indexadas no mesmo cluster continuam juntas
+        clusters_antigos = por_chave.to_numpy()
+        if len(clusters_antigos):
+            primeira = pd.Series(np.arange(len(clusters_antigos))).groupby(clusters_antigos).transform('first')
+            uniao.unir(np.arange(len(clusters_antigos)), primeira.to_numpy())
+        pares = [(i, j) for i, j in pares_candidatos(chaves, range(len(por_chave), len(chaves)))
+                 if mesmo_fornecedor(chaves[i], chaves[j])]
+        if pares:
+            uniao.unir(*np.array(pares).T)
+        raiz = uniao.raizes()
+
+        # Cluster existente herda o id; chave nova que une clusters antigos
+        # funde todos no de menor id (com o nome canônico dele)
+        antigos = pd.Series(clusters_antigos.astype(np.int64), index=raiz[:len(por_chave)])
+        cluster_da_raiz = antigos.groupby(level=0).min().to_dict()
+        fundir = {int(c): cluster_da_raiz[r] for r, c in antigos.items() if cluster_da_raiz[r] != c}
+        proximo = int(self.tabela['cluster'].max()) + 1 if len(self.tabela) else 0
+        cluster_chave = {}
+        for chave in chaves:
+            r = raiz[posicao[chave]]
+            if r not in cluster_da_raiz:
+                cluster_da_raiz[r] = proximo
+                proximo += 1
+            cluster_chave[chave] = cluster_da_raiz[r]
+
+        canonico = self.tabela.drop_duplicates('cluster').set_index('cluster')['nome_canonico'].to_dict()
+        if fundir:
+            self.tabela['cluster'] = self.tabela['cluster'].replace(fundir)
+            self.tabela['nome_canonico'] = self.tabela['cluster'].map(canonico)
+
+        novos_df = pd.DataFrame({'nome': novos, 'chave': chaves_novas})
+        novos_df['cluster'] = novos_df['chave'].map(cluster_chave).astype(np.int64)
+        # Nome canônico: o do índice, senão a forma nova mais frequente (empate: 1ª vista)
+        qtd = novos_df['nome'].map(contagens or {}).fillna(0)
+        mais_frequente = (novos_df.assign(qtd=qtd)
+                          .sort_values('qtd', ascending=False, kind='stable')
+                          .drop_duplicates('cluster').set_index('cluster')['nome'])
+        novos_df['nome_canonico'] = [canonico.get(c, mais_frequente[c]) for c in novos_df['cluster']]
+
+        self.tabela = pd.concat([self.tabela, novos_df], ignore_index=True)
+        self.tabela['cluster'] = self.tabela['cluster'].astype(np.int64)
+        return len(novos)
+
+    def resolver(self, serie):
+        """
+        DataFrame por linha (mesmo índice) com chave, cluster e nome_canonico;
+        nomes nulos ficam NaN (cluster -1). Nomes novos são indexados antes.
+        """
+        codigos, valores = pd.factorize(serie)
+        contagens = dict(zip(valores, np.bincount(codigos[codigos >= 0], minlength=len(valores))))
+        self.adicionar(valores, contagens)
+        por_nome = self.tabela.set_index('nome').reindex(pd.Index(valores, dtype=object))
+        tabela = por_nome[['chave', 'cluster', 'nome_canonico']].reset_index(drop=True)
+        # Linha extra de nulos no fim: o código -1 cai nela
+        tabela.loc[len(tabela)] = [np.nan, -1, np.nan]
+        resolvido = tabela.iloc[np.where(codigos >= 0, codigos, len(tabela) - 1)]
+        resolvido.index = serie.index
+        resolvido['cluster'] = resolvido['cluster'].astype(np.int64)
+        return resolvido
@@ -0,0 +1,209 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Detecção incremental de duplicatas (lote delta noturno)
+═══════════════════════════════════════════════════════════════════════════════
+
+A execução completa do 01 agrupa o cadastro inteiro pela descrição limpa
+(minúsculas, sem espaços nas pontas). Para os poucos milhares de materiais
+novos/alterados de cada noite, IndiceChaves guarda num SQLite (biblioteca
+padrão) o que é preciso para refazer só os grupos tocados:
+
+  materiais(linha, codigo_material, chave, descricao, categoria,
+            preco_unitario, estoque_atual)      índices em código e chave
+  grupos(chave, colunas de duplicatas.csv)      1 linha por grupo com 2+
+
+aplicar_delta():
+  1. busca pelo índice de código as linhas atuais dos códigos do delta
+  2. substitui essas linhas no lugar (mesma `linha`), acrescenta as novas e
+     remove as marcadas com acao = EXCLUIR
+  3. chaves afetadas = chaves antigas + novas dessas linhas; só os membros
+     delas são lidos (índice de chave) e resumidos com resumir_grupos()
+  4. grupos novos → ADICIONADO, diferentes → ALTERADO, sumiram → RETIRADO
+
+Todo o trabalho é proporcional ao delta e aos grupos que ele toca;
+exportar() só relê a tabela `grupos` para regravar duplicatas.csv.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from mdm.duplicatas import COLUNAS_DUPLICATAS, resumir_grupos
+
+ARQUIVO_INDICE_CHAVES = 'data/processed/indice_chaves.sqlite'
+
+COLUNAS_MATERIAIS = ['codigo_material', 'descricao', 'categoria', 'preco_unitario', 'estoque_atual']
+
+ACAO_EXCLUIR = 'EXCLUIR'
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS materiais (
+    linha INTEGER PRIMARY KEY,
+    codigo_material TEXT,
+    chave TEXT,
+    descricao TEXT,
+    categoria TEXT,
+    preco_unitario REAL,
+    estoque_atual INTEGER
+);
+CREATE TABLE IF NOT EXISTS grupos (
+    chave TEXT PRIMARY KEY,
+    descricao TEXT,
+    qtd_duplicatas INTEGER,
+    codigos_todos TEXT,
+    codigo_manter TEXT,
+    codigos_eliminar TEXT,
+    categoria TEXT,
+    valor_total_estoque REAL,
+    preco_medio REAL,
+    estoque_total INTEGER
+);
+"""
+
+# Criados depois da carga inicial: inserir 1M linhas com índice é ~5x mais lento
+_INDICES = """
+CREATE INDEX IF NOT EXISTS ix_materiais_codigo ON materiais (codigo_material);
+CREATE INDEX IF NOT EXISTS ix_materiais_chave ON materiais (chave);
+"""
+
+
+def chave_descricao_limpa(serie):
+    """Mesma chave do Método 2 do 01: minúsculas e sem espaços nas pontas"""
+    return serie.str.lower().str.strip()
+
+
+def _resumir_com_chave(membros):
+    """resumir_grupos() por chave, com a chave como 1ª coluna"""
+    resumo = resumir_grupos(membros, 'chave')
+    contagem = membros['chave'].value_counts()
+    resumo.insert(0, 'chave', np.sort(contagem.index[contagem > 1].to_numpy(dtype=object)))
+    return resumo
+
+
+class IndiceChaves:
+    """Índice persistente chave normalizada → materiais e grupos de duplicatas"""
+
+    def __init__(self, caminho=ARQUIVO_INDICE_CHAVES, _criar_indices=True):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.executescript(_ESQUEMA)
+        if _criar_indices:
+            self.conexao.executescript(_INDICES)
+
+    def fechar(self):
+        self.conexao.close()
+
+    @classmethod
+    def construir(cls, df, caminho=ARQUIVO_INDICE_CHAVES):
+        """Índice do zero a partir do cadastro completo (execução completa do 01)"""
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        indice = cls(caminho, _criar_indices=False)
+
+        materiais = df[COLUNAS_MATERIAIS].reset_index(drop=True)
+        materiais.insert(1, 'chave', chave_descricao_limpa(materiais['descricao']))
+        with indice.conexao:
+            materiais.to_sql('materiais', indice.conexao, if_exists='append',
+                             index=True, index_label='linha')
+            _resumir_com_chave(materiais).to_sql('grupos', indice.conexao,
+                                                 if_exists='append', index=False)
+        indice.conexao.executescript(_INDICES)
+        return indice
+
+    def _consultar(self, sql, parametros=()):
+        return pd.read_sql_query(sql, self.conexao, params=parametros)
+
+    def aplicar_delta(self, delta):
+        """
+        Aplica um lote de materiais novos/alterados (coluna opcional `acao`:
+        EXCLUIR remove todas as linhas do código). Linhas de um código que já
+        existe substituem as atuais na mesma posição.
+
+        Retorna DataFrame com chave, acao (ADICIONADO/ALTERADO/RETIRADO),
+        descricao e qtd_duplicatas antes/depois de cada grupo que mudou.
+        """
+        delta = delta.reset_index(drop=True)
+        excluir = (delta['acao'].fillna('').str.upper() == ACAO_EXCLUIR
+                   if 'acao' in delta.columns else pd.Series(False, index=delta.index))
+        novos = delta.loc[~excluir & ~delta['codigo_material'].isin(delta.loc[excluir, 'codigo_material']),
+                          COLUNAS_MATERIAIS].copy()
+        novos['chave'] = chave_descricao_limpa(novos['descricao'])
+
+        with self.conexao:
+            pd.DataFrame({'codigo_material': delta['codigo_material'].unique()}).to_sql(
+                '_delta_codigos', self.conexao, if_exists='replace', index=False)
+            atuais = self._consultar(
+                'SELECT linha, codigo_material, chave FROM materiais '
+                'WHERE codigo_material IN (SELECT codigo_material FROM _delta_codigos) ORDER BY linha')
+
+            # k-ésima linha nova de um código ocupa a k-ésima linha atual dele
+            atuais['ordem'] = atuais.groupby('codigo_material').cumcount()
+            novos['ordem'] = novos.groupby('codigo_material').cumcount()
+            pareados = novos.merge(atuais[['codigo_material', 'ordem', 'linha']],
+                                   on=['codigo_material', 'ordem'], how='left')
+            sem_linha = pareados['linha'].isna()
+            proxima = self.conexao.execute('SELECT COALESCE(MAX(linha), -1) + 1 FROM materiais').fetchone()[0]
+            pareados.loc[sem_linha, 'linha'] = np.arange(proxima, proxima + sem_linha.sum())
+            pareados['linha'] = pareados['linha'].astype(np.int64)
+
+            removidas = atuais.loc[~atuais['linha'].isin(pareados['linha']), 'linha']
+            self.conexao.executemany('DELETE FROM materiais WHERE linha = ?',
+                                     ((int(l),) for l in removidas))
+            gravar = pareados[['linha', 'codigo_material', 'chave'] + COLUNAS_MATERIAIS[1:]].astype(object)
+            self.conexao.executemany(
+                'INSERT OR REPLACE INTO materiais (linha, codigo_material, chave, descricao, '
+                'categoria, preco_unitario, estoque_atual) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                gravar.where(gravar.notna(), None).itertuples(index=False, name=None))
+
+            # Grupos afetados: chaves antigas e novas das linhas tocadas
+            afetadas = pd.concat([atuais['chave'], pareados['chave']]).dropna().unique()
+            pd.DataFrame({'chave': afetadas}).to_sql('_delta_chaves', self.conexao,
+                                                     if_exists='replace', index=False)
+            membros = self._consultar(
+                'SELECT chave, ' + ', '.join(COLUNAS_MATERIAIS) + ' FROM materiais '
+                'WHERE chave IN (SELECT chave FROM _delta_chaves) ORDER BY linha')
+            antes = self._consultar(
+                'SELECT * FROM grupos WHERE chave IN (SELECT chave FROM _delta_chaves)')
+            depois = _resumir_com_chave(membros)
+
+            self.conexao.execute('DELETE FROM grupos WHERE chave IN (SELECT chave FROM _delta_chaves)')
+            depois.to_sql('grupos', self.conexao, if_exists='append', index=False)
+            self.conexao.execute('DROP TABLE _delta_codigos')
+            self.conexao.execute('DROP TABLE _delta_chaves')
+
+        return _comparar_grupos(antes, depois)
+
+    def exportar(self, caminho='data/processed/duplicatas.csv'):
+        """Regrava duplicatas.csv a partir da tabela de grupos (sem recalcular)"""
+        grupos = self._consultar('SELECT * FROM grupos ORDER BY chave')
+        # Mesma ordenação da execução completa (grupos em ordem de chave → valor)
+        grupos = grupos[COLUNAS_DUPLICATAS].sort_values('valor_total_estoque', ascending=False)
+        grupos.to_csv(caminho, index=False, encoding='utf-8-sig')
+        return grupos
+
+
+def _comparar_grupos(antes, depois):
+    """Classifica os grupos das chaves afetadas em ADICIONADO/ALTERADO/RETIRADO"""
+    comparacao = antes.merge(depois, on='chave', how='outer', suffixes=('_antes', ''),
+                             indicator=True)
+    iguais = np.ones(len(comparacao), dtype=bool)
+    for coluna in COLUNAS_DUPLICATAS:
+        a, d = comparacao[coluna + '_antes'], comparacao[coluna]
+        iguais &= ((a == d) | (a.isna() & d.isna())).to_numpy()
+
+    comparacao['acao'] = np.select(
+        [comparacao['_merge'] == 'right_only', comparacao['_merge'] == 'left_only', ~iguais],
+        ['ADICIONADO', 'RETIRADO', 'ALTERADO'], default='',
+    )
+    comparacao['descricao'] = comparacao['descricao'].fillna(comparacao['descricao_antes'])
+    alteracoes = comparacao.loc[comparacao['acao'] != '', [
+        'chave', 'acao', 'descricao', 'qtd_duplicatas_antes', 'qtd_duplicatas',
+    ]].rename(columns={'qtd_duplicatas': 'qtd_duplicatas_depois'})
+    for coluna in ['qtd_duplicatas_antes', 'qtd_duplicatas_depois']:
+        alteracoes[coluna] = alteracoes[coluna].fillna(0).astype(np.int64)
+    return alteracoes.sort_values(['acao', 'chave']).reset_index(drop=True)
@@ -0,0 +1,165 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Plano de inventário cíclico com rota pelos corredores
+═══════════════════════════════════════════════════════════════════════════════
+
+localizacao_fisica segue Corredor-Prateleira-Altura ("E-07-05").
+coordenadas_localizacao() converte cada localização DISTINTA uma vez: no
+formato canônico (letra-NN-NN) os caracteres viram uma matriz de códigos
+(view uint32 do array unicode) e corredor/prateleira/altura saem por
+aritmética nas colunas; só o que foge do formato passa por regex.
+
+Prioridade de cada material × local:
+
+  atraso      dias desde a última contagem / intervalo da classe ABC
+              (A a cada 30 dias, B 90, C 180)
+  risco       (100 − score de acuracidade do 06) / ESCALA_RISCO, em [0, 1]
+  prioridade  atraso × (1 + PESO_RISCO × risco)
+
+A lista do dia são os até `capacidade` de maior prioridade positiva
+(np.argpartition, sem ordenar tudo), em ordem de rota serpentina:
+corredores em ordem, prateleiras subindo nos corredores pares e descendo
+nos ímpares, altura crescente (um np.lexsort). distancia_rota() estima a caminhada: dentro do
+corredor |Δprateleira| × PASSO_PRATELEIRA_M; entre corredores, a travessia
+pela cabeceira mais próxima. Sem localização válida fica no fim da lista.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+INTERVALO_DIAS = {'A': 30, 'B': 90, 'C': 180}
+ESCALA_RISCO = 20     # score de acuracidade 80% (classe F do 06) = risco máximo
+PESO_RISCO = 1.0
+CAPACIDADE_DIARIA = 200
+
+LARGURA_CORREDOR_M = 3.0
+PASSO_PRATELEIRA_M = 1.2
+
+RE_LOCALIZACAO = r'^\s*([A-Za-z]+)-(\d+)-(\d+)\s*$'
+SEM_COORDENADA = -1
+
+
+def coordenadas_localizacao(localizacoes):
+    """
+    DataFrame (mesmo índice) com corredor (texto), prateleira e altura
+    (int64); nulas ou fora do formato → corredor NaN e SEM_COORDENADA.
+    """
+    localizacoes = pd.Series(localizacoes)
+    codigos, unicos = pd.factorize(localizacoes)
+    unicos = np.asarray(unicos, dtype=str)
+    corredor = np.full(len(unicos), None, dtype=object)
+    prateleira = np.full(len(unicos), SEM_COORDENADA, dtype=np.int64)
+    altura = np.full(len(unicos), SEM_COORDENADA, dtype=np.int64)
+
+    canonico = np.zeros(len(unicos), dtype=bool)
+    if len(unicos) and unicos.dtype.itemsize // 4 >= 7:
+        # Um código unicode por coluna; posições 7+ precisam estar vazias
+        caracteres = unicos.view(np.uint32).reshape(len(unicos), -1).astype(np.int64)
+        digitos = caracteres[:, [2, 3, 5, 6]] - ord('0')
+        letra = caracteres[:, 0]
+        canonico = (((letra >= ord('A')) & (letra <= ord('Z')))
+                    & (caracteres[:, 1] == ord('-')) & (caracteres[:, 4] == ord('-'))
+                    & ((digitos >= 0) & (digitos <= 9)).all(axis=1)
+                    & (caracteres[:, 7:] == 0).all(axis=1))
+        corredor[canonico] = unicos[canonico].astype('U1')
+        prateleira[canonico] = digitos[canonico, 0] * 10 + digitos[canonico, 1]
+        altura[canonico] = digitos[canonico, 2] * 10 + digitos[canonico, 3]
+
+    outros = np.flatnonzero(~canonico)
+    if len(outros):
+        partes = pd.Series(unicos[outros]).str.extract(RE_LOCALIZACAO)
+        valido = partes[0].notna().to_numpy()
+        corredor[outros[valido]] = partes.loc[valido, 0].str.upper().to_numpy(dtype=object)
+        prateleira[outros[valido]] = partes.loc[valido, 1].astype(np.int64).to_numpy()
+        altura[outros[valido]] = partes.loc[valido, 2].astype(np.int64).to_numpy()
+
+    nulo = codigos < 0
+    codigos = np.where(nulo, 0, codigos)
+
+    def por_linha(valores, vazio):
+        if not len(valores):
+            return np.full(len(codigos), vazio, dtype=object if vazio is None else np.int64)
+        resultado = valores[codigos]
+        resultado[nulo] = vazio
+        return resultado
+
+    return pd.DataFrame({
+        'corredor': por_linha(corredor, None),
+        'prateleira': por_linha(prateleira, SEM_COORDENADA),
+        'altura': por_linha(altura, SEM_COORDENADA),
+    }, index=localizacoes.index)
+
+
+def prioridade_contagem(classe_abc, dias_desde_contagem, score_acuracidade=None):
+    """atraso relativo ao intervalo da classe × (1 + PESO_RISCO × risco de acuracidade)"""
+    intervalo = pd.Series(classe_abc).map(INTERVALO_DIAS).fillna(max(INTERVALO_DIAS.values()))
+    atraso = np.asarray(dias_desde_contagem, dtype=np.float64) / intervalo.to_numpy(dtype=np.float64)
+    if score_acuracidade is None:
+        return atraso
+    risco = np.clip((100 - np.asarray(score_acuracidade, dtype=np.float64)) / ESCALA_RISCO, 0, 1)
+    return atraso * (1 + PESO_RISCO * np.nan_to_num(risco))
+
+
+def selecionar(prioridade, capacidade=CAPACIDADE_DIARIA):
+    """
+    Posições dos até `capacidade` itens de maior prioridade (sem ordem
+    definida); prioridade 0 (contado hoje) ou nula não entra.
+    """
+    prioridade = np.asarray(prioridade, dtype=np.float64)
+    candidatos = np.flatnonzero(prioridade > 0)
+    if capacidade >= len(candidatos):
+        return candidatos
+    return candidatos[np.argpartition(-prioridade[candidatos], capacidade - 1)[:capacidade]]
+
+
+def _posicao_corredor(corredor):
+    """Ordem do corredor (0, 1, ...) por nome; sem corredor → SEM_COORDENADA"""
+    codigos, _ = pd.factorize(pd.Series(corredor), sort=True)
+    return codigos.astype(np.int64)
+
+
+def rota_serpentina(corredor, prateleira, altura):
+    """Permutação das posições na ordem da rota (serpentina); sem localização no fim"""
+    posicao = _posicao_corredor(corredor)
+    prateleira = np.asarray(prateleira, dtype=np.int64)
+    sentido = np.where(posicao % 2 == 0, prateleira, -prateleira)
+    corredores = np.where(posicao < 0, np.iinfo(np.int64).max, posicao)
+    return np.lexsort((np.asarray(altura, dtype=np.int64), sentido, corredores))
+
+
+def distancia_rota(corredor, prateleira):
+    """Metros estimados percorrendo as posições na ordem dada (sem localização não conta)"""
+    posicao = _posicao_corredor(corredor)
+    prateleira = np.asarray(prateleira, dtype=np.int64)
+    valido = posicao >= 0
+    posicao, prateleira = posicao[valido], prateleira[valido]
+    if len(posicao) < 2:
+        return 0.0
+    fim = prateleira.max() + 1  # cabeceira do fundo
+    a, b = prateleira[:-1], prateleira[1:]
+    mesmo = posicao[:-1] == posicao[1:]
+    # Troca de corredor: sai pela cabeceira mais próxima (frente = 0, fundo = fim)
+    travessia = np.minimum(a + b, 2 * fim - a - b) * PASSO_PRATELEIRA_M
+    passos = np.where(mesmo, np.abs(b - a) * PASSO_PRATELEIRA_M,
+                      travessia + np.abs(posicao[1:] - posicao[:-1]) * LARGURA_CORREDOR_M)
+    return float(passos.sum())
+
+
+def planejar_contagem(itens, capacidade=CAPACIDADE_DIARIA):
+    """
+    Lista de contagem do dia. `itens`: DataFrame com localizacao_fisica,
+    classe_abc, dias_desde_contagem e (opcional) score_acuracidade. Retorna
+    as linhas escolhidas em ordem de rota, com corredor, prateleira,
+    altura, prioridade e sequencia (1, 2, ...).
+    """
+    score = itens['score_acuracidade'] if 'score_acuracidade' in itens.columns else None
+    prioridade = prioridade_contagem(itens['classe_abc'], itens['dias_desde_contagem'], score)
+    escolhidos = selecionar(prioridade, capacidade)
+    plano = itens.iloc[escolhidos].copy()
+    plano['prioridade'] = prioridade[escolhidos]
+    plano = plano.join(coordenadas_localizacao(plano['localizacao_fisica']))
+    plano = plano.iloc[rota_serpentina(plano['corredor'], plano['prateleira'], plano['altura'])]
+    plano['sequencia'] = np.arange(1, len(plano) + 1)
+    return plano
@@ -0,0 +1,515 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Índice MinHash/LSH persistente de descrições
+═══════════════════════════════════════════════════════════════════════════════
+
+Cada descrição vira um conjunto de shingles de caracteres (trigramas do texto
+normalizado) e uma assinatura MinHash de `num_perm` valores. A proporção de
+posições iguais entre duas assinaturas estima a similaridade de Jaccard dos
+conjuntos de shingles.
+
+LSH (banding): a assinatura é dividida em `bandas` faixas; duas descrições
+são candidatas se coincidem em pelo menos uma faixa inteira. Cada faixa é
+guardada como um array ordenado de hashes de 64 bits, então consultar um
+material novo custa `bandas` buscas binárias (milissegundos), não uma
+varredura do cadastro.
+
+ORGANIZAÇÃO:
+- Assinaturas e faixas ficam por TEXTO normalizado distinto: milhões de
+  linhas com a mesma descrição compartilham uma única assinatura.
+- Linhas (codigo_material → texto) ficam em arrays paralelos; remoção só
+  marca a linha como inativa e salvar() compacta.
+- Textos novos entram num buffer pendente comparado por força bruta e são
+  mesclados às faixas ordenadas quando o buffer enche.
+
+Persistência: data/processed/indice_minhash.npz (np.savez sem compressão).
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from mdm.texto import normalizar_texto
+
+ARQUIVO_INDICE = 'data/processed/indice_minhash.npz'
+
+PRIMO = np.uint64(4294967311)  # primo > 2³² para o hash universal
+MASCARA_32 = np.uint64(0xFFFFFFFF)
+LIMITE_PENDENTES = 4096
+
+
+def shingles(texto_normalizado, k=3):
+    """Hashes crc32 (estáveis entre execuções) dos k-gramas do texto"""
+    texto = ' ' + texto_normalizado + ' '
+    if len(texto) <= k:
+        texto = texto.ljust(k + 1)
+    grams = {texto[i:i + k] for i in range(len(texto) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams),
+                       dtype=np.uint64, count=len(grams))
+
+
+def _crescer(array, tamanho):
+    """Realoca o array com capacidade dobrada (amortiza inserções unitárias)"""
+    if len(array) >= tamanho:
+        return array
+    nova = max(tamanho, 2 * len(array), 1024)
+    maior = np.empty((nova,) + array.shape[1:], dtype=array.dtype)
+    maior[:len(array)] = array
+    return maior
+
+
+class IndiceMinHash:
+    """Assinaturas MinHash + tabelas LSH por faixa, indexadas por codigo_material"""
+
+    def __init__(self, num_perm=128, bandas=32, k=3, semente=42):
+        if num_perm % bandas:
+            raise ValueError('num_perm deve ser múltiplo de bandas')
+        self.num_perm = num_perm
+        self.bandas = bandas
+        self.linhas_banda = num_perm // bandas
+        self.k = k
+        self.semente = semente
+
+        rng = np.random.default_rng(semente)
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+        self._mult = rng.integers(1, 2**63, size=self.linhas_banda, dtype=np.uint64) | np.uint64(1)
+
+        # Nível texto distinto
+        self._id_texto = {}
+        self._n_textos = 0
+        self._assinaturas = np.empty((0, num_perm), dtype=np.uint32)
+        self._chaves = np.empty((0, bandas), dtype=np.uint64)
+        self._ord_chave = [np.empty(0, dtype=np.uint64) for _ in range(bandas)]
+        self._ord_texto = [np.empty(0, dtype=np.int64) for _ in range(bandas)]
+        self._n_ordenados = 0
+
+        # Nível linha do cadastro
+        self._n = 0
+        self._codigos = np.empty(0, dtype=object)
+        self._descricoes = np.empty(0, dtype=object)
+        self._texto = np.empty(0, dtype=np.int64)
+        self._ativo = np.empty(0, dtype=bool)
+        self._por_codigo = None
+        self._csr_texto = None
+        self._extra_texto = {}
+
+    def __len__(self):
+        return int(self.ativo.sum())
+
+    codigos = property(lambda self: self._codigos[:self._n])
+    descricoes = property(lambda self: self._descricoes[:self._n])
+    textos = property(lambda self: self._texto[:self._n])
+    ativo = property(lambda self: self._ativo[:self._n])
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Assinaturas
+    # ─────────────────────────────────────────────────────────────────────
+
+    def assinar(self, textos_normalizados, lote=2000):
+        """Matriz (n × num_perm) de assinaturas MinHash"""
+        assinaturas = np.empty((len(textos_normalizados), self.num_perm), dtype=np.uint32)
+        for ini in range(0, len(textos_normalizados), lote):
+            bloco = [shingles(t, self.k) for t in textos_normalizados[ini:ini + lote]]
+            tamanhos = np.fromiter((len(s) for s in bloco), dtype=np.int64, count=len(bloco))
+            valores = np.concatenate(bloco)
+            # h_i(x) = (a_i·x + b_i) mod p, truncado em 32 bits
+            hashes = (np.outer(valores, self._a) + self._b) % PRIMO & MASCARA_32
+            inicios = np.r_[0, np.cumsum(tamanhos)[:-1]]
+            assinaturas[ini:ini + len(bloco)] = np.minimum.reduceat(hashes, inicios, axis=0)
+        return assinaturas
+
+    def _chaves_banda(self, assinaturas):
+        """Hash de 64 bits de cada faixa (n × bandas)"""
+        sig = assinaturas.astype(np.uint64).reshape(len(assinaturas), self.bandas, self.linhas_banda)
+        with np.errstate(over='ignore'):
+            return (sig * self._mult).sum(axis=2, dtype=np.uint64)
+
+    @staticmethod
+    def estimar_jaccard(sig_a, sig_b):
+        """Fração de posições iguais entre assinaturas (linha a linha)"""
+        return (sig_a == sig_b).mean(axis=-1)
+
+    def _registrar_textos(self, descricoes):
+        """Ids de texto de cada descrição (normaliza e assina só os inéditos)"""
+        cod, unicos = pd.factorize(pd.Series(descricoes, dtype=object), use_na_sentinel=False)
+        normalizados = [normalizar_texto(d) for d in unicos]
+        novos = list(dict.fromkeys(t for t in normalizados if t not in self._id_texto))
+        if novos:
+            inicio = self._n_textos
+            sig = self.assinar(novos)
+            self._assinaturas = _crescer(self._assinaturas, inicio + len(novos))
+            self._chaves = _crescer(self._chaves, inicio + len(novos))
+            self._assinaturas[inicio:inicio + len(novos)] = sig
+            self._chaves[inicio:inicio + len(novos)] = self._chaves_banda(sig)
+            for i, t in enumerate(novos):
+                self._id_texto[t] = inicio + i
+            self._n_textos += len(novos)
+            if self._n_textos - self._n_ordenados > LIMITE_PENDENTES:
+                self._consolidar()
+        ids = np.fromiter((self._id_texto[t] for t in normalizados),
+                          dtype=np.int64, count=len(normalizados))
+        return ids[cod]
+
+    def _consolidar(self):
+        """Mescla os textos pendentes às faixas ordenadas"""
+        if self._n_ordenados == self._n_textos:
+            return
+        pendentes = np.arange(self._n_ordenados, self._n_textos, dtype=np.int64)
+        for b in range(self.bandas):
+            chave = np.concatenate([self._ord_chave[b], self._chaves[pendentes, b]])
+            texto = np.concatenate([self._ord_texto[b], pendentes])
+            ordem = np.argsort(chave, kind='stable')
+            self._ord_chave[b], self._ord_texto[b] = chave[ordem], texto[ordem]
+        self._n_ordenados = self._n_textos
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Manutenção (add / remove)
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _mapa_codigos(self):
+        """codigo → linha (int) ou lista de linhas quando o código se repete"""
+        if self._por_codigo is None:
+            codigos = self.codigos
+            repetido = pd.Series(codigos).duplicated(keep=False).to_numpy()
+            self._por_codigo = dict(zip(codigos[~repetido].tolist(),
+                                        np.flatnonzero(~repetido).tolist()))
+            linhas_rep = np.flatnonzero(repetido)
+            for c, pos in pd.Series(linhas_rep).groupby(codigos[repetido]).indices.items():
+                self._por_codigo[c] = linhas_rep[pos].tolist()
+        return self._por_codigo
+
+    def _linhas_do_codigo(self, codigo, remover=False):
+        mapa = self._mapa_codigos()
+        linhas = mapa.pop(codigo, []) if remover else mapa.get(codigo, [])
+        return linhas if isinstance(linhas, list) else [linhas]
+
+    def adicionar(self, codigos, descricoes):
+        """
+        Insere materiais no índice. Códigos já presentes são substituídos
+        (material alterado); códigos repetidos dentro do lote são mantidos,
+        pois o cadastro pode ter o mesmo código em mais de uma linha.
+        """
+        codigos = np.asarray(codigos, dtype=object)
+        descricoes = np.asarray(descricoes, dtype=object)
+        if len(codigos) == 0:
+            return
+        self.remover(pd.unique(codigos))
+        ids = self._registrar_textos(descricoes)
+
+        inicio, fim = self._n, self._n + len(codigos)
+        self._codigos = _crescer(self._codigos, fim)
+        self._descricoes = _crescer(self._descricoes, fim)
+        self._texto = _crescer(self._texto, fim)
+        self._ativo = _crescer(self._ativo, fim)
+        self._codigos[inicio:fim] = codigos
+        self._descricoes[inicio:fim] = descricoes
+        self._texto[inicio:fim] = ids
+        self._ativo[inicio:fim] = True
+        self._n = fim
+
+        # Índices auxiliares já montados recebem as linhas novas
+        if self._por_codigo is not None:
+            for linha, codigo in enumerate(codigos.tolist(), inicio):
+                atual = self._por_codigo.get(codigo)
+                if atual is None:
+                    self._por_codigo[codigo] = linha
+                else:
+                    self._por_codigo[codigo] = self._linhas_do_codigo(codigo) + [linha]
+        if self._csr_texto is not None:
+            for linha, tid in enumerate(ids.tolist(), inicio):
+                self._extra_texto.setdefault(tid, []).append(linha)
+
+    def remover(self, codigos):
+        """Desativa todas as linhas dos códigos informados"""
+        if self._n == 0:
+            return 0
+        linhas = [l for c in codigos for l in self._linhas_do_codigo(c, remover=True)]
+        self._ativo[linhas] = False
+        return len(linhas)
+
+    def sincronizar(self, df):
+        """
+        Alinha o índice ao cadastro atual: insere códigos novos, reassina os
+        que mudaram de descrição e remove os que saíram. Retorna
+        (alterados, removidos) para atualizar só os pares afetados.
+        """
+        atual = pd.DataFrame({'codigo_material': self.codigos[self.ativo],
+                              'descricao': self.descricoes[self.ativo]}).fillna('')
+        novo = df[['codigo_material', 'descricao']].fillna('')
+        comparacao = atual.drop_duplicates().merge(
+            novo.drop_duplicates(), how='outer', indicator=True)
+        diferentes = comparacao.loc[comparacao['_merge'] != 'both', 'codigo_material']
+
+        removidos = pd.Index(atual['codigo_material'].unique()).difference(novo['codigo_material'])
+        mudaram = pd.Index(diferentes.unique()).difference(removidos)
+
+        self.remover(removidos)
+        lote = df[df['codigo_material'].isin(mudaram)]
+        self.adicionar(lote['codigo_material'].to_numpy(), lote['descricao'].to_numpy())
+        return mudaram, removidos
+
+    def compactar(self):
+        """Remove linhas inativas e textos sem nenhuma linha ativa"""
+        self._consolidar()
+        linhas = np.flatnonzero(self.ativo)
+        usados, novo_texto = np.unique(self.textos[linhas], return_inverse=True)
+
+        textos_norm = np.empty(self._n_textos, dtype=object)
+        for t, i in self._id_texto.items():
+            textos_norm[i] = t
+        self._id_texto = {t: i for i, t in enumerate(textos_norm[usados])}
+        self._assinaturas = self._assinaturas[usados]
+        self._chaves = self._chaves[usados]
+        self._n_textos = self._n_ordenados = len(usados)
+        for b in range(self.bandas):
+            ordem = np.argsort(self._chaves[:, b], kind='stable')
+            self._ord_chave[b] = self._chaves[ordem, b]
+            self._ord_texto[b] = ordem.astype(np.int64)
+
+        self._codigos = self.codigos[linhas]
+        self._descricoes = self.descricoes[linhas]
+        self._texto = novo_texto.ravel().astype(np.int64)
+        self._ativo = np.ones(len(linhas), dtype=bool)
+        self._n = len(linhas)
+        self._por_codigo = self._csr_texto = None
+        self._extra_texto = {}
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Consultas
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _textos_candidatos(self, chaves):
+        """Pares (consulta, texto) que colidem em ao menos uma faixa"""
+        if len(chaves) > 64:
+            self._consolidar()
+        consultas, textos = [], []
+        for b in range(self.bandas):
+            esq = np.searchsorted(self._ord_chave[b], chaves[:, b], side='left')
+            n = np.searchsorted(self._ord_chave[b], chaves[:, b], side='right') - esq
+            if n.any():
+                desloc = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+                consultas.append(np.repeat(np.arange(len(chaves)), n))
+                textos.append(self._ord_texto[b][np.repeat(esq, n) + desloc])
+
+        # Buffer pendente: comparação direta (poucos textos)
+        pendentes = np.arange(self._n_ordenados, self._n_textos, dtype=np.int64)
+        if len(pendentes):
+            iguais = (chaves[:, None, :] == self._chaves[pendentes][None, :, :]).any(axis=2)
+            q, p = np.nonzero(iguais)
+            consultas.append(q)
+            textos.append(pendentes[p])
+
+        if not consultas:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        base = max(self._n_textos, 1)
+        codigo = np.unique(np.concatenate(consultas) * base + np.concatenate(textos))
+        return codigo // base, codigo % base
+
+    def _linhas_ativas(self, textos):
+        """Linhas ativas de cada texto → (posição do texto, linha)"""
+        if self._csr_texto is None:
+            ordem = np.argsort(self.textos, kind='stable')
+            inicios = np.searchsorted(self.textos[ordem], np.arange(self._n_textos + 1))
+            self._csr_texto = (ordem, inicios)
+        ordem, inicios = self._csr_texto
+        # Textos criados depois do CSR só têm linhas no dicionário extra
+        no_csr = textos < len(inicios) - 1
+        t = np.where(no_csr, textos, 0)
+        n = np.where(no_csr, inicios[t + 1] - inicios[t], 0)
+        desloc = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        pos = np.repeat(np.arange(len(textos)), n)
+        linhas = ordem[np.repeat(inicios[t], n) + desloc]
+
+        extras = [(i, l) for i, t in enumerate(textos.tolist())
+                  for l in self._extra_texto.get(t, [])]
+        if extras:
+            pos = np.concatenate([pos, np.array([e[0] for e in extras], dtype=np.int64)])
+            linhas = np.concatenate([linhas, np.array([e[1] for e in extras], dtype=np.int64)])
+        ativo = self._ativo[linhas]
+        return pos[ativo], linhas[ativo]
+
+    def consultar(self, descricao, limiar=0.5, excluir_codigo=None):
+        """Materiais do índice parecidos com uma descrição proposta"""
+        sig = self.assinar([normalizar_texto(descricao)])
+        _, textos = self._textos_candidatos(self._chaves_banda(sig))
+        jac_texto = self.estimar_jaccard(self._assinaturas[textos], sig[0])
+        textos, jac_texto = textos[jac_texto >= limiar], jac_texto[jac_texto >= limiar]
+        pos, linhas = self._linhas_ativas(textos)
+        res = pd.DataFrame({
+            'codigo_material': self._codigos[linhas],
+            'descricao': self._descricoes[linhas],
+            'jaccard_estimado': jac_texto[pos],
+        })
+        if excluir_codigo is not None:
+            res = res[res['codigo_material'] != excluir_codigo]
+        return res.sort_values('jaccard_estimado', ascending=False, kind='stable').reset_index(drop=True)
+
+    def pares_candidatos(self, limiar=0.5, codigos=None, max_balde=500, lote=2000):
+        """
+        Pares candidatos (codigo_a, codigo_b, jaccard_estimado).
+
+        Sem `codigos`, varre o índice inteiro: linhas com o mesmo texto são
+        ligadas em estrela à primeira linha ativa do texto (Jaccard 1,0) e
+        textos diferentes são ligados pelas primeiras linhas, evitando os n²
+        pares de textos repetidos. Faixas compartilhadas por mais de
+        `max_balde` textos são ignoradas na varredura completa (trecho
+        genérico demais para discriminar).
+
+        Com `codigos` (atualização incremental após sincronizar()), cada
+        linha desses materiais é ligada à primeira linha ativa do próprio
+        texto e à primeira linha de cada texto candidato: os mesmos
+        componentes da varredura completa, sem os n² pares.
+        """
+        self._consolidar()
+        if codigos is not None:
+            alvo = np.array(sorted({l for c in codigos for l in self._linhas_do_codigo(c)}),
+                            dtype=np.int64)
+            alvo = alvo[self._ativo[alvo]]
+            q, textos = self._textos_candidatos(self._chaves[self._texto[alvo]])
+            pos, linhas = self._linhas_ativas(textos)
+            primeira = pd.Series(linhas).groupby(pos).min()
+            a, b = alvo[q[primeira.index.to_numpy()]], primeira.to_numpy()
+            # Dois alvos podem se ligar nas duas direções: mantém uma
+            base = max(self._n, 1)
+            par = np.unique(np.minimum(a, b)[a != b] * base + np.maximum(a, b)[a != b])
+            a, b = par // base, par % base
+        else:
+            linhas = np.flatnonzero(self.ativo)
+            textos = self.textos[linhas]
+            primeira = pd.Series(linhas).groupby(textos).min()
+            estrela_a = primeira.reindex(textos).to_numpy()
+            estrela_b = linhas[estrela_a != linhas]
+            estrela_a = estrela_a[estrela_a != linhas]
+
+            # Pares de textos por faixa. Um par só é avaliado na PRIMEIRA
+            # faixa em que colide (dispensa deduplicar entre faixas) e o
+            # Jaccard é calculado em lotes para manter a memória limitada.
+            usados = primeira.index.to_numpy()
+            base = self._n_textos
+            aprovados = []
+            balde_ok = np.zeros((base, self.bandas), dtype=bool)
+            for f in range(self.bandas):
+                chave = self._chaves[usados, f]
+                ordem = np.argsort(chave, kind='stable')
+                chave, texto = chave[ordem], usados[ordem]
+                inicio_run = np.r_[True, chave[1:] != chave[:-1]]
+                run = np.cumsum(inicio_run) - 1
+                tamanho = np.bincount(run)[run]
+                # Baldes gigantes (faixa genérica demais) não discriminam nada
+                pos_run = np.arange(len(chave)) - np.flatnonzero(inicio_run)[run]
+                balde_ok[texto, f] = tamanho <= max_balde
+                depois = np.where(tamanho <= max_balde, tamanho - 1 - pos_run, 0)
+                for ini in range(0, len(chave), lote):
+                    d = depois[ini:ini + lote]
+                    if not d.any():
+                        continue
+                    i = np.repeat(np.arange(ini, ini + len(d)), d)
+                    j = i + 1 + np.arange(d.sum()) - np.repeat(np.cumsum(d) - d, d)
+                    ta, tb = texto[i], texto[j]
+                    if f:
+                        colidiu = (self._chaves[ta, :f] == self._chaves[tb, :f]) & balde_ok[ta, :f]
+                        inedito = ~colidiu.any(axis=1)
+                        ta, tb = ta[inedito], tb[inedito]
+                    jac = self.estimar_jaccard(self._assinaturas[ta], self._assinaturas[tb])
+                    ok = jac >= limiar
+                    aprovados.append(np.minimum(ta, tb)[ok] * base + np.maximum(ta, tb)[ok])
+            pares = np.concatenate(aprovados) if aprovados else np.empty(0, dtype=np.int64)
+            a = np.concatenate([estrela_a, primeira.reindex(pares // base).to_numpy()])
+            b = np.concatenate([estrela_b, primeira.reindex(pares % base).to_numpy()])
+
+        jac = self.estimar_jaccard(self._assinaturas[self._texto[a]],
+                                   self._assinaturas[self._texto[b]])
+        pares = pd.DataFrame({
+            'codigo_a': self._codigos[a],
+            'codigo_b': self._codigos[b],
+            'jaccard_estimado': jac,
+        })
+        # Código repetido em várias linhas gera o mesmo par mais de uma vez
+        return _pares_unicos(pares[pares['jaccard_estimado'] >= limiar])
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Persistência
+    # ─────────────────────────────────────────────────────────────────────
+
+    def salvar(self, caminho=ARQUIVO_INDICE):
+        """Compacta e grava o índice em .npz (arrays prontos para carregar)"""
+        self.compactar()
+        textos_norm = np.empty(self._n_textos, dtype=object)
+        for t, i in self._id_texto.items():
+            textos_norm[i] = t
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        np.savez(
+            caminho,
+            params=np.array([self.num_perm, self.bandas, self.k, self.semente]),
+            textos_norm=textos_norm.astype(str),
+            assinaturas=self._assinaturas,
+            chaves=self._chaves,
+            ord_texto=np.column_stack(self._ord_texto) if self._n_textos else
+            np.empty((0, self.bandas), dtype=np.int64),
+            codigos=self.codigos.astype(str),
+            descricoes=pd.Series(self.descricoes).fillna('').to_numpy().astype(str),
+            texto=self.textos,
+        )
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_INDICE):
+        """Lê um índice salvo; as faixas ordenadas vêm prontas do arquivo"""
+        with np.load(caminho) as dados:
+            num_perm, bandas, k, semente = (int(v) for v in dados['params'])
+            indice = cls(num_perm=num_perm, bandas=bandas, k=k, semente=semente)
+            textos_norm = dados['textos_norm'].tolist()
+            indice._assinaturas = dados['assinaturas']
+            indice._chaves = dados['chaves']
+            ord_texto = dados['ord_texto']
+            indice._codigos = dados['codigos'].astype(object)
+            indice._descricoes = dados['descricoes'].astype(object)
+            indice._texto = dados['texto']
+        indice._id_texto = {t: i for i, t in enumerate(textos_norm)}
+        indice._n_textos = indice._n_ordenados = len(textos_norm)
+        indice._ord_texto = [ord_texto[:, b].copy() for b in range(bandas)]
+        indice._ord_chave = [indice._chaves[indice._ord_texto[b], b] for b in range(bandas)]
+        indice._n = len(indice._codigos)
+        indice._ativo = np.ones(indice._n, dtype=bool)
+        return indice
+
+    @classmethod
+    def construir(cls, df, **params):
+        """Índice completo a partir do cadastro (codigo_material, descricao)"""
+        indice = cls(**params)
+        indice.adicionar(df['codigo_material'].to_numpy(), df['descricao'].to_numpy())
+        indice._consolidar()
+        return indice
+
+
+def atualizar_pares(indice, pares, alterados, removidos, limiar=0.5):
+    """
+    Atualiza um conjunto de pares já calculado após sincronizar(): descarta
+    os pares que envolvem códigos alterados/removidos e recalcula os pares
+    dos alterados e dos vizinhos desses pares descartados. Se a primeira
+    linha de um texto sai, as demais linhas do texto (ligadas a ela em
+    estrela) e os textos ligados por ela são religados à nova primeira
+    linha; os componentes ficam iguais aos de uma reconstrução completa.
+    """
+    fora = pd.Index(alterados).union(pd.Index(removidos))
+    toca = pares['codigo_a'].isin(fora) | pares['codigo_b'].isin(fora)
+    vizinhos = pd.Index(pd.unique(pares.loc[toca, ['codigo_a', 'codigo_b']].to_numpy().ravel()))
+    recalcular = pd.Index(alterados).union(vizinhos.difference(fora))
+    novos = indice.pares_candidatos(limiar=limiar, codigos=recalcular)
+    # Pares dos vizinhos que já existiam voltam repetidos (em qualquer ordem)
+    return _pares_unicos(pd.concat([pares[~toca], novos], ignore_index=True))
+
+
+def _pares_unicos(pares):
+    """Um par por (codigo_a, codigo_b) sem ordem, com o maior Jaccard; ordem original"""
+    a = pares['codigo_a'].to_numpy(dtype=object)
+    b = pares['codigo_b'].to_numpy(dtype=object)
+    trocar = a > b
+    chave = pd.DataFrame({'a': np.where(trocar, b, a), 'b': np.where(trocar, a, b)})
+    maior = np.argsort(-pares['jaccard_estimado'].to_numpy(), kind='stable')
+    manter = np.sort(maior[~chave.iloc[maior].duplicated().to_numpy()])
+    return pares.iloc[manter].reset_index(drop=True)
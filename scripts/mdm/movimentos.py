@@ -0,0 +1,264 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Livro de movimentações de estoque (append-only, colunar por dia)
+═══════════════════════════════════════════════════════════════════════════════
+
+O cadastro só guarda `ultima_movimentacao`; giro, cobertura e estoque morto
+de verdade precisam das entradas e saídas. LivroMovimentos guarda cada
+transação (codigo_material, data, tipo E/S, quantidade) em disco:
+
+  data/movimentos/
+    manifesto.csv                 lote, dia, linhas (lote só entra 1 vez)
+    dia=2026-02-27/
+      lote_<id>.npz               transações do lote nesse dia (nunca
+                                  reescritas): dicionário de códigos +
+                                  índice int32, tipo int8, quantidade
+      diario.npz                  agregado do dia por material: entradas,
+                                  saídas, nº de movimentos (somado a cada
+                                  lote registrado)
+
+Os exports do ERP (CSV com COLUNAS_MOVIMENTO) chegam em
+data/movimentos_entrada/; importar_diretorio() registra cada arquivo ainda
+não visto como lote `<nome do arquivo>_NNNNN` (o 05 chama antes da análise).
+registrar() só acrescenta arquivos de lote e atualiza os agregados dos dias
+tocados. indicadores() percorre os agregados diários da janela (um arquivo
+pequeno por dia) acumulando arrays do tamanho do cadastro, sem ler as
+transações: o custo depende de dias × materiais movimentados, não do nº de
+transações. Com o estoque atual, o saldo de cada dia da janela é
+reconstruído de trás para frente, e o estoque médio sai de uma soma:
+
+  média(saldo) = estoque_atual − Σ_t líquido_t · (t − início) / N
+                 (t = dia da janela, N = dias, líquido = entradas − saídas)
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_MOVIMENTOS = 'data/movimentos'
+DIRETORIO_ENTRADA = 'data/movimentos_entrada'
+ARQUIVO_MANIFESTO = 'manifesto.csv'
+ARQUIVO_DIARIO = 'diario.npz'
+
+COLUNAS_MOVIMENTO = ['codigo_material', 'data', 'tipo', 'quantidade']
+COLUNAS_MANIFESTO = ['lote', 'dia', 'linhas']
+TIPOS = {'E': 1, 'S': -1}
+
+JANELA_DIAS = 365
+TAMANHO_LOTE = 1_000_000
+
+RE_PARTICAO = re.compile(r'dia=(\d{4}-\d{2}-\d{2})$')
+
+
+def _gravar_npz(caminho, **colunas):
+    """np.savez atômico (arquivo temporário + os.replace)"""
+    temporario = caminho + '.tmp.npz'
+    np.savez(temporario, **colunas)
+    os.replace(temporario, caminho)
+
+
+def _agregar(codigos, tipos, quantidades):
+    """Agregado por material: (códigos, entradas, saídas, n_movimentos)"""
+    indices, unicos = pd.factorize(codigos, sort=True)
+    n = len(unicos)
+    entrada = tipos > 0
+    entradas = np.bincount(indices, weights=np.where(entrada, quantidades, 0.0), minlength=n)
+    saidas = np.bincount(indices, weights=np.where(entrada, 0.0, quantidades), minlength=n)
+    movimentos = np.bincount(indices, minlength=n)
+    return np.asarray(unicos, dtype=str), entradas, saidas, movimentos
+
+
+def validar_movimentos(movimentos):
+    """DataFrame normalizado (dia datetime64[D], tipo ±1); erro em linha inválida"""
+    faltando = [c for c in COLUNAS_MOVIMENTO if c not in movimentos.columns]
+    if faltando:
+        raise ValueError(f"Movimentações sem as colunas: {faltando}")
+    tipo = movimentos['tipo'].astype(str).str.strip().str.upper().str[:1].map(TIPOS)
+    dia = pd.to_datetime(movimentos['data'], errors='coerce').to_numpy().astype('datetime64[D]')
+    quantidade = pd.to_numeric(movimentos['quantidade'], errors='coerce')
+    invalidas = (movimentos['codigo_material'].isna() | tipo.isna() | np.isnat(dia)
+                 | quantidade.isna() | (quantidade < 0))
+    if invalidas.any():
+        raise ValueError(f"{int(invalidas.sum())} movimentações inválidas "
+                         f"(1ª linha: {movimentos.index[invalidas.to_numpy()][0]})")
+    return pd.DataFrame({
+        'codigo_material': movimentos['codigo_material'].astype(str).to_numpy(dtype=object),
+        'dia': dia,
+        'tipo': tipo.to_numpy(dtype=np.int8),
+        'quantidade': quantidade.to_numpy(dtype=np.float64),
+    })
+
+
+class LivroMovimentos:
+    """Livro append-only de entradas e saídas, particionado por dia"""
+
+    def __init__(self, diretorio=DIRETORIO_MOVIMENTOS):
+        self.diretorio = diretorio
+
+    @property
+    def _caminho_manifesto(self):
+        return os.path.join(self.diretorio, ARQUIVO_MANIFESTO)
+
+    def _particao(self, dia):
+        return os.path.join(self.diretorio, f'dia={dia}')
+
+    def manifesto(self):
+        """DataFrame lote, dia, linhas dos lotes já registrados"""
+        if not os.path.exists(self._caminho_manifesto):
+            return pd.DataFrame(columns=COLUNAS_MANIFESTO)
+        return pd.read_csv(self._caminho_manifesto, dtype={'lote': str, 'dia': str})
+
+    def dias(self):
+        """Dias (str AAAA-MM-DD) com partição, em ordem"""
+        particoes = glob.glob(os.path.join(self.diretorio, 'dia=*'))
+        return sorted(m.group(1) for m in (RE_PARTICAO.search(p) for p in particoes) if m)
+
+    def __len__(self):
+        return int(self.manifesto()['linhas'].sum())
+
+    def registrar(self, movimentos, lote):
+        """
+        Acrescenta um lote de movimentações (DataFrame com COLUNAS_MOVIMENTO).
+        Um `lote` já registrado é recusado. Retorna o nº de linhas gravadas.
+        """
+        manifesto = self.manifesto()
+        if (manifesto['lote'] == str(lote)).any():
+            raise ValueError(f"Lote já registrado no livro: {lote}")
+        movimentos = validar_movimentos(movimentos)
+        if not len(movimentos):
+            return 0
+
+        registros = []
+        for dia, parte in movimentos.groupby('dia', sort=True):
+            dia = str(np.datetime64(dia, 'D'))
+            particao = self._particao(dia)
+            os.makedirs(particao, exist_ok=True)
+            indices, codigos = pd.factorize(parte['codigo_material'])
+            _gravar_npz(os.path.join(particao, f'lote_{lote}.npz'),
+                        codigos=np.asarray(codigos, dtype=str), material=indices.astype(np.int32),
+                        tipo=parte['tipo'].to_numpy(), quantidade=parte['quantidade'].to_numpy())
+            self._somar_diario(particao, parte)
+            registros.append((str(lote), dia, len(parte)))
+
+        novos = pd.DataFrame(registros, columns=COLUNAS_MANIFESTO)
+        novos.to_csv(self._caminho_manifesto, mode='a', index=False,
+                     header=not os.path.exists(self._caminho_manifesto))
+        return len(movimentos)
+
+    def _somar_diario(self, particao, parte):
+        """Soma o lote ao agregado diário da partição"""
+        agregado = _agregar(parte['codigo_material'].to_numpy(), parte['tipo'].to_numpy(),
+                            parte['quantidade'].to_numpy())
+        caminho = os.path.join(particao, ARQUIVO_DIARIO)
+        if os.path.exists(caminho):
+            with np.load(caminho) as atual:
+                anteriores = [atual['codigos'], atual['entradas'], atual['saidas'], atual['movimentos']]
+            tabela = pd.DataFrame(dict(zip(['codigos', 'entradas', 'saidas', 'movimentos'],
+                                           [np.concatenate(par) for par in zip(anteriores, agregado)])))
+            tabela = tabela.groupby('codigos', sort=True).sum()
+            agregado = (tabela.index.to_numpy(dtype=str), tabela['entradas'].to_numpy(),
+                        tabela['saidas'].to_numpy(), tabela['movimentos'].to_numpy())
+        codigos, entradas, saidas, movimentos = agregado
+        _gravar_npz(caminho, codigos=codigos, entradas=entradas, saidas=saidas,
+                    movimentos=movimentos.astype(np.int64))
+
+    def importar_csv(self, caminho, lote, tamanho_lote=TAMANHO_LOTE):
+        """Registra um export de movimentações lido em lotes (lote_00000, lote_00001, ...)"""
+        total = 0
+        for i, parte in enumerate(pd.read_csv(caminho, chunksize=tamanho_lote)):
+            total += self.registrar(parte, f'{lote}_{i:05d}')
+        return total
+
+    def importar_diretorio(self, diretorio=DIRETORIO_ENTRADA, padrao='*.csv', tamanho_lote=TAMANHO_LOTE):
+        """
+        Importa os CSVs do diretório que ainda não estão no livro (lote =
+        nome do arquivo sem extensão). Retorna {arquivo: linhas gravadas}.
+        """
+        registrados = set(self.manifesto()['lote'].str.rsplit('_', n=1).str[0])
+        importados = {}
+        for caminho in sorted(glob.glob(os.path.join(diretorio, padrao))):
+            lote = os.path.splitext(os.path.basename(caminho))[0]
+            if lote not in registrados:
+                importados[caminho] = self.importar_csv(caminho, lote, tamanho_lote)
+        return importados
+
+    def ler_dia(self, dia):
+        """Transações de um dia (todos os lotes), para auditoria"""
+        partes = []
+        for arquivo in sorted(glob.glob(os.path.join(self._particao(dia), 'lote_*.npz'))):
+            with np.load(arquivo) as lote:
+                partes.append(pd.DataFrame({
+                    'codigo_material': lote['codigos'][lote['material']],
+                    'data': dia,
+                    'tipo': np.where(lote['tipo'] > 0, 'E', 'S'),
+                    'quantidade': lote['quantidade'],
+                }))
+        if not partes:
+            return pd.DataFrame(columns=COLUNAS_MOVIMENTO)
+        return pd.concat(partes, ignore_index=True)
+
+    def diario(self, inicio=None, fim=None):
+        """Gera (dia, codigos, entradas, saidas, movimentos) dos agregados entre inicio e fim"""
+        for dia in self.dias():
+            if (inicio is not None and dia < inicio) or (fim is not None and dia > fim):
+                continue
+            with np.load(os.path.join(self._particao(dia), ARQUIVO_DIARIO)) as agregado:
+                yield (dia, agregado['codigos'], agregado['entradas'], agregado['saidas'],
+                       agregado['movimentos'])
+
+    def indicadores(self, estoque_atual, data_ref, janela_dias=JANELA_DIAS):
+        """
+        DataFrame por material (índice de `estoque_atual`, Série codigo →
+        estoque na data_ref) com entradas, saídas e movimentos da janela,
+        ultima_movimentacao / ultima_saida (todo o histórico até data_ref),
+        estoque_medio, giro_anual, cobertura_dias e estoque_morto (estoque
+        > 0 sem saída na janela). Códigos fora do cadastro são ignorados.
+        """
+        codigos = pd.Index(estoque_atual.index.astype(str))
+        n = len(codigos)
+        fim = np.datetime64(pd.Timestamp(data_ref).date(), 'D')
+        inicio = fim - np.timedelta64(janela_dias - 1, 'D')
+
+        entradas, saidas = np.zeros(n), np.zeros(n)
+        movimentos = np.zeros(n, dtype=np.int64)
+        liquido_ponderado = np.zeros(n)
+        nunca = np.datetime64('NaT', 'D')
+        ultima_mov = np.full(n, nunca)
+        ultima_saida = np.full(n, nunca)
+
+        for dia, cods, ent, sai, mov in self.diario(fim=str(fim)):
+            posicao = codigos.get_indexer(cods)
+            conhecido = posicao >= 0
+            posicao, ent, sai, mov = posicao[conhecido], ent[conhecido], sai[conhecido], mov[conhecido]
+            data = np.datetime64(dia, 'D')
+            ultima_mov[posicao] = data
+            ultima_saida[posicao[sai > 0]] = data
+            if data < inicio:
+                continue
+            entradas[posicao] += ent
+            saidas[posicao] += sai
+            movimentos[posicao] += mov
+            liquido_ponderado[posicao] += (ent - sai) * (data - inicio).astype(np.int64)
+
+        estoque = estoque_atual.to_numpy(dtype=np.float64)
+        estoque_medio = estoque - liquido_ponderado / janela_dias
+        consumo_diario = saidas / janela_dias
+        with np.errstate(divide='ignore', invalid='ignore'):
+            giro = np.where(estoque_medio > 0, saidas * (365 / janela_dias) / estoque_medio, np.nan)
+            cobertura = np.where(consumo_diario > 0, estoque / consumo_diario, np.inf)
+        return pd.DataFrame({
+            'entradas': entradas,
+            'saidas': saidas,
+            'movimentos': movimentos,
+            'ultima_movimentacao': pd.to_datetime(ultima_mov),
+            'ultima_saida': pd.to_datetime(ultima_saida),
+            'estoque_medio': estoque_medio,
+            'giro_anual': giro,
+            'cobertura_dias': cobertura,
+            'estoque_morto': (estoque > 0) & (saidas == 0),
+        }, index=estoque_atual.index)
@@ -0,0 +1,130 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Busca de vários padrões de uma vez (autômato de Aho-Corasick)
+═══════════════════════════════════════════════════════════════════════════════
+
+`serie.str.contains(p)` para cada padrão custa padrões × linhas. Aqui todos
+os padrões (variantes de abreviação/caixa, palavras-chave de categoria, ...)
+viram um único autômato:
+
+  1. trie dos padrões (normalizados pela mesma função aplicada ao texto)
+  2. links de falha por BFS: ao não haver transição, o autômato cai para o
+     maior sufixo do caminho atual que também é prefixo de algum padrão
+  3. saídas de cada estado = padrões que terminam nele + saídas do link
+
+Cada texto é lido UMA vez, caractere a caractere, e devolve todos os
+padrões presentes (inclusive sobrepostos); o custo depende do
+tamanho do texto, não do nº de padrões. As transições já resolvidas via
+links de falha ficam em cache por estado.
+
+Sobre uma coluna, só os textos DISTINTOS (pd.factorize) são varridos, e o
+resultado por linha é uma matriz esparsa CSR linhas × padrões.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class MultiPadrao:
+    """Autômato de Aho-Corasick sobre padrões literais (sensível à caixa, salvo `normalizar`)"""
+
+    def __init__(self, padroes, normalizar=None):
+        self.padroes = list(padroes)
+        self.normalizar = normalizar
+        self._goto = [{}]
+        self._saidas = [()]
+        for indice, padrao in enumerate(self.padroes):
+            self._inserir(self._normalizado(padrao), indice)
+        self._falha = self._ligar_falhas()
+        # Cache de transições: começa com as arestas da trie
+        self._delta = [dict(g) for g in self._goto]
+
+    def __len__(self):
+        return len(self.padroes)
+
+    def _normalizado(self, texto):
+        return self.normalizar(texto) if self.normalizar else texto
+
+    def _inserir(self, padrao, indice):
+        if not padrao:
+            raise ValueError(f"Padrão vazio (índice {indice})")
+        estado = 0
+        for c in padrao:
+            proximo = self._goto[estado].get(c)
+            if proximo is None:
+                proximo = len(self._goto)
+                self._goto[estado][c] = proximo
+                self._goto.append({})
+                self._saidas.append(())
+            estado = proximo
+        self._saidas[estado] += (indice,)
+
+    def _ligar_falhas(self):
+        """Links de falha em BFS; saídas herdam as do link"""
+        falha = [0] * len(self._goto)
+        fila = deque(self._goto[0].values())
+        while fila:
+            estado = fila.popleft()
+            for c, filho in self._goto[estado].items():
+                alvo = falha[estado]
+                while alvo and c not in self._goto[alvo]:
+                    alvo = falha[alvo]
+                falha[filho] = self._goto[alvo].get(c, 0)
+                self._saidas[filho] += self._saidas[falha[filho]]
+                fila.append(filho)
+        return falha
+
+    def _transicao(self, estado, c):
+        """Transição via links de falha (calculada uma vez e guardada)"""
+        s = estado
+        while c not in self._goto[s] and s:
+            s = self._falha[s]
+        alvo = self._goto[s].get(c, 0)
+        self._delta[estado][c] = alvo
+        return alvo
+
+    def encontrados(self, texto):
+        """Índices (ordenados) dos padrões presentes no texto"""
+        delta, saidas = self._delta, self._saidas
+        estado = 0
+        achados = set()
+        for c in self._normalizado(texto):
+            proximo = delta[estado].get(c)
+            estado = self._transicao(estado, c) if proximo is None else proximo
+            if saidas[estado]:
+                achados.update(saidas[estado])
+        return sorted(achados)
+
+    def _por_valor(self, serie):
+        """(códigos das linhas, CSR valores distintos × padrões)"""
+        codigos, valores = pd.factorize(serie)
+        indices, indptr = [], [0]
+        for valor in valores:
+            indices.extend(self.encontrados(str(valor)))
+            indptr.append(len(indices))
+        por_valor = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=bool), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(valores), len(self.padroes)))
+        return codigos, por_valor
+
+    def matriz(self, serie):
+        """
+        CSR booleana (linhas × padrões): padrão j presente no texto da linha i.
+        Cada texto distinto é varrido uma vez; nulos não têm ocorrências.
+        """
+        codigos, por_valor = self._por_valor(serie)
+        # Linha vazia extra no fim: o código -1 (nulo) cai nela
+        por_valor = sparse.vstack([por_valor, sparse.csr_matrix((1, len(self.padroes)), dtype=bool)],
+                                  format='csr')
+        return por_valor[np.where(codigos >= 0, codigos, por_valor.shape[0] - 1)]
+
+    def contar_linhas(self, serie):
+        """Série padrão → nº de linhas que o contêm (como str.contains(...).sum())"""
+        codigos, por_valor = self._por_valor(serie)
+        qtd = np.bincount(codigos[codigos >= 0], minlength=por_valor.shape[0])
+        return pd.Series(por_valor.T.astype(np.int64) @ qtd, index=self.padroes)
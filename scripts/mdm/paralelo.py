@@ -0,0 +1,97 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Execução em paralelo com memória compartilhada
+═══════════════════════════════════════════════════════════════════════════════
+
+Os trabalhos pesados (similaridade fuzzy por bloco) são divididos em SHARDS
+independentes e executados num ProcessPoolExecutor. Os dados NÃO vão para
+os workers como DataFrame serializado (pickle): o processo principal grava
+os arrays numpy num único bloco multiprocessing.shared_memory e cada worker
+só recebe o nome do bloco + o layout (dtype, shape, offset de cada array).
+
+Textos usam o layout do Arrow para strings: um buffer UTF-8 contínuo e um
+array de offsets; o worker só decodifica os textos que usar.
+
+Os workers são criados por fork (Linux/macOS, nós de lote). Onde fork não
+existe (Windows) numero_processos() devolve 1 e o chamador roda em série:
+com spawn, cada worker reexecutaria o script numerado inteiro.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+ALINHAMENTO = 64  # bytes; cada array começa numa linha de cache
+# Faixas por worker: mais faixas que workers equilibram faixas lentas
+SHARDS_POR_PROCESSO = 4
+
+
+def contexto_processos():
+    """Contexto multiprocessing por fork, ou None se a plataforma não tiver"""
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context('fork')
+
+
+def numero_processos(processos, n_linhas, min_linhas):
+    """
+    Workers efetivos: None = automático (todos os núcleos a partir de
+    `min_linhas` linhas, abaixo disso o custo de subir processos não compensa).
+    """
+    if contexto_processos() is None:
+        return 1
+    if processos is None:
+        processos = (os.cpu_count() or 1) if n_linhas >= min_linhas else 1
+    return max(1, int(processos))
+
+
+def publicar_arrays(arrays):
+    """
+    Copia um dict nome → np.ndarray para um bloco de memória compartilhada.
+    Retorna (shm, layout); o chamador faz shm.close() e shm.unlink() no fim.
+    """
+    layout, offset = {}, 0
+    for nome, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[nome] = (array.dtype.str, array.shape, offset)
+        offset += -(-array.nbytes // ALINHAMENTO) * ALINHAMENTO
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for nome, array in arrays.items():
+        dtype, shape, inicio = layout[nome]
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=inicio)[...] = array
+    return shm, layout
+
+
+def anexar_arrays(nome_shm, layout):
+    """(shm, dict de arrays) apontando para o bloco publicado, sem cópia"""
+    shm = shared_memory.SharedMemory(name=nome_shm)
+    arrays = {nome: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=inicio)
+              for nome, (dtype, shape, inicio) in layout.items()}
+    return shm, arrays
+
+
+def codificar_textos(textos):
+    """(dados uint8 UTF-8, offsets int64) no layout de strings do Arrow"""
+    codificados = [t.encode('utf-8') for t in textos]
+    offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in codificados], out=offsets[1:])
+    return np.frombuffer(b''.join(codificados), dtype=np.uint8), offsets
+
+
+class TextosCompartilhados:
+    """Acesso por posição a textos codificados por codificar_textos()"""
+
+    def __init__(self, dados, offsets):
+        self.dados = dados
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.dados[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
@@ -0,0 +1,154 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Perfil de completude em lotes (CSV maior que a memória)
+═══════════════════════════════════════════════════════════════════════════════
+
+perfilar_csv() lê o arquivo em lotes de tamanho fixo (read_csv chunksize) e
+cada lote só atualiza agregados SOMÁVEIS, guardados em PerfilCompletude:
+
+  perfil      (grupo, mascara, qtd)  padrões de ausência → não nulos por
+                                     campo, registros por categoria
+                                     (mdm.ausencia)
+  brancos     campo → qtd            textos não nulos só com espaços
+  histograma  (grupo, pontos, qtd)   score ponderado (mdm.completude) por
+                                     categoria, em pontos inteiros
+  piores      top-n linhas           mais campos críticos vazios
+  base        contadores por         base do rollup de GROUPING SETS
+              dimensões (opcional)   (mdm.rollup), se `dimensoes` for dado
+
+O tamanho de tudo depende de nº de categorias × padrões × valores de score,
+não de linhas: a memória fica constante para exports de vários GB.
+
+Perfis de arquivos (plantas) ou workers diferentes se combinam com `+`,
+somando as contagens; o resultado é exatamente o do arquivo único. Em
+empates no top de piores vale a ordem da soma, como em nlargest.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+from mdm.ausencia import (COLUNAS_PERFIL, bits_mascara, combinar_perfis, mascara_ausencia,
+                          perfil_padroes)
+from mdm.completude import matriz_preenchida, pontuar, score_percentual
+from mdm.rollup import base_rollup, combinar_bases
+
+TAMANHO_LOTE = 100_000
+COLUNAS_HISTOGRAMA = ['grupo', 'pontos', 'qtd']
+
+
+def _somar_contagens(tabelas, chaves):
+    """Concatena tabelas de contagem e soma `qtd` por chave (ordem de 1ª aparição)"""
+    tabela = pd.concat(tabelas, ignore_index=True)
+    return tabela.groupby(chaves, sort=False, dropna=False)['qtd'].sum().reset_index()
+
+
+class PerfilCompletude:
+    """Agregados de completude somáveis entre lotes, arquivos e workers"""
+
+    def __init__(self, campos, pesos, campos_criticos, coluna_grupo='categoria',
+                 colunas_piores=None, n_piores=20, dimensoes=None):
+        self.campos = list(campos)
+        self.pesos = dict(pesos)
+        self.campos_criticos = list(campos_criticos)
+        self.coluna_grupo = coluna_grupo
+        self.colunas_piores = list(colunas_piores or [])
+        self.n_piores = n_piores
+        self.dimensoes = list(dimensoes or [])
+
+        self.perfil = pd.DataFrame(columns=COLUNAS_PERFIL)
+        self.brancos = pd.Series(0, index=self.campos, dtype=np.int64)
+        self.histograma = pd.DataFrame(columns=COLUNAS_HISTOGRAMA)
+        self.piores = pd.DataFrame(columns=self.colunas_piores + ['vazios_count'])
+        self.base = None
+
+    def _configuracao(self):
+        return (self.campos, self.pesos, self.campos_criticos, self.coluna_grupo,
+                self.colunas_piores, self.n_piores, self.dimensoes)
+
+    def _vazio(self):
+        """Novo perfil sem dados com a mesma configuração"""
+        return PerfilCompletude(self.campos, self.pesos, self.campos_criticos, self.coluna_grupo,
+                                self.colunas_piores, self.n_piores, self.dimensoes)
+
+    @property
+    def total(self):
+        return int(self.perfil['qtd'].sum())
+
+    @property
+    def peso_total(self):
+        return sum(self.pesos.values())
+
+    def adicionar_lote(self, lote):
+        """Acumula um DataFrame (lote do CSV) nos agregados"""
+        faltando = [c for c in self.campos if c not in lote.columns]
+        if faltando:
+            raise ValueError(f"Lote sem os campos do perfil: {faltando}")
+        grupos = lote[self.coluna_grupo]
+
+        mascara = mascara_ausencia(lote, self.campos)
+        preenchida = matriz_preenchida(lote, self.campos)
+        ausentes = bits_mascara(mascara, len(self.campos))
+        brancos = ~ausentes & ~preenchida
+        pontos = pontuar(preenchida[:, [self.campos.index(c) for c in self.pesos]], self.pesos)
+
+        criticos = [self.campos.index(c) for c in self.campos_criticos]
+        candidatos = lote[self.colunas_piores].assign(
+            vazios_count=ausentes[:, criticos].sum(axis=1, dtype=np.int64))
+
+        lote_perfil = self._vazio()
+        lote_perfil.perfil = perfil_padroes(grupos, mascara)
+        lote_perfil.brancos = pd.Series(brancos.sum(axis=0), index=self.campos, dtype=np.int64)
+        lote_perfil.histograma = (pd.DataFrame({'grupo': np.asarray(grupos, dtype=object), 'pontos': pontos})
+                                  .groupby(['grupo', 'pontos'], sort=False, dropna=False).size()
+                                  .rename('qtd').reset_index())
+        lote_perfil.piores = candidatos.nlargest(self.n_piores, 'vazios_count')
+        if self.dimensoes:
+            lote_perfil.base = base_rollup(lote, self.campos, self.dimensoes)
+
+        combinado = self + lote_perfil
+        self.perfil, self.brancos = combinado.perfil, combinado.brancos
+        self.histograma, self.piores = combinado.histograma, combinado.piores
+        self.base = combinado.base
+        return self
+
+    def __add__(self, outro):
+        """Perfil combinado: contagens somadas, top de piores refeito"""
+        if self._configuracao() != outro._configuracao():
+            raise ValueError("Perfis com campos, pesos ou agrupamento diferentes não se combinam")
+        combinado = self._vazio()
+        partes = [p for p in (self, outro) if len(p.perfil)]
+        if not partes:
+            return combinado
+        combinado.perfil = combinar_perfis([p.perfil for p in partes])
+        combinado.brancos = self.brancos + outro.brancos
+        combinado.histograma = _somar_contagens([p.histograma for p in partes], ['grupo', 'pontos'])
+        piores = pd.concat([p.piores for p in partes], ignore_index=True)
+        combinado.piores = piores.nlargest(self.n_piores, 'vazios_count').reset_index(drop=True)
+        if self.dimensoes:
+            combinado.base = combinar_bases([p.base for p in partes], self.dimensoes)
+        return combinado
+
+    def distribuicao_scores(self):
+        """DataFrame grupo, score (0–100, 1 casa) e qtd de registros"""
+        pontos = self.histograma['pontos'].to_numpy(dtype=np.int64)
+        return pd.DataFrame({
+            'grupo': self.histograma['grupo'].to_numpy(),
+            'score': score_percentual(pontos, self.peso_total),
+            'qtd': self.histograma['qtd'].to_numpy(dtype=np.int64),
+        })
+
+
+def perfilar_csv(caminho, pesos, campos_criticos, campos=None, tamanho_lote=TAMANHO_LOTE, **opcoes):
+    """
+    PerfilCompletude de um CSV lido em lotes de `tamanho_lote` linhas.
+    Sem `campos`, usa todas as colunas do cabeçalho. `opcoes` vão para o
+    construtor (coluna_grupo, colunas_piores, n_piores, dimensoes).
+    """
+    if campos is None:
+        campos = list(pd.read_csv(caminho, nrows=0).columns)
+    perfil = PerfilCompletude(campos, pesos, campos_criticos, **opcoes)
+    for lote in pd.read_csv(caminho, chunksize=tamanho_lote):
+        perfil.adicionar_lote(lote)
+    return perfil
@@ -0,0 +1,121 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Varredura de qualidade de texto (espaços, caracteres, caixa)
+═══════════════════════════════════════════════════════════════════════════════
+
+Cada coluna de texto é codificada uma única vez (pd.factorize) e TODAS as
+verificações rodam de uma vez sobre os valores DISTINTOS, com o acessor
+.str do pandas e regex compiladas:
+
+  esp_inicio        espaço antes do texto          x != x.lstrip()
+  esp_fim           espaço depois do texto         x != x.rstrip()
+  esp_duplo         dois espaços seguidos          '  ' in x
+  char_especial     caracteres !@#$%^&*(){}[]|\<>
+  num_inicio        começa com dígito
+  inicio_minusculo  1º caractere minúsculo
+  nao_maiusculo     x != x.upper().strip()
+
+e a caixa (MAIÚSCULA / minúscula / Title Case / Mista Irregular) do texto
+sem espaços nas pontas. Os resultados voltam para as linhas pelos códigos
+inteiros (nulo = código -1 = nenhum problema), e as contagens por campo
+saem da qtd de cada valor distinto, sem tocar nas linhas.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+VERIFICACOES = ['esp_inicio', 'esp_fim', 'esp_duplo', 'char_especial', 'num_inicio',
+                'inicio_minusculo', 'nao_maiusculo']
+
+CAIXAS = ['MAIÚSCULA', 'minúscula', 'Title Case']
+CAIXA_MISTA = 'Mista Irregular'
+
+RE_CHAR_ESPECIAL = re.compile(r'[!@#$%^&*(){}\[\]|\\<>]')
+RE_NUM_INICIO = re.compile(r'\d')
+
+
+def tem_texto(serie):
+    """True se algum valor da coluna é str (checado nos valores distintos)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        valores = serie.cat.categories
+    else:
+        valores = pd.unique(serie.to_numpy(dtype=object))
+    return any(isinstance(v, str) for v in valores)
+
+
+def verificar_valores(valores):
+    """DataFrame (valores × VERIFICACOES) booleano + coluna `caixa`"""
+    textos = pd.Series([str(v) for v in valores], dtype=object)
+    sem_pontas = textos.str.strip()
+    verificacoes = {
+        'esp_inicio': textos != textos.str.lstrip(),
+        'esp_fim': textos != textos.str.rstrip(),
+        'esp_duplo': textos.str.contains('  ', regex=False),
+        'char_especial': textos.str.contains(RE_CHAR_ESPECIAL),
+        'num_inicio': textos.str.match(RE_NUM_INICIO),
+        'inicio_minusculo': textos.str[:1].str.islower(),
+        'nao_maiusculo': textos != textos.str.upper().str.strip(),
+    }
+    tabela = pd.DataFrame({k: v.to_numpy(dtype=bool) for k, v in verificacoes.items()})
+    condicoes = [sem_pontas == sem_pontas.str.upper(), sem_pontas == sem_pontas.str.lower(),
+                 sem_pontas == sem_pontas.str.title()]
+    tabela['caixa'] = np.select([c.to_numpy(dtype=bool) for c in condicoes], CAIXAS,
+                                default=CAIXA_MISTA).astype(object)
+    return tabela
+
+
+class VarreduraTexto:
+    """Verificações de uma coluna de texto, avaliadas uma vez por valor distinto"""
+
+    def __init__(self, serie):
+        self.index = serie.index
+        self.codigos, valores = pd.factorize(serie)
+        self.valores = np.asarray(valores, dtype=object)
+        self.unicos = verificar_valores(self.valores)
+        self.unicos['qtd'] = np.bincount(self.codigos[self.codigos >= 0],
+                                         minlength=len(self.valores))
+
+    def contagens(self):
+        """Série verificação → nº de registros com o problema"""
+        qtd = self.unicos['qtd'].to_numpy()
+        return pd.Series(qtd @ self.unicos[VERIFICACOES].to_numpy(dtype=np.int64),
+                         index=VERIFICACOES)
+
+    def distribuicao_caixa(self):
+        """value_counts() da caixa dos não nulos (empates na ordem de aparição)"""
+        dist = self.unicos.groupby('caixa', sort=False)['qtd'].sum()
+        dist = dist[dist > 0].sort_values(ascending=False, kind='stable')
+        dist.index.name = None
+        return dist
+
+    def matriz(self, verificacoes=VERIFICACOES):
+        """DataFrame booleano (linhas × verificações); nulos sem problema"""
+        tabela = self.unicos[list(verificacoes)].to_numpy(dtype=bool)
+        # Linha extra de False no fim: o código -1 (nulo) cai nela
+        tabela = np.vstack([tabela, np.zeros((1, tabela.shape[1]), dtype=bool)])
+        return pd.DataFrame(tabela[self.codigos], index=self.index, columns=list(verificacoes))
+
+    def aplicar(self, funcao):
+        """funcao(str(valor)) avaliada por valor distinto e devolvida por linha"""
+        return self.aplicar_rotulos([funcao(str(v)) for v in self.valores])
+
+    def aplicar_rotulos(self, rotulos):
+        """Série por linha a partir de um rótulo por valor distinto (NaN nos nulos)"""
+        tabela = np.empty(len(self.valores) + 1, dtype=object)
+        tabela[:-1] = rotulos
+        tabela[-1] = np.nan
+        return pd.Series(tabela[self.codigos], index=self.index)
+
+
+def varrer_texto(df, colunas):
+    """Dicionário coluna → VarreduraTexto"""
+    return {c: VarreduraTexto(df[c]) for c in colunas}
+
+
+def resumo_por_campo(varreduras):
+    """DataFrame campo × verificação com o nº de registros afetados"""
+    return pd.DataFrame({c: v.contagens() for c, v in varreduras.items()}).T
@@ -0,0 +1,286 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Reconciliação de contagens físicas (coletores) × estoque sistema
+═══════════════════════════════════════════════════════════════════════════════
+
+Os coletores geram um arquivo por contagem com uma linha por leitura:
+
+  codigo_material, localizacao_fisica, quantidade   (aceita também qty/qtd)
+
+ReconciliadorContagens lê o cadastro UMA vez e monta a tabela hash do join:
+
+  codigos, locais   pd.Index dos códigos e das localizações do cadastro
+  chaves            pd.Index int64 de código × localização (posição do
+                    código · nº de locais + posição do local) → linha do
+                    saldo sistema agregado (códigos repetidos no mesmo
+                    local somam)
+  por_local         saldos ordenados por localização + início de cada local
+
+Cada arquivo é lido em lotes (read_csv chunksize). Por lote, as leituras
+viram chaves inteiras com 2 get_indexer e uma busca em `chaves`; a
+quantidade é somada num acumulador do tamanho do cadastro (np.add.at), e
+o que não existe no cadastro (código desconhecido ou código fora do local)
+vai para uma tabela pequena de extras. No fim do arquivo:
+
+  contados      saldos lidos + saldos do sistema nos locais contados que
+                não foram lidos (físico 0 → Falta)
+  divergências  qtd, valor, % e Sobra / Falta / OK, só com arrays
+  saída         linhas do arquivo acrescentadas ao CSV de resultado; um
+                arquivo reprocessado (mtime novo) tem as linhas anteriores
+                descartadas antes, sem duplicar saldos
+
+O acumulador é zerado só nas posições tocadas: o custo de cada arquivo
+depende das leituras e dos locais contados, não do tamanho do cadastro.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import codecs
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CONTAGEM = ['codigo_material', 'localizacao_fisica', 'quantidade']
+ALIASES_QUANTIDADE = ['qty', 'qtd']
+COLUNAS_RESULTADO = ['arquivo', 'codigo_material', 'localizacao_fisica', 'descricao', 'categoria',
+                     'cadastrado', 'estoque_sistema', 'estoque_fisico', 'divergencia_qtd',
+                     'divergencia_perc', 'divergencia_valor', 'tipo_divergencia', 'valor_estoque']
+COLUNAS_MANIFESTO = ['arquivo', 'mtime', 'leituras', 'linhas']
+
+TAMANHO_LOTE = 200_000
+SEM_LOCAL = '(sem local)'
+
+
+def tipo_divergencia(divergencia_qtd):
+    """'Sobra' (> 0), 'Falta' (< 0) ou 'OK' por linha"""
+    divergencia_qtd = np.asarray(divergencia_qtd)
+    return np.select([divergencia_qtd > 0, divergencia_qtd < 0], ['Sobra', 'Falta'], default='OK')
+
+
+def divergencia_percentual(fisico, sistema):
+    """(físico − sistema) / sistema × 100, sistema 0 tratado como 1 (como no 06)"""
+    sistema = np.asarray(sistema, dtype=np.float64)
+    return np.round((np.asarray(fisico) - sistema) / np.where(sistema == 0, 1, sistema) * 100, 2)
+
+
+def normalizar_contagem(lote):
+    """Lote com COLUNAS_CONTAGEM (código e local como texto sem espaços, quantidade numérica)"""
+    renomear = {a: 'quantidade' for a in ALIASES_QUANTIDADE if a in lote.columns and 'quantidade' not in lote.columns}
+    lote = lote.rename(columns=renomear)
+    faltando = [c for c in COLUNAS_CONTAGEM if c not in lote.columns]
+    if faltando:
+        raise ValueError(f"Arquivo de contagem sem as colunas: {faltando}")
+    quantidade = pd.to_numeric(lote['quantidade'], errors='coerce')
+    invalidas = lote['codigo_material'].isna() | quantidade.isna() | (quantidade < 0)
+    if invalidas.any():
+        raise ValueError(f"{int(invalidas.sum())} leituras inválidas "
+                         f"(1ª linha: {lote.index[invalidas.to_numpy()][0]})")
+    return pd.DataFrame({
+        'codigo_material': lote['codigo_material'].astype(str).str.strip().to_numpy(dtype=object),
+        'localizacao_fisica': lote['localizacao_fisica'].fillna(SEM_LOCAL).astype(str).str.strip()
+                              .to_numpy(dtype=object),
+        'quantidade': quantidade.to_numpy(dtype=np.float64),
+    })
+
+
+class ReconciliadorContagens:
+    """Join em memória das contagens dos coletores com o saldo sistema por código × local"""
+
+    def __init__(self, df):
+        saldos = (df.assign(localizacao_fisica=df['localizacao_fisica'].fillna(SEM_LOCAL).astype(str).str.strip(),
+                            codigo_material=df['codigo_material'].astype(str).str.strip())
+                  .groupby(['codigo_material', 'localizacao_fisica'], sort=False)
+                  .agg(estoque_sistema=('estoque_atual', 'sum'), preco_unitario=('preco_unitario', 'first'),
+                       descricao=('descricao', 'first'), categoria=('categoria', 'first'))
+                  .reset_index())
+        cod_saldo, codigos = pd.factorize(saldos['codigo_material'])
+        loc_saldo, locais = pd.factorize(saldos['localizacao_fisica'])
+        self.codigos, self.locais = pd.Index(codigos), pd.Index(locais)
+        self.chaves = pd.Index(cod_saldo.astype(np.int64) * len(locais) + loc_saldo)
+
+        self.codigo = saldos['codigo_material'].to_numpy(dtype=object)
+        self.local = saldos['localizacao_fisica'].to_numpy(dtype=object)
+        self.descricao = saldos['descricao'].to_numpy(dtype=object)
+        self.categoria = saldos['categoria'].to_numpy(dtype=object)
+        self.sistema = saldos['estoque_sistema'].to_numpy(dtype=np.float64)
+        self.preco = saldos['preco_unitario'].to_numpy(dtype=np.float64)
+        # Preço por código (1º local) para leituras de um código fora do seu local
+        self.preco_codigo = np.zeros(len(codigos))
+        self.preco_codigo[cod_saldo[::-1]] = self.preco[::-1]
+
+        self.por_local = np.argsort(loc_saldo, kind='stable')
+        self.inicio_local = np.searchsorted(loc_saldo[self.por_local], np.arange(len(locais) + 1))
+
+        self._fisico = np.zeros(len(saldos))
+
+    def __len__(self):
+        return len(self.sistema)
+
+    def _saldos_dos_locais(self, posicoes_locais):
+        """Linhas de saldo de todos os locais pedidos (concatenação de faixas do CSR)"""
+        inicios, fins = self.inicio_local[posicoes_locais], self.inicio_local[posicoes_locais + 1]
+        tamanhos = fins - inicios
+        if not tamanhos.sum():
+            return np.zeros(0, dtype=np.int64)
+        deslocamento = np.repeat(inicios - np.cumsum(tamanhos) + tamanhos, tamanhos)
+        return self.por_local[np.arange(tamanhos.sum()) + deslocamento]
+
+    def _acumular(self, lote, tocadas, locais_contados, extras):
+        """Soma as leituras do lote: conhecidas no acumulador, o resto em `extras`"""
+        pos_cod = self.codigos.get_indexer(lote['codigo_material'])
+        pos_loc = self.locais.get_indexer(lote['localizacao_fisica'])
+        linha = np.full(len(lote), -1, dtype=np.int64)
+        ambos = (pos_cod >= 0) & (pos_loc >= 0)
+        linha[ambos] = self.chaves.get_indexer(pos_cod[ambos].astype(np.int64) * len(self.locais)
+                                               + pos_loc[ambos])
+        conhecida = linha >= 0
+        quantidade = lote['quantidade'].to_numpy()
+        np.add.at(self._fisico, linha[conhecida], quantidade[conhecida])
+        tocadas.append(np.unique(linha[conhecida]))
+        locais_contados.append(np.unique(pos_loc[pos_loc >= 0]))
+        if not conhecida.all():
+            extras.append(lote[~conhecida])
+
+    def reconciliar_arquivo(self, caminho, nome=None, tamanho_lote=TAMANHO_LOTE):
+        """
+        Reconcilia um arquivo de contagem lido em lotes. Retorna (resultado,
+        leituras): DataFrame com COLUNAS_RESULTADO (saldos lidos, saldos não
+        lidos dos locais contados e leituras fora do cadastro) e o nº de
+        linhas lidas do arquivo.
+        """
+        nome = nome or os.path.basename(caminho)
+        tocadas, locais_contados, extras = [], [], []
+        leituras = 0
+        try:
+            for lote in pd.read_csv(caminho, chunksize=tamanho_lote, dtype=str):
+                lote = normalizar_contagem(lote)
+                leituras += len(lote)
+                self._acumular(lote, tocadas, locais_contados, extras)
+
+            lidas = np.unique(np.concatenate(tocadas)) if tocadas else np.zeros(0, dtype=np.int64)
+            locais = (np.unique(np.concatenate(locais_contados)) if locais_contados
+                      else np.zeros(0, dtype=np.int64))
+            linhas = np.union1d(lidas, self._saldos_dos_locais(locais))
+            fisico = self._fisico[linhas].copy()
+        finally:
+            # Limpa só o que foi tocado, mesmo se um lote falhar: o próximo
+            # arquivo começa do zero
+            if tocadas:
+                self._fisico[np.concatenate(tocadas)] = 0
+
+        partes = [pd.DataFrame({
+            'codigo_material': self.codigo[linhas], 'localizacao_fisica': self.local[linhas],
+            'descricao': self.descricao[linhas], 'categoria': self.categoria[linhas],
+            'cadastrado': True, 'estoque_sistema': self.sistema[linhas], 'estoque_fisico': fisico,
+            'preco_unitario': self.preco[linhas],
+        })]
+        if extras:
+            fora = (pd.concat(extras, ignore_index=True)
+                    .groupby(['codigo_material', 'localizacao_fisica'], sort=True)['quantidade'].sum()
+                    .reset_index())
+            pos_cod = self.codigos.get_indexer(fora['codigo_material'])
+            partes.append(pd.DataFrame({
+                'codigo_material': fora['codigo_material'], 'localizacao_fisica': fora['localizacao_fisica'],
+                'descricao': np.nan, 'categoria': np.nan,
+                'cadastrado': pos_cod >= 0, 'estoque_sistema': 0.0,
+                'estoque_fisico': fora['quantidade'].to_numpy(),
+                'preco_unitario': np.where(pos_cod >= 0, self.preco_codigo[pos_cod], 0.0),
+            }))
+        resultado = pd.concat(partes, ignore_index=True)
+        return self._divergencias(resultado, nome), leituras
+
+    @staticmethod
+    def _divergencias(resultado, nome):
+        """Colunas de divergência (qtd, %, valor, tipo) e ordem de COLUNAS_RESULTADO"""
+        resultado['arquivo'] = nome
+        resultado['divergencia_qtd'] = resultado['estoque_fisico'] - resultado['estoque_sistema']
+        resultado['divergencia_perc'] = divergencia_percentual(resultado['estoque_fisico'],
+                                                               resultado['estoque_sistema'])
+        resultado['divergencia_valor'] = resultado['divergencia_qtd'] * resultado['preco_unitario']
+        resultado['tipo_divergencia'] = tipo_divergencia(resultado['divergencia_qtd'])
+        resultado['valor_estoque'] = resultado['estoque_sistema'] * resultado['preco_unitario']
+        return resultado[COLUNAS_RESULTADO]
+
+
+def resumir(resultado):
+    """Uma linha por arquivo: locais, saldos, OK/Sobra/Falta e acuracidade em qtd e valor"""
+    resumo = resultado.groupby('arquivo', sort=False).agg(
+        locais=('localizacao_fisica', 'nunique'),
+        saldos=('codigo_material', 'size'),
+        estoque_sistema=('estoque_sistema', 'sum'),
+        valor_estoque=('valor_estoque', 'sum'),
+        divergencia_qtd=('divergencia_qtd', 'sum'),
+        divergencia_valor=('divergencia_valor', 'sum'),
+    )
+    tipos = pd.crosstab(resultado['arquivo'], resultado['tipo_divergencia'])
+    resumo = resumo.join(tipos.reindex(columns=['OK', 'Sobra', 'Falta'], fill_value=0))
+    resumo['acuracidade_qtd'] = (1 - resumo['divergencia_qtd'].abs()
+                                 / resumo['estoque_sistema'].replace(0, np.nan)) * 100
+    resumo['acuracidade_valor'] = (1 - resumo['divergencia_valor'].abs()
+                                   / resumo['valor_estoque'].replace(0, np.nan)) * 100
+    return resumo.reset_index()
+
+
+def arquivos_pendentes(arquivos, caminho_manifesto):
+    """Arquivos ainda não reconciliados (ou alterados desde a última vez, pelo mtime em ns)"""
+    if not os.path.exists(caminho_manifesto):
+        return list(arquivos)
+    manifesto = pd.read_csv(caminho_manifesto, dtype={'arquivo': str, 'mtime': np.int64})
+    vistos = dict(zip(manifesto['arquivo'], manifesto['mtime']))
+    return [a for a in arquivos if vistos.get(os.path.basename(a)) != os.stat(a).st_mtime_ns]
+
+
+def descartar_arquivos(caminho, nomes, tamanho_lote=TAMANHO_LOTE):
+    """
+    Regrava o CSV `caminho` (em lotes, mantendo o BOM se houver) sem as
+    linhas cuja coluna `arquivo` está em `nomes`. Retorna o nº de linhas
+    descartadas.
+    """
+    nomes = set(nomes)
+    if not nomes or not os.path.exists(caminho):
+        return 0
+    with open(caminho, 'rb') as f:
+        bom = f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+    temporario = caminho + '.tmp'
+    descartadas, primeiro = 0, True
+    for lote in pd.read_csv(caminho, chunksize=tamanho_lote, dtype=str, keep_default_na=False,
+                            encoding='utf-8-sig'):
+        manter = ~lote['arquivo'].isin(nomes)
+        descartadas += int((~manter).sum())
+        lote[manter].to_csv(temporario, mode='w' if primeiro else 'a', index=False, header=primeiro,
+                            encoding='utf-8-sig' if primeiro and bom else 'utf-8')
+        primeiro = False
+    if primeiro:
+        return 0
+    os.replace(temporario, caminho)
+    return descartadas
+
+
+def reconciliar_arquivos(reconciliador, arquivos, saida, caminho_manifesto, tamanho_lote=TAMANHO_LOTE):
+    """
+    Reconcilia cada arquivo e acrescenta o resultado a `saida` (CSV) e uma
+    linha ao manifesto, arquivo por arquivo. Arquivos já reconciliados
+    antes (alterados desde então) têm as linhas antigas descartadas de
+    `saida` e do manifesto primeiro. Retorna o resumo dos arquivos.
+    """
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    if os.path.exists(caminho_manifesto):
+        vistos = set(pd.read_csv(caminho_manifesto, dtype={'arquivo': str})['arquivo'])
+        refeitos = [os.path.basename(c) for c in arquivos if os.path.basename(c) in vistos]
+        descartar_arquivos(saida, refeitos, tamanho_lote)
+        descartar_arquivos(caminho_manifesto, refeitos, tamanho_lote)
+    resumos = []
+    for caminho in arquivos:
+        resultado, leituras = reconciliador.reconciliar_arquivo(caminho, tamanho_lote=tamanho_lote)
+        novo = not os.path.exists(saida)
+        # BOM só no início do arquivo (utf-8-sig gravaria um a cada append)
+        resultado.to_csv(saida, mode='a', index=False, header=novo,
+                         encoding='utf-8-sig' if novo else 'utf-8')
+        pd.DataFrame([[os.path.basename(caminho), os.stat(caminho).st_mtime_ns, leituras, len(resultado)]],
+                     columns=COLUNAS_MANIFESTO).to_csv(caminho_manifesto, mode='a', index=False,
+                                                       header=not os.path.exists(caminho_manifesto))
+        resumos.append(resumir(resultado))
+    if not resumos:
+        return pd.DataFrame()
+    return pd.concat(resumos, ignore_index=True)
@@ -0,0 +1,171 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Rollups de completude por GROUPING SETS (tabela em cache)
+═══════════════════════════════════════════════════════════════════════════════
+
+Em vez de um groupby (ou loop `for cat in categorias`) por visão, os
+registros passam UMA vez por um groupby no grão mais fino:
+
+  categoria × responsavel_cadastro × centro_custo × status
+
+somando contadores (qtd de registros, preenchidos de cada campo, NCM
+válido, preço > 0, obrigatórios completos). Essa base é pequena e SOMÁVEL
+(lotes e arquivos se combinam), e todas as 2⁴ combinações de dimensões
+(o CUBE do SQL: total, por categoria, categoria × status, ...) saem dela:
+
+  agrupamento               categoria   responsavel_cadastro  ...  qtd
+  total                     (todos)     (todos)                    3300
+  categoria                 EPI         (todos)                    215
+  categoria+status          EPI         (todos)                    141
+
+Dimensão nula vira "(vazio)" para não se confundir com "(todos)".
+obter_rollup() lê o cache em CSV e só recalcula (em lotes) quando algum
+arquivo de origem for mais novo ou quando o cache veio de outros arquivos
+(coluna `origens` com os caminhos absolutos); 02, 14 e 16 leem as visões
+dele.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from mdm.completude import ncm_valido
+
+DIMENSOES_ROLLUP = ['categoria', 'responsavel_cadastro', 'centro_custo', 'status']
+ARQUIVO_ROLLUP = 'data/processed/completude_rollup.csv'
+TAMANHO_LOTE = 100_000
+
+TODOS = '(todos)'
+VAZIO = '(vazio)'
+
+# Obrigatórios do KPI "completude geral" (registro com TODOS preenchidos)
+CAMPOS_OBRIGATORIOS = ['codigo_material', 'descricao', 'categoria', 'unidade_medida',
+                       'preco_unitario', 'estoque_atual', 'data_cadastro', 'status',
+                       'responsavel_cadastro']
+
+PREFIXO_PREENCHIDO = 'preenchido__'
+
+
+def indicadores_completude(df, campos):
+    """DataFrame booleano com os contadores da base (1 coluna por indicador)"""
+    indicadores = {PREFIXO_PREENCHIDO + c: df[c].notna().to_numpy() for c in campos}
+    indicadores['ncm_valido'] = ncm_valido(df['ncm'])
+    indicadores['preco_positivo'] = (df['preco_unitario'] > 0).to_numpy()
+    indicadores['obrigatorios_completos'] = df[CAMPOS_OBRIGATORIOS].notna().all(axis=1).to_numpy()
+    return pd.DataFrame(indicadores, index=df.index)
+
+
+def base_rollup(df, campos, dimensoes=DIMENSOES_ROLLUP):
+    """Contadores no grão mais fino das dimensões: uma passada pelas linhas"""
+    chaves = df[dimensoes].astype(object).where(df[dimensoes].notna(), VAZIO)
+    tabela = pd.concat([chaves, indicadores_completude(df, campos).astype(np.int64)], axis=1)
+    tabela['qtd'] = 1
+    return tabela.groupby(dimensoes, sort=False).sum().reset_index()
+
+
+def combinar_bases(bases, dimensoes=DIMENSOES_ROLLUP):
+    """Soma bases de lotes ou arquivos diferentes"""
+    base = pd.concat(bases, ignore_index=True)
+    return base.groupby(dimensoes, sort=False).sum().reset_index()
+
+
+def base_rollup_csv(caminho, dimensoes=DIMENSOES_ROLLUP, tamanho_lote=TAMANHO_LOTE):
+    """Base de um CSV lido em lotes (memória constante)"""
+    campos = list(pd.read_csv(caminho, nrows=0).columns)
+    base = None
+    for lote in pd.read_csv(caminho, chunksize=tamanho_lote):
+        parcial = base_rollup(lote, campos, dimensoes)
+        base = parcial if base is None else combinar_bases([base, parcial], dimensoes)
+    return base
+
+
+def grouping_sets(base, dimensoes=DIMENSOES_ROLLUP, conjuntos=None):
+    """
+    Rollup da base em cada conjunto de dimensões (padrão: todos, como CUBE).
+    Coluna `agrupamento` = dimensões do conjunto unidas por "+" ou "total";
+    as demais dimensões ficam com "(todos)".
+    """
+    if conjuntos is None:
+        conjuntos = [c for n in range(len(dimensoes) + 1)
+                     for c in itertools.combinations(dimensoes, n)]
+    metricas = [c for c in base.columns if c not in dimensoes]
+    partes = []
+    for conjunto in conjuntos:
+        conjunto = list(conjunto)
+        if conjunto:
+            parte = base.groupby(conjunto, sort=True)[metricas].sum().reset_index()
+        else:
+            parte = base[metricas].sum().to_frame().T
+        for dimensao in dimensoes:
+            if dimensao not in conjunto:
+                parte[dimensao] = TODOS
+        parte.insert(0, 'agrupamento', '+'.join(conjunto) or 'total')
+        partes.append(parte[['agrupamento'] + dimensoes + metricas])
+    return pd.concat(partes, ignore_index=True)
+
+
+def texto_origens(arquivos):
+    """Caminhos absolutos das origens em um texto (ordem preservada)"""
+    arquivos = [arquivos] if isinstance(arquivos, str) else list(arquivos)
+    return ';'.join(os.path.abspath(a) for a in arquivos)
+
+
+def salvar_rollup(rollup, caminho=ARQUIVO_ROLLUP, origens=()):
+    """Grava o rollup com a coluna `origens` (arquivos de onde veio)"""
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    rollup.assign(origens=texto_origens(origens)).to_csv(caminho, index=False, encoding='utf-8-sig')
+
+
+def carregar_rollup(caminho=ARQUIVO_ROLLUP, dimensoes=DIMENSOES_ROLLUP):
+    return pd.read_csv(caminho, dtype={d: str for d in ['agrupamento', 'origens'] + dimensoes},
+                       keep_default_na=False, encoding='utf-8-sig')
+
+
+def obter_rollup(arquivos_origem, caminho=ARQUIVO_ROLLUP, dimensoes=DIMENSOES_ROLLUP):
+    """
+    Rollup do cache; recalculado (e regravado) se faltar, for mais velho que
+    alguma origem ou tiver sido gerado de outros arquivos. `arquivos_origem`:
+    um caminho ou uma lista.
+    """
+    origens = [arquivos_origem] if isinstance(arquivos_origem, str) else list(arquivos_origem)
+    if os.path.exists(caminho) and all(os.path.getmtime(caminho) >= os.path.getmtime(a) for a in origens):
+        rollup = carregar_rollup(caminho, dimensoes)
+        if 'origens' in rollup.columns and (rollup['origens'] == texto_origens(origens)).all():
+            return rollup.drop(columns='origens')
+    rollup = grouping_sets(combinar_bases([base_rollup_csv(a, dimensoes) for a in origens], dimensoes),
+                           dimensoes)
+    salvar_rollup(rollup, caminho, origens)
+    return rollup
+
+
+def visao(rollup, dimensoes=()):
+    """Linhas de um agrupamento, indexadas pelas suas dimensões (() = total)"""
+    nome = '+'.join(dimensoes) or 'total'
+    linhas = rollup[rollup['agrupamento'] == nome]
+    if not len(linhas):
+        raise KeyError(f"Agrupamento não está no rollup: {nome}")
+    return linhas.set_index(list(dimensoes)) if dimensoes else linhas.iloc[0]
+
+
+def campos_rollup(rollup):
+    """Campos com contador de preenchidos no rollup, na ordem original"""
+    return [c[len(PREFIXO_PREENCHIDO):] for c in rollup.columns if c.startswith(PREFIXO_PREENCHIDO)]
+
+
+def vazios(linhas, campos):
+    """Registros vazios (nulos) por campo: qtd - preenchidos"""
+    colunas = [PREFIXO_PREENCHIDO + c for c in campos]
+    if isinstance(linhas, pd.Series):
+        return pd.Series(linhas['qtd'] - linhas[colunas].to_numpy(dtype=np.int64), index=campos)
+    return pd.DataFrame(linhas['qtd'].to_numpy()[:, None] - linhas[colunas].to_numpy(dtype=np.int64),
+                        index=linhas.index, columns=campos)
+
+
+def completude_celulas(linhas, campos):
+    """% de células preenchidas (todos os campos) de cada linha do rollup"""
+    vazias = vazios(linhas, campos).sum(axis=1)
+    return (1 - vazias / (linhas['qtd'] * len(campos))) * 100
@@ -0,0 +1,118 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Sobrevivência (golden record) de clusters de duplicatas
+═══════════════════════════════════════════════════════════════════════════════
+
+Cada cluster de duplicatas vira UM registro ouro, montado campo a campo:
+
+  codigo_material      → sobrevivente: registro de maior estoque_atual
+  ncm                  → NCM mais completo do cluster (placeholder perde)
+  preco_unitario       → mediana dos preços diferentes de zero
+  estoque_atual        → soma do cluster
+  estoque_minimo       → maior valor do cluster (conservador)
+  data_cadastro        → a mais antiga
+  ultima_movimentacao  → a mais recente
+  demais campos        → do registro sobrevivente
+
+Tudo é feito com agregações agrupadas (groupby/sort) sobre o cadastro
+inteiro de uma vez, sem loop por cluster. Junto sai a tabela de referência
+codigo_antigo → codigo_novo para migrar pedidos, saldos e históricos.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# NCMs de preenchimento: 00000000 (inválido na origem) e 99999999 (genérico
+# aplicado pelo 10_implementacao_correcoes.py)
+NCM_PLACEHOLDERS = {'00000000', '99999999'}
+
+RE_NAO_DIGITO = re.compile(r'\D')
+
+FORMATO_DATA = '%Y-%m-%d'
+
+
+def _digitos_ncm(valor):
+    """Só os dígitos do NCM ("8482.10.10" e 84821010.0 → "84821010")"""
+    if isinstance(valor, float):
+        if np.isnan(valor):
+            return ''
+        if valor.is_integer():
+            valor = int(valor)
+    return RE_NAO_DIGITO.sub('', str(valor))
+
+
+def completude_ncm(serie):
+    """
+    Pontuação de completude do NCM (maior = melhor): 0 vazio, 1 placeholder,
+    senão 2 + dígitos significativos (8482.10.10 > 8482.10.00 > 8482).
+    """
+    codigos, unicos = pd.factorize(serie)
+    pontos = np.zeros(len(unicos), dtype=np.int64)
+    for i, valor in enumerate(unicos):
+        digitos = _digitos_ncm(valor)
+        if not digitos:
+            continue
+        pontos[i] = 1 if digitos in NCM_PLACEHOLDERS else 2 + len(digitos.rstrip('0'))
+    return np.where(codigos >= 0, pontos[codigos], 0)
+
+
+def registros_ouro(df, col_cluster):
+    """
+    Consolida os clusters com 2+ registros.
+
+    Retorna (ouro, referencia):
+    - ouro: 1 linha por cluster, com as colunas do cadastro + col_cluster e
+      qtd_registros, na ordem dos clusters
+    - referencia: codigo_antigo, codigo_novo, col_cluster e acao
+      (MANTER/ELIMINAR) para cada registro dos clusters
+    """
+    base = df[df[col_cluster].notna() & df.duplicated(col_cluster, keep=False)].copy()
+    base['_posicao'] = np.arange(len(base))
+    grupos = base.groupby(col_cluster, sort=True)
+
+    # Sobrevivente: maior estoque, empate → primeiro registro (como idxmax)
+    sobrevivente = (base.sort_values([col_cluster, 'estoque_atual', '_posicao'],
+                                     ascending=[True, False, True], kind='stable')
+                        .drop_duplicates(col_cluster))
+    ouro = sobrevivente.set_index(col_cluster)
+
+    # NCM mais completo; empate → NCM do sobrevivente, depois primeiro registro
+    base['_pontos_ncm'] = completude_ncm(base['ncm'])
+    base['_e_sobrevivente'] = base['_posicao'].isin(sobrevivente['_posicao'])
+    melhor_ncm = (base.sort_values([col_cluster, '_pontos_ncm', '_e_sobrevivente', '_posicao'],
+                                   ascending=[True, False, False, True], kind='stable')
+                      .drop_duplicates(col_cluster)
+                      .set_index(col_cluster)['ncm'])
+
+    precos_validos = base['preco_unitario'].where(base['preco_unitario'] > 0)
+    cadastro = pd.to_datetime(base['data_cadastro'], format=FORMATO_DATA, errors='coerce')
+    movimentacao = pd.to_datetime(base['ultima_movimentacao'], format=FORMATO_DATA, errors='coerce')
+
+    ouro['ncm'] = melhor_ncm
+    if pd.api.types.is_float_dtype(ouro['ncm']):
+        ouro['ncm'] = ouro['ncm'].astype('Int64')  # lido como float por causa dos vazios
+    ouro['preco_unitario'] = (precos_validos.groupby(base[col_cluster], sort=True).median()
+                              .fillna(0.0).round(2))
+    ouro['estoque_atual'] = grupos['estoque_atual'].sum()
+    ouro['estoque_minimo'] = grupos['estoque_minimo'].max()
+    ouro['data_cadastro'] = cadastro.groupby(base[col_cluster], sort=True).min().dt.strftime(FORMATO_DATA)
+    ouro['ultima_movimentacao'] = (movimentacao.groupby(base[col_cluster], sort=True).max()
+                                   .dt.strftime(FORMATO_DATA))
+    ouro['qtd_registros'] = grupos.size()
+
+    colunas = [c for c in df.columns if c != col_cluster]
+    ouro = ouro[colunas + ['qtd_registros']].reset_index()
+    ouro = ouro[[col_cluster] + colunas + ['qtd_registros']]
+
+    codigo_novo = base[col_cluster].map(ouro.set_index(col_cluster)['codigo_material'])
+    referencia = pd.DataFrame({
+        'codigo_antigo': base['codigo_material'].to_numpy(),
+        'codigo_novo': codigo_novo.to_numpy(),
+        col_cluster: base[col_cluster].to_numpy(),
+        'acao': np.where(base['_e_sobrevivente'], 'MANTER', 'ELIMINAR'),
+    })
+    return ouro, referencia
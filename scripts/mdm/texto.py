@@ -0,0 +1,140 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Normalização de descrições de materiais
+═══════════════════════════════════════════════════════════════════════════════
+
+Todas as funções trabalham sobre as descrições DISTINTAS (pd.factorize):
+o cadastro real repete poucas dezenas de milhares de textos em milhões de
+linhas, então cada regra de texto roda uma vez por valor único e o resultado
+volta para as linhas pelos códigos inteiros.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+
+from mdm.paralelo import (SHARDS_POR_PROCESSO, TextosCompartilhados, anexar_arrays, codificar_textos,
+                          contexto_processos, numero_processos, publicar_arrays)
+
+# Palavras de ligação que não diferenciam materiais ("Parafuso M8 em Aço")
+STOPWORDS = {'em', 'de', 'da', 'do', 'das', 'dos', 'com', 'para', 'e'}
+
+# Especificações técnicas: roscas (M6), bitolas (2,5mm²) e polegadas (1/2", 1.1/4")
+RE_ESPEC = re.compile(
+    r'^(?:m\d+(?:[.,]\d+)?'
+    r'|\d+(?:[.,]\d+)?mm2?'
+    r'|\d+(?:[.,]\d+)?(?:/\d+)?"'
+    r'|\d+(?:[.,]\d+)?/\d+)$'
+)
+
+RE_ESPACOS = re.compile(r'\s+')
+
+
+class _TabelaAcentos(dict):
+    """
+    Tabela do str.translate montada sob demanda: cada caractere é decomposto
+    (NFKD, sem marcas combinantes) uma única vez e depois vira lookup em C.
+    """
+
+    def __missing__(self, codigo):
+        decomposto = unicodedata.normalize('NFKD', chr(codigo))
+        self[codigo] = ''.join(c for c in decomposto if not unicodedata.combining(c))
+        return self[codigo]
+
+
+_TABELA_ACENTOS = _TabelaAcentos()
+
+
+def remover_acentos(texto):
+    """Remove acentos preservando letras base ("Aço" → "Aco")"""
+    if texto.isascii():
+        return texto
+    return texto.translate(_TABELA_ACENTOS)
+
+
+def normalizar_texto(texto):
+    """Minúsculas, sem acentos e com espaços colapsados"""
+    if not isinstance(texto, str):
+        return ''
+    return RE_ESPACOS.sub(' ', remover_acentos(texto).lower()).strip()
+
+
+def separar_tokens(texto_normalizado):
+    """Divide texto normalizado em (tokens de palavra, tokens de especificação)"""
+    palavras, specs = [], []
+    for token in texto_normalizado.split(' '):
+        if not token or token in STOPWORDS:
+            continue
+        if RE_ESPEC.match(token):
+            specs.append(token.replace(',', '.'))
+        else:
+            palavras.append(token)
+    return palavras, specs
+
+
+def _normalizar_unicos(unicos):
+    """Colunas (norm, chave_ordenada, palavras, specs) de uma lista de descrições"""
+    normalizados = [normalizar_texto(v) for v in unicos]
+    palavras, specs, chaves = [], [], []
+    for norm in normalizados:
+        p, s = separar_tokens(norm)
+        p_ord, s_ord = sorted(p), sorted(s)
+        palavras.append(' '.join(p_ord))
+        specs.append(' '.join(s_ord))
+        chaves.append(' '.join(p_ord + s_ord))
+    return normalizados, chaves, palavras, specs
+
+
+def _normalizar_faixa(nome_shm, layout, inicio, fim):
+    """Worker: _normalizar_unicos das descrições [inicio, fim) em memória compartilhada"""
+    shm, arrays = anexar_arrays(nome_shm, layout)
+    textos = TextosCompartilhados(arrays['textos'], arrays['offsets'])
+    try:
+        return _normalizar_unicos([textos[i] for i in range(inicio, fim)])
+    finally:
+        del arrays, textos
+        shm.close()
+
+
+def preparar_descricoes(serie, processos=1):
+    """
+    Normaliza uma série de descrições uma vez por valor distinto.
+
+    Retorna (codigos, tabela): `codigos` é um array int com a posição de cada
+    linha em `tabela`, que tem uma linha por descrição distinta com as colunas
+    norm, chave_ordenada (tokens em ordem alfabética), palavras e specs.
+    `processos` > 1 divide as descrições distintas entre workers (mdm.paralelo).
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+
+    processos = numero_processos(processos, len(unicos), 0)
+    if processos == 1 or len(unicos) == 0:
+        colunas = _normalizar_unicos(unicos)
+    else:
+        # Não-texto (NaN) normaliza para '' de qualquer forma
+        dados, offsets = codificar_textos(v if isinstance(v, str) else '' for v in unicos)
+        shm, layout = publicar_arrays({'textos': dados, 'offsets': offsets})
+        passo = -(-len(unicos) // (processos * SHARDS_POR_PROCESSO)) or 1
+        faixas = [(i, min(i + passo, len(unicos))) for i in range(0, len(unicos), passo)]
+        try:
+            with ProcessPoolExecutor(processos, mp_context=contexto_processos()) as executor:
+                partes = list(executor.map(_normalizar_faixa, repeat(shm.name), repeat(layout),
+                                           *zip(*faixas)))
+        finally:
+            shm.close()
+            shm.unlink()
+        colunas = [list(chain.from_iterable(parte[c] for parte in partes)) for c in range(4)]
+
+    tabela = pd.DataFrame(dict(zip(['norm', 'chave_ordenada', 'palavras', 'specs'], colunas)))
+    return np.asarray(codigos), tabela
+
+
+def prefixos_tokens(palavras, tamanho=3):
+    """Prefixos dos tokens já ordenados ("aco parafuso" → "aco par")"""
+    return ' '.join(t[:tamanho] for t in palavras.split(' ') if t)
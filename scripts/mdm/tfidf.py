@@ -0,0 +1,225 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Similaridade TF-IDF de n-gramas de caracteres (join esparso)
+═══════════════════════════════════════════════════════════════════════════════
+
+Alternativa ao Método 3 (blocagem + SequenceMatcher) que não depende de
+categoria/UoM/prefixo iguais para comparar duas descrições:
+
+  1. cada descrição DISTINTA (chave ordenada, sem stopwords) vira um vetor
+     TF-IDF esparso de 3-gramas de caracteres (" pa", "par", "ara", ...),
+     com norma L2 = 1, então produto escalar = cosseno
+  2. self-join X · Xᵀ em blocos de linhas: cada bloco gera só a sua fatia
+     da matriz de similaridade, filtrada pelo limiar e pelos k maiores
+     vizinhos antes do próximo bloco → memória limitada pelo tamanho do bloco
+
+O tamanho do bloco não é fixo: cada linha custa a soma das frequências dos
+seus 3-gramas (nº de multiplicações do produto esparso) e os blocos são
+cortados quando o custo acumulado passa de `max_produtos`.
+
+Os 3-gramas são extraídos de forma vetorizada: todos os textos viram um
+único array de code points (UTF-32) e cada trio vira um inteiro de 63 bits.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from mdm.texto import preparar_descricoes
+
+TAMANHO_NGRAMA = 3
+MAX_PRODUTOS_BLOCO = 20_000_000  # multiplicações por bloco do self-join
+
+
+def _codigos_ngramas(textos, n=TAMANHO_NGRAMA):
+    """(linha, código inteiro) de cada n-grama dos textos, com 1 espaço de borda"""
+    preenchidos = [f' {t} ' for t in textos]
+    tamanhos = np.fromiter((len(t) for t in preenchidos), dtype=np.int64, count=len(preenchidos))
+    pontos = np.frombuffer(''.join(preenchidos).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+    # Início de cada n-grama que cabe inteiro dentro do seu texto
+    qtd = np.maximum(tamanhos - n + 1, 0)
+    linhas = np.repeat(np.arange(len(preenchidos)), qtd)
+    fim_texto = np.cumsum(tamanhos)
+    inicio_linha = np.repeat(fim_texto - tamanhos, qtd)
+    inicio_ngrama = np.repeat(np.cumsum(qtd) - qtd, qtd)
+    posicoes = inicio_linha + (np.arange(len(linhas)) - inicio_ngrama)
+
+    # Code point Unicode < 2^21 → n=3 cabe em 63 bits
+    codigos = np.zeros(len(posicoes), dtype=np.int64)
+    for deslocamento in range(n):
+        codigos = (codigos << 21) | pontos[posicoes + deslocamento]
+    return linhas, codigos
+
+
+def matriz_tfidf(textos, n=TAMANHO_NGRAMA):
+    """
+    Matriz CSR (textos × n-gramas distintos), float32, linhas com norma L2 1.
+    tf = contagem no texto; idf = ln((1 + N) / (1 + df)) + 1.
+    """
+    linhas, codigos = _codigos_ngramas(textos, n)
+    colunas, vocabulario = pd.factorize(codigos)
+    matriz = sparse.csr_matrix(
+        (np.ones(len(linhas), dtype=np.float32), (linhas, colunas)),
+        shape=(len(textos), len(vocabulario)),
+    )
+    matriz.sum_duplicates()
+
+    freq_doc = np.bincount(matriz.indices, minlength=matriz.shape[1])
+    idf = np.log((1 + matriz.shape[0]) / (1 + freq_doc)) + 1
+    matriz.data *= idf[matriz.indices].astype(np.float32)
+
+    normas = np.sqrt(np.asarray(matriz.power(2).sum(axis=1)).ravel())
+    normas[normas == 0] = 1  # texto vazio: linha sem n-gramas
+    matriz.data /= np.repeat(normas, np.diff(matriz.indptr))
+    return matriz
+
+
+def _blocos(matriz, max_produtos):
+    """Fronteiras [inicio, fim) dos blocos de linhas do self-join"""
+    freq_doc = np.bincount(matriz.indices, minlength=matriz.shape[1])
+    linha_nnz = np.repeat(np.arange(matriz.shape[0]), np.diff(matriz.indptr))
+    custo = np.bincount(linha_nnz, weights=freq_doc[matriz.indices], minlength=matriz.shape[0])
+    acumulado = np.cumsum(custo)
+    fronteiras, inicio = [], 0
+    while inicio < matriz.shape[0]:
+        base = acumulado[inicio - 1] if inicio else 0
+        fim = int(np.searchsorted(acumulado, base + max_produtos, side='right'))
+        fim = max(fim, inicio + 1)  # linha sozinha acima do orçamento
+        fronteiras.append((inicio, fim))
+        inicio = fim
+    return fronteiras
+
+
+def _separar_sufixo(matriz, limiar):
+    """
+    (sufixo, norma_prefixo): o prefixo de cada linha são os seus n-gramas
+    mais frequentes enquanto a norma acumulada fica abaixo do limiar; o
+    resto (n-gramas raros) forma a matriz `sufixo`.
+    """
+    freq_doc = np.bincount(matriz.indices, minlength=matriz.shape[1])
+    posto = np.empty(matriz.shape[1], dtype=np.int64)
+    posto[np.argsort(-freq_doc, kind='stable')] = np.arange(matriz.shape[1])
+
+    linha_nnz = np.repeat(np.arange(matriz.shape[0]), np.diff(matriz.indptr))
+    ordem = np.lexsort((posto[matriz.indices], linha_nnz))
+    quadrados = matriz.data[ordem].astype(np.float64) ** 2
+    # Soma acumulada dentro de cada linha (a ordenação mantém as linhas contíguas)
+    acumulado = np.concatenate([[0.0], np.cumsum(quadrados)])
+    acumulado = acumulado[1:] - acumulado[np.repeat(matriz.indptr[:-1], np.diff(matriz.indptr))]
+
+    # Margem para arredondamento do float32: o prefixo fica um pouco menor
+    no_prefixo = np.zeros(matriz.nnz, dtype=bool)
+    no_prefixo[ordem] = acumulado < (limiar - 1e-4) ** 2
+    norma_prefixo = np.sqrt(np.bincount(linha_nnz, weights=np.where(no_prefixo, matriz.data, 0) ** 2,
+                                        minlength=matriz.shape[0]))
+
+    sufixo = matriz.copy()
+    sufixo.data[no_prefixo] = 0
+    sufixo.eliminate_zeros()
+    return sufixo, norma_prefixo
+
+
+def _cossenos(matriz, i, j, lote=500_000):
+    """Produto escalar das linhas i[p] e j[p] de cada par, em lotes"""
+    resultado = np.empty(len(i), dtype=np.float32)
+    for inicio in range(0, len(i), lote):
+        fim = inicio + lote
+        resultado[inicio:fim] = np.asarray(
+            matriz[i[inicio:fim]].multiply(matriz[j[inicio:fim]]).sum(axis=1)).ravel()
+    return resultado
+
+
+def pares_similares_tfidf(matriz, limiar=0.90, k=10, max_produtos=MAX_PRODUTOS_BLOCO):
+    """
+    Pares (i, j), i < j, com cosseno >= limiar. Cada linha fica só com os
+    seus k vizinhos mais similares (o par sobrevive se estiver no top-k de
+    qualquer uma das duas). Retorna arrays (i, j, cosseno).
+
+    Filtro de prefixo (all-pairs): se x·y >= limiar, o n-grama mais raro
+    em comum está no sufixo de x e no de y, senão x·y <= ||prefixo de x||
+    < limiar. Então os candidatos saem de sufixo · sufixoᵀ, que só envolve
+    n-gramas raros; o cosseno exato é calculado para os candidatos que
+    passam no limite superior sufixo·sufixo + ||prefixo x|| + ||prefixo y||.
+    """
+    sufixo, norma_prefixo = _separar_sufixo(matriz, limiar)
+    transposta = sufixo.T.tocsr()
+    resultado_i, resultado_j, resultado_sim = [], [], []
+
+    for inicio, fim in _blocos(sufixo, max_produtos):
+        produto = (sufixo[inicio:fim] @ transposta).tocoo()
+        linha = produto.row.astype(np.int64) + inicio
+        coluna = produto.col.astype(np.int64)
+        # x·y - sx·sy = px·y + sx·py <= ||px|| + ||sx||·||py||, ||sx||² = 1 - ||px||²
+        px, py = norma_prefixo[linha], norma_prefixo[coluna]
+        limite = produto.data + np.minimum(px + np.sqrt(1 - px ** 2) * py,
+                                           py + np.sqrt(1 - py ** 2) * px)
+        manter = (coluna > linha) & (limite >= limiar)
+        linha, coluna = linha[manter], coluna[manter]
+
+        sim = _cossenos(matriz, linha, coluna)
+        manter = sim >= limiar
+        resultado_i.append(linha[manter])
+        resultado_j.append(coluna[manter])
+        resultado_sim.append(sim[manter])
+
+    i = np.concatenate(resultado_i) if resultado_i else np.zeros(0, np.int64)
+    j = np.concatenate(resultado_j) if resultado_j else np.zeros(0, np.int64)
+    sim = np.concatenate(resultado_sim) if resultado_sim else np.zeros(0, np.float32)
+
+    # k maiores por linha, olhando os pares nos dois sentidos
+    origem, vizinho, sim_dupla = np.concatenate([i, j]), np.concatenate([j, i]), np.concatenate([sim, sim])
+    ordem = np.lexsort((vizinho, -sim_dupla, origem))
+    origem, vizinho, sim_dupla = origem[ordem], vizinho[ordem], sim_dupla[ordem]
+    novo = np.ones(len(origem), dtype=bool)
+    novo[1:] = origem[1:] != origem[:-1]
+    inicio_grupo = np.maximum.accumulate(np.where(novo, np.arange(len(origem)), 0))
+    no_top = (np.arange(len(origem)) - inicio_grupo) < k
+
+    pares = pd.DataFrame({
+        'i': np.minimum(origem, vizinho)[no_top],
+        'j': np.maximum(origem, vizinho)[no_top],
+        'sim': sim_dupla[no_top],
+    }).drop_duplicates(['i', 'j']).sort_values(['i', 'j'])
+    return pares['i'].to_numpy(), pares['j'].to_numpy(), pares['sim'].to_numpy()
+
+
+def pares_tfidf(df, limiar=0.90, k=10, max_produtos=MAX_PRODUTOS_BLOCO):
+    """
+    Pares de linhas (posicionais) com cosseno TF-IDF >= limiar, no mesmo
+    formato de mdm.duplicatas.pares_fuzzy (idx_a, idx_b, similaridade).
+
+    Linhas com a mesma chave ordenada ligam-se à primeira linha da chave
+    (similaridade 1.0); chaves distintas são comparadas pelo join esparso e
+    ligadas pelas primeiras linhas. Especificações diferentes (M8 × M10)
+    nunca formam par.
+    """
+    cod_desc, tabela = preparar_descricoes(df['descricao'])
+    chave_cod, chaves = pd.factorize(tabela['chave_ordenada'])
+    chave_linha = chave_cod[cod_desc]
+    spec_chave = np.full(len(chaves), -1, dtype=np.int64)
+    spec_chave[chave_cod] = pd.factorize(tabela['specs'])[0]
+
+    posicao = np.arange(len(chave_linha))
+    primeira = np.full(len(chaves), len(chave_linha), dtype=np.int64)
+    np.minimum.at(primeira, chave_linha, posicao)
+    repetidas = primeira[chave_linha] != posicao
+    identicos = pd.DataFrame({
+        'idx_a': primeira[chave_linha[repetidas]],
+        'idx_b': posicao[repetidas],
+        'similaridade': 1.0,
+    })
+
+    matriz = matriz_tfidf(list(chaves))
+    i, j, sim = pares_similares_tfidf(matriz, limiar=limiar, k=k, max_produtos=max_produtos)
+    mesma_spec = spec_chave[i] == spec_chave[j]
+    similares = pd.DataFrame({
+        'idx_a': primeira[i[mesma_spec]],
+        'idx_b': primeira[j[mesma_spec]],
+        'similaridade': np.round(sim[mesma_spec].astype(np.float64), 4),
+    })
+
+    pares = pd.concat([identicos, similares], ignore_index=True)
+    return pares.drop_duplicates(['idx_a', 'idx_b']).reset_index(drop=True)
@@ -0,0 +1,94 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Union-find (conjuntos disjuntos) para clusters de duplicatas
+═══════════════════════════════════════════════════════════════════════════════
+
+Cada método de detecção (código, descrição, fuzzy, fornecedor+especificação)
+gera ARESTAS entre posições de linhas. O union-find junta todas as arestas de
+forma transitiva: A→B pelo código + B→C pela descrição = A, B e C no mesmo
+cluster, o que nenhum método isolado enxerga.
+
+IMPLEMENTAÇÃO:
+- pai e rank em arrays numpy (8 + 1 bytes por material), nada de dict
+- unir() processa lotes de arestas vetorizados: a cada rodada acha as raízes
+  dos dois lados, pendura a raiz de menor (rank, -índice) na outra e repete só
+  com as arestas que ainda ligam conjuntos diferentes
+- depois de cada rodada, compressão total por saltos de ponteiro
+  (pai = pai[pai] até estabilizar): log(profundidade) passos vetorizados,
+  então cadeias longas criadas numa rodada não viram loops longos
+- cluster_id estável: depende só dos conjuntos, não da ordem das arestas
+  (clusters numerados pela primeira linha de cada um)
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class UniaoBusca:
+    """Conjuntos disjuntos sobre os elementos 0..n-1"""
+
+    def __init__(self, n):
+        self.pai = np.arange(n, dtype=np.int64)
+        self.rank = np.zeros(n, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.pai)
+
+    def comprimir(self):
+        """Compressão total: pai[i] passa a ser a raiz de i"""
+        while True:
+            avo = self.pai[self.pai]
+            if np.array_equal(avo, self.pai):
+                return
+            self.pai = avo
+
+    def encontrar(self, elementos):
+        """Raiz de cada elemento (com compressão de caminho dos consultados)"""
+        elementos = np.asarray(elementos, dtype=np.int64)
+        raiz = self.pai[elementos]
+        pendentes = np.flatnonzero(self.pai[raiz] != raiz)
+        while len(pendentes):
+            raiz[pendentes] = self.pai[raiz[pendentes]]
+            pendentes = pendentes[self.pai[raiz[pendentes]] != raiz[pendentes]]
+        self.pai[elementos] = raiz
+        return raiz
+
+    def unir(self, a, b):
+        """Une os conjuntos de cada par (a[i], b[i]); aceita dezenas de milhões de pares"""
+        a = np.asarray(a, dtype=np.int64).ravel()
+        b = np.asarray(b, dtype=np.int64).ravel()
+        self.comprimir()
+        while len(a):
+            # Com a árvore comprimida, pai[x] já é a raiz de x
+            a, b = self.pai[a], self.pai[b]
+            cruzam = a != b
+            a, b = a[cruzam], b[cruzam]
+            if not len(a):
+                break
+
+            # Filho = raiz de menor (rank, -índice): a ordem é total, então
+            # ligações da mesma rodada nunca formam ciclo, seja qual for a
+            # aresta que prevalece quando uma raiz aparece em várias
+            rank_a, rank_b = self.rank[a], self.rank[b]
+            a_e_filho = (rank_a < rank_b) | ((rank_a == rank_b) & (a > b))
+            filho = np.where(a_e_filho, a, b)
+            novo_pai = np.where(a_e_filho, b, a)
+            empate = rank_a == rank_b
+            self.pai[filho] = novo_pai
+            self.rank[novo_pai[empate]] += 1
+            self.comprimir()
+
+    def raizes(self):
+        """Raiz de todos os elementos"""
+        return self.encontrar(np.arange(len(self.pai)))
+
+    def cluster_ids(self):
+        """
+        Id denso 0..k-1 por conjunto, numerado pela primeira linha de cada
+        conjunto (singletons incluídos). Mesmo resultado para qualquer ordem
+        de arestas.
+        """
+        self.comprimir()
+        return pd.factorize(self.pai)[0]
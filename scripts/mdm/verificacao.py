@@ -0,0 +1,165 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Módulo: Verificação anti-duplicata no cadastro de materiais
+═══════════════════════════════════════════════════════════════════════════════
+
+Índices em memória para responder, em milissegundos, "quais materiais
+existentes batem com esta descrição proposta?":
+
+  chave exata   → descrição normalizada com tokens ordenados ("aco m8 parafuso")
+  especificação → specs do texto ("m8"); specs diferentes nunca são duplicata
+  tokens        → cada palavra + suas variantes com 1 letra removida
+                  (deletion neighbourhood): "parafuzo" e "parafuso" têm a
+                  variante "parafuo"/"parafus" em comum, então erros de 1
+                  letra são achados por lookup de dicionário, sem varrer textos
+
+As variantes são indexadas junto com a especificação e o número de palavras
+do texto, pois a similaridade do Método 3 (mdm.duplicatas.similaridade) zera
+quando qualquer um dos dois difere. Consulta: pega a palavra mais rara da
+descrição, junta os textos com uma variante dela na mesma (spec, nº de
+palavras), e só esses poucos candidatos passam pela similaridade.
+Tudo é indexado por texto distinto; as linhas saem de um CSR texto → linhas.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from mdm.duplicatas import similaridade
+from mdm.texto import normalizar_texto, preparar_descricoes, separar_tokens
+
+COLUNAS_RESPOSTA = ['codigo_material', 'descricao', 'categoria', 'unidade_medida', 'status']
+
+
+def variantes_token(token):
+    """O token e todas as versões com 1 caractere removido"""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def chave_descricao(descricao):
+    """(chave com tokens ordenados, palavras, specs) de uma descrição livre"""
+    palavras, specs = separar_tokens(normalizar_texto(descricao))
+    palavras, specs = sorted(palavras), sorted(specs)
+    return ' '.join(palavras + specs), palavras, ' '.join(specs)
+
+
+class VerificadorDuplicatas:
+    """Índices do cadastro carregados uma vez para consultas de baixa latência"""
+
+    def __init__(self, df, limiar=0.90):
+        self.limiar = limiar
+        self.carregado_em = time.time()
+        self.n_materiais = len(df)
+
+        base = df.reset_index(drop=True)
+        self._colunas = {c: base[c].to_numpy(dtype=object) for c in COLUNAS_RESPOSTA}
+
+        # UoM e categoria como inteiros: comparar milhares de linhas por consulta
+        self._unidade, unidades = pd.factorize(base['unidade_medida'])
+        self._categoria, categorias = pd.factorize(base['categoria'])
+        self._id_unidade = {u: i for i, u in enumerate(unidades)}
+        self._id_categoria = {c: i for i, c in enumerate(categorias)}
+
+        cod_desc, tabela = preparar_descricoes(base['descricao'])
+        chave_cod, chaves = pd.factorize(tabela['chave_ordenada'])
+        self._chaves = list(chaves)
+        self._id_chave = {c: i for i, c in enumerate(self._chaves)}
+
+        # CSR texto → linhas do cadastro
+        texto_linha = chave_cod[cod_desc]
+        self._linhas = np.argsort(texto_linha, kind='stable')
+        contagem = np.bincount(texto_linha, minlength=len(self._chaves))
+        self._inicios = np.zeros(len(self._chaves) + 1, dtype=np.int64)
+        np.cumsum(contagem, out=self._inicios[1:])
+
+        # Especificação e variantes de token por texto distinto
+        primeira = np.full(len(self._chaves), len(tabela), dtype=np.int64)
+        np.minimum.at(primeira, chave_cod, np.arange(len(tabela)))
+        specs = tabela['specs'].to_numpy()[primeira]
+        palavras = tabela['palavras'].to_numpy()[primeira]
+
+        self._por_spec = {}
+        self._por_variante = {}
+        for texto, (spec, tokens) in enumerate(zip(specs, palavras)):
+            tokens = [t for t in tokens.split(' ') if t]
+            self._por_spec.setdefault(spec, []).append(texto)
+            for token in tokens:
+                for variante in variantes_token(token):
+                    self._por_variante.setdefault((spec, len(tokens), variante), []).append(texto)
+
+    @property
+    def n_textos(self):
+        return len(self._chaves)
+
+    def _candidatos(self, chave, palavras, spec):
+        """Textos com a mesma spec/nº de palavras e uma variante da palavra mais rara"""
+        if not palavras:
+            # Só specs: textos da mesma spec. Só stopwords (spec vazia):
+            # nada a comparar, em vez de varrer todos os textos sem spec
+            return set(self._por_spec.get(spec, ())) if spec else set()
+        postagens = []
+        for token in set(palavras):
+            chaves = ((spec, len(palavras), v) for v in variantes_token(token))
+            listas = [self._por_variante[c] for c in chaves if c in self._por_variante]
+            postagens.append((sum(len(l) for l in listas), listas))
+        _, listas = min(postagens, key=lambda p: p[0])
+        candidatos = set().union(*listas)
+        exato = self._id_chave.get(chave)
+        if exato is not None:
+            candidatos.add(exato)
+        return candidatos
+
+    def verificar(self, descricao, categoria=None, unidade=None, max_resultados=10):
+        """
+        Materiais existentes com similaridade >= limiar com a descrição
+        proposta, do mais parecido para o menos. `categoria`/`unidade`
+        não filtram: marcam se o candidato coincide (mesma UoM + texto igual
+        é duplicata certa; UoM diferente pode ser embalagem diferente).
+        """
+        inicio = time.perf_counter()
+        chave, palavras, spec = chave_descricao(descricao)
+
+        textos, sims = [], []
+        for texto in self._candidatos(chave, palavras, spec):
+            sim = similaridade(chave, self._chaves[texto])
+            if sim >= self.limiar:
+                textos.append(texto)
+                sims.append(sim)
+
+        # Linhas de todos os textos encontrados, ordenadas sem montar dicts:
+        # similaridade ↓, mesma UoM primeiro, mesma categoria primeiro, posição
+        tamanhos = self._inicios[np.add(textos, 1)] - self._inicios[textos] if textos else np.zeros(0, int)
+        linhas = (np.concatenate([self._linhas[self._inicios[t]:self._inicios[t + 1]] for t in textos])
+                  if textos else np.zeros(0, dtype=np.int64))
+        sim_linha = np.repeat(np.round(sims, 4), tamanhos)
+        mesma_unidade = self._unidade[linhas] == self._id_unidade.get(unidade, -2)
+        mesma_categoria = self._categoria[linhas] == self._id_categoria.get(categoria, -2)
+        ordem = np.lexsort((linhas, ~mesma_categoria, ~mesma_unidade, -sim_linha))
+
+        resultado = []
+        for i in ordem[:max_resultados]:
+            item = {c: _json(self._colunas[c][linhas[i]]) for c in COLUNAS_RESPOSTA}
+            item['similaridade'] = float(sim_linha[i])
+            item['mesma_categoria'] = bool(mesma_categoria[i])
+            item['mesma_unidade'] = bool(mesma_unidade[i])
+            resultado.append(item)
+
+        exatos = sim_linha == 1.0
+        duplicata = bool((exatos & mesma_unidade).any() if unidade is not None else exatos.any())
+        return {
+            'descricao': descricao,
+            'duplicata': duplicata,
+            'total_candidatos': int(len(linhas)),
+            'candidatos': resultado,
+            'tempo_ms': round((time.perf_counter() - inicio) * 1000, 3),
+        }
+
+
+def _json(valor):
+    """NaN do pandas vira None (null no JSON)"""
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    return valor
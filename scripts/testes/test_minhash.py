@@ -0,0 +1,93 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PROJETO MDM SUPPLY CHAIN
+Testes: atualização incremental dos pares MinHash (mdm/minhash.py)
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import numpy as np
+import pandas as pd
+
+from mdm.minhash import IndiceMinHash, atualizar_pares
+from mdm.unionfind import UniaoBusca
+
+LIMIAR = 0.7
+
+
+def cadastro():
+    textos = ['Conexão Inox 1/2"', 'Conexao Inox 1/2', 'Parafuso Sextavado M8',
+              'Parafuso Sextavado M8 Zincado', 'Rolamento 6204 2RS', 'Luva Nitrílica G']
+    repeticoes = [8, 3, 5, 2, 4, 1]
+    descricoes = np.repeat(textos, repeticoes)
+    codigos = [f'MAT-{i:05d}' for i in range(11, 11 + len(descricoes))]
+    return pd.DataFrame({'codigo_material': codigos, 'descricao': descricoes})
+
+
+def componentes(df, pares):
+    """Partição dos códigos (conjunto de frozensets) pelos pares"""
+    posicao = pd.Index(df['codigo_material'].unique())
+    uniao = UniaoBusca(len(posicao))
+    uniao.unir(posicao.get_indexer(pares['codigo_a']), posicao.get_indexer(pares['codigo_b']))
+    grupos = pd.Series(posicao).groupby(uniao.cluster_ids())
+    return {frozenset(g) for _, g in grupos}
+
+
+def incremental_e_completo(antes, depois):
+    indice = IndiceMinHash.construir(antes)
+    pares = indice.pares_candidatos(limiar=LIMIAR)
+    alterados, removidos = indice.sincronizar(depois)
+    incremental = atualizar_pares(indice, pares, alterados, removidos, limiar=LIMIAR)
+    completo = IndiceMinHash.construir(depois).pares_candidatos(limiar=LIMIAR)
+    return componentes(depois, incremental), componentes(depois, completo)
+
+
+def test_remover_primeira_linha_do_texto():
+    antes = cadastro()
+    depois = antes[antes['codigo_material'] != 'MAT-00011']
+    incremental, completo = incremental_e_completo(antes, depois)
+    assert incremental == completo
+    assert any(len(g) >= 7 for g in incremental)
+
+
+def test_alterar_e_remover():
+    antes = cadastro()
+    depois = antes.copy()
+    depois.loc[depois['codigo_material'] == 'MAT-00019', 'descricao'] = 'Rolamento 6204 2RS'
+    depois.loc[depois['codigo_material'] == 'MAT-00022', 'descricao'] = 'Luva Nitrílica G'
+    depois = depois[~depois['codigo_material'].isin(['MAT-00011', 'MAT-00027'])]
+    incremental, completo = incremental_e_completo(antes, depois)
+    assert incremental == completo
+
+
+def test_atualizacoes_sucessivas():
+    antes = cadastro()
+    indice = IndiceMinHash.construir(antes)
+    pares = indice.pares_candidatos(limiar=LIMIAR)
+    atual = antes
+    for codigo in ['MAT-00011', 'MAT-00012', 'MAT-00019', 'MAT-00024']:
+        atual = atual[atual['codigo_material'] != codigo]
+        alterados, removidos = indice.sincronizar(atual)
+        pares = atualizar_pares(indice, pares, alterados, removidos, limiar=LIMIAR)
+        completo = IndiceMinHash.construir(atual).pares_candidatos(limiar=LIMIAR)
+        assert componentes(atual, pares) == componentes(atual, completo)
+    assert not pares.duplicated().any()
+
+
+def pares_sem_ordem(pares):
+    return {frozenset(p) for p in zip(pares['codigo_a'], pares['codigo_b'])}
+
+
+def test_codigo_repetido():
+    antes = cadastro()
+    # Mesmo código em duas linhas do mesmo texto: ambas se ligam à primeira
+    antes.loc[antes['codigo_material'].isin(['MAT-00013', 'MAT-00014']), 'codigo_material'] = 'MAT-00099'
+    indice = IndiceMinHash.construir(antes)
+    pares = indice.pares_candidatos(limiar=LIMIAR)
+    assert len(pares) == len(pares_sem_ordem(pares))
+
+    depois = antes[antes['codigo_material'] != 'MAT-00012']
+    alterados, removidos = indice.sincronizar(depois)
+    incremental = atualizar_pares(indice, pares, alterados, removidos, limiar=LIMIAR)
+    completo = IndiceMinHash.construir(depois).pares_candidatos(limiar=LIMIAR)
+    assert len(incremental) == len(completo)
+    assert pares_sem_ordem(incremental) == pares_sem_ordem(completo)